@@ -0,0 +1,85 @@
+"""
+Per-request agent setup cost: fresh agents for every run vs the shared registry.
+
+Times how long a pipeline run spends getting its three agents, and how much
+memory those agents take, when each run calls create() (as generate_movie_idea
+used to) and when it asks src/agents/registry.py for the shared instances. No
+LLM calls are made.
+
+Run from the movie_idea_generator directory:
+
+    python -m benchmarks.bench_agent_setup --requests 10000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# Creating the agents must not open the persistent caches' files
+os.environ.setdefault("MOVIE_IDEA_CACHE_ENABLED", "0")
+
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.agents.idea_generator_agent import IdeaGeneratorAgent
+from src.agents.recommendation_agent import RecommendationAgent
+from src.agents.registry import get_agent, reset_agents
+
+AGENTS = (GenreAnalyzerAgent, RecommendationAgent, IdeaGeneratorAgent)
+
+
+def fresh_agents() -> List:
+    return [agent_class.create() for agent_class in AGENTS]
+
+
+def shared_agents() -> List:
+    return [get_agent(agent_class) for agent_class in AGENTS]
+
+
+def measure(setup: Callable[[], List], requests: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        setup()
+        samples.append(time.perf_counter() - start)
+    ordered = sorted(samples)
+
+    # Keep every run's agents alive so the traced memory is what the runs allocated
+    tracemalloc.start()
+    kept = [setup() for _ in range(requests)]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+
+    return {
+        "p50_us": round(statistics.median(ordered) * 1e6, 3),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 3),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 3),
+        "bytes_per_request": round(allocated / requests, 1)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    reset_agents()
+    first = time.perf_counter()
+    shared_agents()
+    first_ms = (time.perf_counter() - first) * 1000
+
+    results = {
+        "requests": args.requests,
+        "registry_first_use_ms": round(first_ms, 3),
+        "fresh": measure(fresh_agents, args.requests),
+        "shared": measure(shared_agents, args.requests)
+    }
+    results["setup_speedup"] = round(results["fresh"]["mean_us"] / results["shared"]["mean_us"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Startup regression check based on python -X importtime.
+
+Imports the CLI's entry module in fresh interpreters and reports, as JSON, the
+median import time of each module and the slowest modules. It exits with
+status 1 if the median exceeds --budget-ms or if a module that should only be
+imported on first use (openai, httpx, dotenv) was imported at startup.
+
+Run from the movie_idea_generator directory:
+
+    python -m benchmarks.bench_import_time --runs 5 --budget-ms 250
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# Packages that must stay out of startup; they are imported when first used
+DEFERRED = ("openai", "httpx", "dotenv")
+
+
+def import_times(code: str) -> Dict[str, int]:
+    """
+    Run code in a fresh interpreter and parse its -X importtime report.
+
+    Returns:
+        Cumulative import time in microseconds of every module imported
+    """
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def slowest(times: Dict[str, int], skip: Set[str], count: int) -> List[Dict]:
+    # Only top-level packages, so a package and its submodules aren't listed twice
+    top_level = {name: us for name, us in times.items() if "." not in name and name not in skip}
+    return [{"module": name, "ms": round(us / 1000, 3)}
+            for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:count]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main", help="module to import (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="fail if the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level modules to list")
+    args = parser.parse_args()
+
+    # Modules the interpreter imports on its own (site and .pth files) aren't the project's doing
+    interpreter = set(import_times("pass"))
+    runs = [import_times(f"import {args.module}") for _ in range(args.runs)]
+    totals = [run[args.module] / 1000 for run in runs]
+    median_ms = statistics.median(totals)
+    deferred = sorted({name.split(".")[0] for run in runs for name in run} & set(DEFERRED))
+    skip = interpreter | {args.module.split(".")[0]}
+
+    print(json.dumps({
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 3),
+        "min_ms": round(min(totals), 3),
+        "budget_ms": args.budget_ms,
+        "imported_at_startup": deferred,
+        "slowest": slowest(runs[totals.index(min(totals))], skip, args.top)
+    }, indent=2))
+
+    if median_ms > args.budget_ms or deferred:
+        print(f"Startup regression: {median_ms:.0f} ms (budget {args.budget_ms:.0f} ms), "
+              f"deferred modules imported: {', '.join(deferred) or 'none'}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
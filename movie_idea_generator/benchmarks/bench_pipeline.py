@@ -0,0 +1,220 @@
+"""
+End-to-end benchmark of generate_movie_idea against the offline LLM simulator.
+
+For every combination of injected LLM latency, concurrency and pipeline mode,
+runs the full pipeline over the real client stack and reports, as JSON:
+- throughput and p50/p95/p99 end-to-end latency
+- per-stage latency (genre analysis, recommendations, idea) from the call events
+- tokens and estimated cost per generation
+- time spent queued for the rate limiter, errors and fallbacks
+- peak traced memory
+
+The modes are "sequential" (the agents one after another), "concurrent" (the
+idea generated alongside the genre -> recommendation chain), "async"
+(generate_movie_idea_async on one event loop) and "combined" (one JSON-mode call
+for all three agents). Comparisons of sequential with concurrent, and of
+concurrent with combined, are added for each cell. Caches are disabled so every
+request reaches the simulator.
+
+Run from the movie_idea_generator directory:
+
+    python -m benchmarks.bench_pipeline --requests 50 --concurrency 1,8,32 --latency-ms 100,400
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# Every request should reach the simulator, which needs some API key
+os.environ["MOVIE_IDEA_CACHE_ENABLED"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "sk-simulator")
+
+from src.config import llm
+from src.config.config import LLM_CONFIG, PIPELINE_CONFIG
+from src.config.instrumentation import track_run
+from src.llm_simulator import LatencyProfile, LLMSimulator
+from src.main import generate_movie_idea, generate_movie_idea_async
+
+MODES = ("sequential", "concurrent", "async", "combined")
+STAGES = ("genre_analyzer", "recommendation", "idea_generator", "combined")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+
+def timed_run(prompt: str, concurrent: bool) -> Dict:
+    start = time.perf_counter()
+    with track_run(prompt) as run:
+        generate_movie_idea(prompt, concurrent=concurrent)
+    return {"seconds": time.perf_counter() - start, "summary": run.summary()}
+
+
+async def timed_run_async(prompt: str, slots: asyncio.Semaphore) -> Dict:
+    async with slots:
+        start = time.perf_counter()
+        with track_run(prompt) as run:
+            await generate_movie_idea_async(prompt)
+        return {"seconds": time.perf_counter() - start, "summary": run.summary()}
+
+
+def run_cell(mode: str, prompts: List[str], concurrency: int) -> List[Dict]:
+    if mode == "async":
+        async def run_all():
+            slots = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(timed_run_async(prompt, slots) for prompt in prompts))
+        return asyncio.run(run_all())
+
+    PIPELINE_CONFIG["mode"] = "combined" if mode == "combined" else "agents"
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(lambda prompt: timed_run(prompt, mode != "sequential"), prompts))
+    finally:
+        PIPELINE_CONFIG["mode"] = "agents"
+
+
+def report(mode: str, concurrency: int, latency_ms: float, runs: List[Dict], wall: float, peak: int) -> Dict:
+    summaries = [run["summary"] for run in runs]
+    stages = {}
+    for stage in STAGES:
+        samples = [s["agents"][stage]["latency_ms"] / 1000 for s in summaries if stage in s["agents"]]
+        if samples:
+            stages[stage] = percentiles(samples)
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "llm_latency_ms": latency_ms,
+        "requests": len(runs),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(runs) / wall, 3),
+        "latency": percentiles([run["seconds"] for run in runs]),
+        "stages": stages,
+        "tokens_per_run": round(statistics.fmean(s["prompt_tokens"] + s["completion_tokens"] for s in summaries), 1),
+        "cost_usd_per_run": round(statistics.fmean(s["cost_usd"] for s in summaries), 8),
+        "queue_ms_mean": round(statistics.fmean(s["queue_ms"] for s in summaries), 3),
+        "llm_requests": sum(s["attempts"] for s in summaries),
+        "errors": sum(s["errors"] for s in summaries),
+        "fallbacks": sum(s["fallbacks"] for s in summaries),
+        "peak_memory_mb": round(peak / 2 ** 20, 3) if peak else None
+    }
+
+
+def compare(results: List[Dict], baseline: str, candidate: str) -> List[Dict]:
+    cells = {(r["llm_latency_ms"], r["concurrency"], r["mode"]): r for r in results}
+    comparison = []
+    for (latency_ms, concurrency, mode), before in cells.items():
+        after = cells.get((latency_ms, concurrency, candidate))
+        if mode != baseline or after is None:
+            continue
+        comparison.append({
+            "llm_latency_ms": latency_ms,
+            "concurrency": concurrency,
+            f"{baseline}_p50_ms": before["latency"]["p50_ms"],
+            f"{candidate}_p50_ms": after["latency"]["p50_ms"],
+            "p50_speedup": round(before["latency"]["p50_ms"] / after["latency"]["p50_ms"], 3),
+            f"{baseline}_rps": before["throughput_rps"],
+            f"{candidate}_rps": after["throughput_rps"],
+            f"{baseline}_cost_usd_per_run": before["cost_usd_per_run"],
+            f"{candidate}_cost_usd_per_run": after["cost_usd_per_run"]
+        })
+    return comparison
+
+
+def int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def float_list(value: str) -> List[float]:
+    return [float(item) for item in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="pipeline runs per cell")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8, 32], help="comma-separated")
+    parser.add_argument("--latency-ms", type=float_list, default=[100.0, 400.0],
+                        help="comma-separated median LLM latencies")
+    parser.add_argument("--latency", choices=LatencyProfile.KINDS, default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated, from: " + ", ".join(MODES))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip tracemalloc, which slows Python code while tracing")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    simulator = LLMSimulator(error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                             retry_after=0, seed=args.seed).start()
+    LLM_CONFIG["base_url"] = simulator.base_url
+    llm.reset_openai_client()
+    prompts = [f"A story about benchmark subject number {i}" for i in range(args.requests)]
+
+    results = []
+    # The pipeline prints its progress; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_movie_idea("warm-up")
+        for latency_ms in args.latency_ms:
+            simulator.latency = LatencyProfile(args.latency, median_ms=latency_ms, spread=args.spread)
+            for concurrency in args.concurrency:
+                for mode in modes:
+                    if not args.no_memory:
+                        tracemalloc.start()
+                    start = time.perf_counter()
+                    runs = run_cell(mode, prompts, concurrency)
+                    wall = time.perf_counter() - start
+                    peak = 0
+                    if not args.no_memory:
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                    results.append(report(mode, concurrency, latency_ms, runs, wall, peak))
+                    print(f"{mode} x{concurrency} at {latency_ms:.0f} ms: "
+                          f"{results[-1]['throughput_rps']} req/s", file=sys.stderr)
+    simulator.stop()
+
+    output = json.dumps({
+        "config": {
+            "requests": args.requests, "latency": args.latency, "spread": args.spread,
+            "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate,
+            "memory_traced": not args.no_memory
+        },
+        "results": results,
+        "sequential_vs_concurrent": compare(results, "sequential", "concurrent"),
+        "concurrent_vs_combined": compare(results, "concurrent", "combined")
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Latency benchmark for the ways RecommendationAgent can find recommendations.
+
+Compares, for the same genre lists:
+- engine: recommender_api's engine scored in-process (plus the one-off cold load)
+- http: the recommender service, served with uvicorn on a local port
+- llm: the chat completion call (only with --llm and an OPENAI_API_KEY)
+
+Run from the movie_idea_generator directory:
+
+    python -m benchmarks.bench_recommendations --requests 50 [--llm]
+"""
+
+import argparse
+import json
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from src.agents.recommendation_agent import RecommendationAgent
+from src.config import recommender
+from src.config.config import RECOMMENDER_CONFIG
+from src.config.secrets import OPENAI_API_KEY
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+
+def measure(recommend: Callable[[List[str]], object], queries: List[List[str]]) -> Dict[str, float]:
+    samples = []
+    for genres in queries:
+        start = time.perf_counter()
+        recommend(genres)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_service(port: int):
+    import uvicorn
+    import app.main as service
+
+    server = uvicorn.Server(uvicorn.Config(service.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--llm", action="store_true", help="also time the LLM (makes paid API calls)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = recommender.get_recommender_engine()
+    start = time.perf_counter()
+    engine.load()
+    cold_load = time.perf_counter() - start
+
+    catalog_genres = sorted({
+        genre for items in engine.load().data.values() for item in items for genre in item["genres"]
+    })
+    rng = random.Random(args.seed)
+    queries = [rng.sample(catalog_genres, rng.randint(1, 3)) for _ in range(args.requests)]
+
+    results = {
+        "requests": args.requests,
+        "engine_cold_load_ms": round(cold_load * 1000, 3),
+        "engine": measure(recommender.engine_recommendations, queries)
+    }
+
+    port = free_port()
+    server = start_service(port)
+    RECOMMENDER_CONFIG["url"] = f"http://127.0.0.1:{port}"
+    recommender.reset_recommender_client()
+    recommender.fetch_recommendations(queries[0])  # Open the pooled connection
+    results["http"] = measure(recommender.fetch_recommendations, queries)
+    server.should_exit = True
+
+    if args.llm and OPENAI_API_KEY:
+        agent = RecommendationAgent.create()
+        agent.cache = None
+        agent.mode = "llm"
+        results["llm"] = measure(agent.get_recommendations, queries)
+    else:
+        results["llm"] = "skipped (pass --llm with OPENAI_API_KEY set)"
+        if args.llm:
+            print("OPENAI_API_KEY is not set; skipping the LLM", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Load test of the HTTP service mode against the offline LLM simulator.
+
+Starts the LLM simulator and src/server.py's app with uvicorn on local ports,
+then sends --requests prompts to POST /ideas from --concurrency clients at a
+time and reports, as JSON:
+- throughput, p50/p95/p99 latency and the response status counts
+- the service's /health counters and /stats cache and rate-limit figures
+
+With --cli-runs N it also times N runs of `run.py`, one process per prompt, as
+the interactive CLI is used. Those timings include interpreter startup, imports
+and a cold connection. No network access or API key is needed.
+
+Run from the movie_idea_generator directory:
+
+    python -m benchmarks.bench_service --requests 200 --concurrency 1,16,64 --latency-ms 200 --cli-runs 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+# Keep results reproducible; set MOVIE_IDEA_CACHE_ENABLED=1 to measure with the caches
+os.environ.setdefault("MOVIE_IDEA_CACHE_ENABLED", "0")
+os.environ.setdefault("OPENAI_API_KEY", "sk-simulator")
+
+import httpx
+import uvicorn
+
+from src.config.config import LLM_CONFIG, SERVICE_CONFIG
+from src.llm_simulator import LatencyProfile, LLMSimulator
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_service(port: int) -> uvicorn.Server:
+    from src.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def load(url: str, prompts: List[str], concurrency: int, deadline_ms: float) -> Dict:
+    slots = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=None) as client:
+        async def one(prompt: str) -> None:
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post("/ideas", json={"prompt": prompt, "deadline_ms": deadline_ms})
+                samples.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(prompt) for prompt in prompts))
+        wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(prompts),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(prompts) / wall, 3),
+        "latency": percentiles(samples),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def time_cli(runs: int, base_url: str) -> Dict:
+    """
+    Time the CLI as a user runs it: a new process per prompt, answered on stdin.
+    """
+    env = dict(os.environ, OPENAI_BASE_URL=base_url)
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "run.py"], cwd=PROJECT_DIR, env=env, input=f"A story about CLI run {i}\n",
+                       capture_output=True, text=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return {"runs": runs, "latency": percentiles(samples)}
+
+
+def int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 16, 64], help="comma-separated")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median simulated LLM latency")
+    parser.add_argument("--latency", choices=LatencyProfile.KINDS, default="lognormal")
+    parser.add_argument("--deadline-ms", type=float, default=SERVICE_CONFIG["deadline_seconds"] * 1000)
+    parser.add_argument("--cli-runs", type=int, default=0, help="also time this many one-shot CLI runs")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    simulator = LLMSimulator(latency=LatencyProfile(args.latency, median_ms=args.latency_ms),
+                             seed=args.seed).start()
+    LLM_CONFIG["base_url"] = simulator.base_url
+    port = free_port()
+    server = start_service(port)
+    url = f"http://127.0.0.1:{port}"
+
+    results = []
+    # The pipeline prints its progress; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for concurrency in args.concurrency:
+            prompts = [f"A story about service request {i} at concurrency {concurrency}" for i in range(args.requests)]
+            results.append(asyncio.run(load(url, prompts, concurrency, args.deadline_ms)))
+            print(f"x{concurrency}: {results[-1]['throughput_rps']} req/s", file=sys.stderr)
+
+    health = httpx.get(f"{url}/health").json()
+    stats = httpx.get(f"{url}/stats").json()
+    server.should_exit = True
+
+    output = {
+        "config": {
+            "requests": args.requests, "latency": args.latency, "latency_ms": args.latency_ms,
+            "max_concurrency": SERVICE_CONFIG["max_concurrency"], "max_queue": SERVICE_CONFIG["max_queue"]
+        },
+        "service": results,
+        "health": health,
+        "stats": stats
+    }
+    if args.cli_runs:
+        output["cli"] = time_cli(args.cli_runs, simulator.base_url)
+    simulator.stop()
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,9 @@ os.environ["TESTING"] = "1"
 os.environ["MOVIE_IDEA_GENERATOR_TEST_MODE"] = "True"
 os.environ["OPENAI_API_KEY"] = "test_key_for_pytest_12345"
 
+# Keep persistent caches out of tests unless a test enables one explicitly
+os.environ["MOVIE_IDEA_CACHE_ENABLED"] = "0"
+
 # Create mock implementations for external dependencies
 class MockOpenAIClient:
     """Mock implementation of OpenAI client."""
@@ -177,6 +180,27 @@ def mock_create_chat_completion(messages, **kwargs):
     )
 
 
+# Mock acreate_chat_completion function
+async def mock_acreate_chat_completion(messages, **kwargs):
+    """Mock the acreate_chat_completion function."""
+    return mock_create_chat_completion(messages, **kwargs)
+
+
+# Mock stream_chat_completion function
+def mock_stream_chat_completion(messages, **kwargs):
+    """Mock the stream_chat_completion function, yielding the mock response word by word."""
+    content = mock_create_chat_completion(messages, **kwargs).choices[0].message.content
+    for word in content.split(" "):
+        yield word + " "
+
+
+# Mock astream_chat_completion function
+async def mock_astream_chat_completion(messages, **kwargs):
+    """Mock the astream_chat_completion function."""
+    for chunk in mock_stream_chat_completion(messages, **kwargs):
+        yield chunk
+
+
 # Mock modules
 sys.modules["openai"] = MagicMock()
 
@@ -185,6 +209,9 @@ try:
     import src.config.llm
     src.config.llm.get_openai_client = mock_get_openai_client
     src.config.llm.create_chat_completion = mock_create_chat_completion
+    src.config.llm.acreate_chat_completion = mock_acreate_chat_completion
+    src.config.llm.stream_chat_completion = mock_stream_chat_completion
+    src.config.llm.astream_chat_completion = mock_astream_chat_completion
     
     # Also provide a mock LLM class
     class MockLLM:
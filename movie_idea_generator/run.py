@@ -4,7 +4,14 @@ Simple entry point for the Movie Idea Generator.
 Run this script from the project root directory.
 """
 
+import sys
+
+from src.config.env import load_env
+
+# Load the .env file before the configuration is imported, so its settings apply
+load_env()
+
 from src.main import main
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(sys.argv[1:]) 
@@ -0,0 +1,163 @@
+"""Combined Agent that asks for genres, recommendations and a movie idea in one call."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from src.config.instrumentation import mark_fallback
+from src.config.llm import LLM, acreate_chat_completion, create_chat_completion
+
+RECOMMENDATION_FIELDS = ("title", "creator", "year", "description")
+
+
+class CombinedAgent:
+    """Agent that produces the whole pipeline result with a single JSON-mode chat completion."""
+
+    # Key for this agent's settings in RESILIENCE_CONFIG
+    AGENT_KEY = "combined"
+
+    # Parameters for the chat completion call; room for the idea plus the two smaller answers
+    COMPLETION_PARAMS = {
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "max_tokens": 900,
+        "response_format": {"type": "json_object"}
+    }
+
+    @classmethod
+    def create(cls):
+        """
+        Create a new combined agent.
+
+        Returns:
+            A new combined agent
+        """
+        agent = cls()
+        agent.name = "Combined Agent"
+        agent.goal = "Analyze genres, recommend a movie and a book, and generate a movie idea in one step"
+        agent.role = "Movie Development Team"
+        agent.llm = LLM()
+        return agent
+
+    def generate(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Generate genres, recommendations and a movie idea for the prompt.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            Dictionary with "genres", "recommendations" and "movie_idea" in the
+            shapes the separate agents return, or None if the call fails or the
+            response doesn't have those shapes
+        """
+        try:
+            response = create_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            )
+            result = self._parse_response(response)
+
+        except Exception as e:
+            print(f"Error generating the combined result: {e}")
+            result = None
+
+        if result is None:
+            mark_fallback(self.AGENT_KEY)
+        return result
+
+    async def generate_async(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of generate.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            The combined result, or None if the call fails or can't be parsed
+        """
+        try:
+            response = await acreate_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            )
+            result = self._parse_response(response)
+
+        except Exception as e:
+            print(f"Error generating the combined result: {e}")
+            result = None
+
+        if result is None:
+            mark_fallback(self.AGENT_KEY)
+        return result
+
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Create the messages list with the prompt.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            List of chat messages
+        """
+        return [
+            {
+                "role": "system",
+                "content": "You are a movie development team: a genre analyst, a content recommendation "
+                          "specialist and a creative movie idea generator."
+            },
+            {
+                "role": "user",
+                "content": "For the movie idea prompt below, return a JSON object with three keys:\n"
+                          "- 'genres': an array of the 2-4 most relevant genre names\n"
+                          "- 'recommendations': an object with 'movie' and 'book' objects matching those "
+                          "genres, each containing 'title', 'creator' (director/author), 'year', and "
+                          "'description'\n"
+                          "- 'movie_idea': a creative movie concept with a unique hook, twist, or mashup\n\n"
+                          f"Prompt: {prompt}"
+            }
+        ]
+
+    def _parse_response(self, response: Any) -> Optional[Dict[str, Any]]:
+        """
+        Extract and validate the combined result from a chat completion response.
+
+        Args:
+            response: The chat completion response
+
+        Returns:
+            The combined result, or None if any part is missing or malformed
+        """
+        content = response.choices[0].message.content
+        try:
+            result = json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        if not isinstance(result, dict):
+            return None
+
+        genres = _parse_genres(result.get("genres"))
+        recommendations = _parse_recommendations(result.get("recommendations"))
+        movie_idea = result.get("movie_idea")
+        if genres is None or recommendations is None or not isinstance(movie_idea, str) or not movie_idea.strip():
+            return None
+
+        return {"genres": genres, "recommendations": recommendations, "movie_idea": movie_idea.strip()}
+
+
+def _parse_genres(value: Any) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    genres = [genre.strip() for genre in value if isinstance(genre, str) and genre.strip()]
+    return genres or None
+
+
+def _parse_recommendations(value: Any) -> Optional[Dict[str, Dict[str, str]]]:
+    if not isinstance(value, dict):
+        return None
+    recommendations = {}
+    for kind in ("movie", "book"):
+        item = value.get(kind)
+        if not isinstance(item, dict) or any(item.get(field) in (None, "") for field in RECOMMENDATION_FIELDS):
+            return None
+        # Years often come back as numbers; the other agents return strings
+        recommendations[kind] = {field: str(item[field]) for field in RECOMMENDATION_FIELDS}
+    return recommendations
@@ -1,13 +1,30 @@
 """Genre Analyzer Agent for analyzing and identifying movie genres."""
 
-from typing import Dict, List, Optional
+import json
+from typing import Any, Dict, List, Optional
 
-from src.config.llm import LLM, create_chat_completion
+from src.cache.genre_cache import genre_cache_key, get_genre_cache
+from src.config.instrumentation import mark_fallback
+from src.config.llm import LLM, acreate_chat_completion, create_chat_completion
 
 
 class GenreAnalyzerAgent:
     """Agent responsible for analyzing and identifying movie genres from user input."""
 
+    # Key for this agent's settings in RESILIENCE_CONFIG
+    AGENT_KEY = "genre_analyzer"
+
+    # Parameters for the chat completion call
+    COMPLETION_PARAMS = {
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.3,
+        "max_tokens": 150,
+        "response_format": {"type": "json_object"}
+    }
+
+    # Persistent prompt -> genres cache, set by create()
+    cache = None
+
     @classmethod
     def create(cls):
         """
@@ -21,6 +38,7 @@ class GenreAnalyzerAgent:
         agent.goal = "Analyze user input to identify potential movie genres"
         agent.role = "Genre Analysis Specialist"
         agent.llm = LLM()
+        agent.cache = get_genre_cache()
         return agent
 
     def analyze_genres(self, prompt: str) -> List[str]:
@@ -33,54 +51,138 @@ class GenreAnalyzerAgent:
         Returns:
             List of identified genres
         """
+        cached = self._cached_genres(prompt)
+        if cached is not None:
+            return cached
+
         try:
-            # Create the messages list with the prompt
-            messages = [
-                {"role": "system", "content": "You are a genre analysis specialist for movies."},
-                {
-                    "role": "user", 
-                    "content": f"Analyze this movie idea prompt and identify the most relevant genres. "
-                              f"Return only a JSON array of genre names (2-4 genres): {prompt}"
-                }
-            ]
-            
             # Get completion using create_chat_completion
             response = create_chat_completion(
-                messages=messages,
-                model="gpt-3.5-turbo",
-                temperature=0.3,
-                max_tokens=150,
-                response_format={"type": "json_object"}
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
             )
-            
-            # Extract and format the genres
-            content = response.choices[0].message.content
-            
-            # Try to parse the JSON response
-            try:
-                import json
-                result = json.loads(content)
-                genres = result.get("genres", [])
-                if not genres:  # If "genres" key is not found, try to get the first array in the response
-                    for key, value in result.items():
-                        if isinstance(value, list):
-                            genres = value
-                            break
-                
-                return genres if genres else self._default_genres()
-            except json.JSONDecodeError:
-                # If JSON parsing fails, return default genres
-                return self._default_genres()
-            
+            genres = self._parse_response(response)
+
         except Exception as e:
             print(f"Error analyzing genres: {e}")
+            mark_fallback(self.AGENT_KEY)
             return self._default_genres()
-            
+
+        return self._store_genres(prompt, genres)
+
+    async def analyze_genres_async(self, prompt: str) -> List[str]:
+        """
+        Async variant of analyze_genres.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            List of identified genres
+        """
+        cached = self._cached_genres(prompt)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await acreate_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            )
+            genres = self._parse_response(response)
+
+        except Exception as e:
+            print(f"Error analyzing genres: {e}")
+            mark_fallback(self.AGENT_KEY)
+            return self._default_genres()
+
+        return self._store_genres(prompt, genres)
+
+    def _cache_key(self, prompt: str) -> str:
+        return genre_cache_key(prompt, self.COMPLETION_PARAMS["model"], self.COMPLETION_PARAMS["temperature"])
+
+    def _cached_genres(self, prompt: str) -> Optional[List[str]]:
+        """
+        Look up previously analyzed genres for the prompt.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            The cached genres, or None on a miss or when caching is disabled
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(prompt))
+
+    def _store_genres(self, prompt: str, genres: Optional[List[str]]) -> List[str]:
+        """
+        Cache successfully parsed genres; fall back to the defaults, uncached, otherwise.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+            genres: The parsed genres, or None if the response could not be parsed
+
+        Returns:
+            The genres to use
+        """
+        if not genres:
+            mark_fallback(self.AGENT_KEY)
+            return self._default_genres()
+        if self.cache is not None:
+            self.cache.set(self._cache_key(prompt), genres)
+        return genres
+
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Create the messages list with the prompt.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            List of chat messages
+        """
+        return [
+            {"role": "system", "content": "You are a genre analysis specialist for movies."},
+            {
+                "role": "user",
+                "content": f"Analyze this movie idea prompt and identify the most relevant genres. "
+                          f"Return only a JSON array of genre names (2-4 genres): {prompt}"
+            }
+        ]
+
+    def _parse_response(self, response: Any) -> Optional[List[str]]:
+        """
+        Extract the genres from a chat completion response.
+
+        Args:
+            response: The chat completion response
+
+        Returns:
+            List of identified genres, or None if none can be parsed
+        """
+        # Extract and format the genres
+        content = response.choices[0].message.content
+
+        # Try to parse the JSON response
+        try:
+            result = json.loads(content)
+            genres = result.get("genres", [])
+            if not genres:  # If "genres" key is not found, try to get the first array in the response
+                for key, value in result.items():
+                    if isinstance(value, list):
+                        genres = value
+                        break
+
+            return genres or None
+        except json.JSONDecodeError:
+            # If JSON parsing fails, the caller falls back to the default genres
+            return None
+
     def _default_genres(self) -> List[str]:
         """
         Provide default genres when API calls fail.
-        
+
         Returns:
             List of default genres
         """
-        return ["Drama", "Adventure", "Comedy"] 
\ No newline at end of file
+        return ["Drama", "Adventure", "Comedy"]
@@ -1,14 +1,32 @@
 """Idea Generator Agent for generating movie ideas."""
 
 import json
-from typing import Dict, Optional
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
 
-from src.config.llm import LLM, create_chat_completion
+from src.config.instrumentation import mark_fallback
+from src.config.llm import (
+    LLM,
+    acreate_chat_completion,
+    astream_chat_completion,
+    create_chat_completion,
+    stream_chat_completion,
+)
 
 
 class IdeaGeneratorAgent:
     """Agent responsible for generating creative movie ideas."""
 
+    # Key for this agent's settings in RESILIENCE_CONFIG
+    AGENT_KEY = "idea_generator"
+
+    # Parameters for the chat completion call
+    COMPLETION_PARAMS = {
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.8,
+        "max_tokens": 500
+    }
+
     @classmethod
     def create(cls):
         """
@@ -24,33 +42,29 @@ class IdeaGeneratorAgent:
         agent.llm = LLM()
         return agent
 
-    def generate_idea(self, prompt: str) -> Dict[str, str]:
+    def generate_idea(self, prompt: str, on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
         """
         Generate a movie idea based on the prompt.
 
         Args:
             prompt: The user's prompt for a movie idea
+            on_chunk: If given, the idea is streamed and each chunk of text is
+                passed to this callback as soon as it arrives
 
         Returns:
             Dictionary with the movie idea
         """
+        if on_chunk is not None:
+            chunks = []
+            for chunk in self.stream_idea(prompt):
+                on_chunk(chunk)
+                chunks.append(chunk)
+            return {"movie_idea": "".join(chunks)}
+
         try:
-            # Create the messages list with the prompt
-            messages = [
-                {"role": "system", "content": "You are a creative movie idea generator."},
-                {
-                    "role": "user", 
-                    "content": "Brainstorm creative movie concept ideas based on this prompt. "
-                              "Focus on unique hooks, twists, or mashups that could make an interesting film: " + prompt
-                }
-            ]
-            
             # Get completion using create_chat_completion
             response = create_chat_completion(
-                messages=messages,
-                model="gpt-3.5-turbo",
-                temperature=0.8,
-                max_tokens=500
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
             )
             
             # Extract and format the idea
@@ -61,7 +75,111 @@ class IdeaGeneratorAgent:
         except Exception as e:
             print(f"Error generating movie idea: {e}")
             # Return a default response if generation fails
+            mark_fallback(self.AGENT_KEY)
             return self._create_default_idea()
+
+    async def generate_idea_async(self, prompt: str) -> Dict[str, str]:
+        """
+        Async variant of generate_idea.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            Dictionary with the movie idea
+        """
+        try:
+            response = await acreate_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            )
+            return {"movie_idea": response.choices[0].message.content}
+            
+        except Exception as e:
+            print(f"Error generating movie idea: {e}")
+            mark_fallback(self.AGENT_KEY)
+            return self._create_default_idea()
+
+    def stream_idea(self, prompt: str, timing: Optional[Dict[str, Optional[float]]] = None) -> Iterator[str]:
+        """
+        Generate a movie idea, yielding its text in chunks as the model writes it.
+
+        If the call fails before any text arrives, the default idea is yielded instead.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+            timing: If given, filled with time_to_first_token_ms and total_ms
+                once the iterator is exhausted
+
+        Returns:
+            Iterator of idea text chunks
+        """
+        stream_timing = _StreamTiming()
+        try:
+            for chunk in stream_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            ):
+                stream_timing.chunk()
+                yield chunk
+
+        except Exception as e:
+            print(f"Error generating movie idea: {e}")
+            if not stream_timing.started:
+                stream_timing.chunk()
+                mark_fallback(self.AGENT_KEY)
+                yield self._create_default_idea()["movie_idea"]
+        finally:
+            if timing is not None:
+                timing.update(stream_timing.finish())
+
+    async def astream_idea(self, prompt: str,
+                           timing: Optional[Dict[str, Optional[float]]] = None) -> AsyncIterator[str]:
+        """
+        Async variant of stream_idea.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+            timing: If given, filled with time_to_first_token_ms and total_ms
+                once the iterator is exhausted
+
+        Returns:
+            Async iterator of idea text chunks
+        """
+        stream_timing = _StreamTiming()
+        try:
+            async for chunk in astream_chat_completion(
+                messages=self._build_messages(prompt), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            ):
+                stream_timing.chunk()
+                yield chunk
+
+        except Exception as e:
+            print(f"Error generating movie idea: {e}")
+            if not stream_timing.started:
+                stream_timing.chunk()
+                mark_fallback(self.AGENT_KEY)
+                yield self._create_default_idea()["movie_idea"]
+        finally:
+            if timing is not None:
+                timing.update(stream_timing.finish())
+
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Create the messages list with the prompt.
+
+        Args:
+            prompt: The user's prompt for a movie idea
+
+        Returns:
+            List of chat messages
+        """
+        return [
+            {"role": "system", "content": "You are a creative movie idea generator."},
+            {
+                "role": "user", 
+                "content": "Brainstorm creative movie concept ideas based on this prompt. "
+                          "Focus on unique hooks, twists, or mashups that could make an interesting film: " + prompt
+            }
+        ]
             
     def _create_default_idea(self) -> Dict[str, str]:
         """
@@ -73,4 +191,27 @@ class IdeaGeneratorAgent:
         return {
             "movie_idea": "A person discovers they can communicate with objects, "
             "leading to unexpected adventures and insights into the human condition."
-        } 
\ No newline at end of file
+        }
+
+
+class _StreamTiming:
+    """Measures time to first chunk and total time of a streamed idea."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_chunk = None
+
+    @property
+    def started(self) -> bool:
+        return self.first_chunk is not None
+
+    def chunk(self) -> None:
+        if self.first_chunk is None:
+            self.first_chunk = time.perf_counter()
+
+    def finish(self) -> Dict[str, Optional[float]]:
+        end = time.perf_counter()
+        return {
+            "time_to_first_token_ms": (self.first_chunk - self.start) * 1000 if self.started else None,
+            "total_ms": (end - self.start) * 1000
+        }
@@ -1,13 +1,37 @@
 """Recommendation Agent for suggesting movies and books."""
 
-from typing import Dict, List, Optional
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
 
-from src.config.llm import LLM, create_chat_completion
+from src.cache.recommendation_cache import get_recommendation_cache
+from src.config.config import RECOMMENDER_CONFIG
+from src.config.instrumentation import mark_fallback
+from src.config.llm import LLM, acreate_chat_completion, create_chat_completion
+from src.config.recommender import afetch_recommendations, engine_recommendations, fetch_recommendations
 
 
 class RecommendationAgent:
     """Agent responsible for recommending movies and books based on genres."""
 
+    # Key for this agent's settings in RESILIENCE_CONFIG
+    AGENT_KEY = "recommendation"
+
+    # Parameters for the chat completion call
+    COMPLETION_PARAMS = {
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "max_tokens": 500,
+        "response_format": {"type": "json_object"}
+    }
+
+    # Genre set -> recommendations cache, set by create()
+    cache = None
+
+    # "llm" asks the model; "catalog" asks the recommender service first and
+    # "engine" scores the recommender's catalog in-process first
+    mode = "llm"
+
     @classmethod
     def create(cls):
         """
@@ -21,6 +45,8 @@ class RecommendationAgent:
         agent.goal = "Recommend relevant movies and books based on genre analysis"
         agent.role = "Content Recommendation Specialist"
         agent.llm = LLM()
+        agent.cache = get_recommendation_cache()
+        agent.mode = RECOMMENDER_CONFIG["mode"]
         return agent
 
     def get_recommendations(self, genres: List[str]) -> Dict[str, Dict[str, str]]:
@@ -33,55 +59,184 @@ class RecommendationAgent:
         Returns:
             Dictionary with movie and book recommendations
         """
+        cached = self._cached_recommendations(genres)
+        if cached is not None:
+            return cached
+
+        catalog = self._catalog_recommendations(genres)
+        if catalog is not None:
+            return catalog
+
         try:
-            # Create the messages list with the prompt
-            genre_text = ", ".join(genres)
-            messages = [
-                {"role": "system", "content": "You are a content recommendation specialist."},
-                {
-                    "role": "user", 
-                    "content": f"Recommend one movie and one book that match these genres: {genre_text}. "
-                              f"Return a JSON object with 'movie' and 'book' objects, each containing 'title', "
-                              f"'creator' (director/author), 'year', and 'description'."
-                }
-            ]
-            
             # Get completion using create_chat_completion
             response = create_chat_completion(
-                messages=messages,
-                model="gpt-3.5-turbo",
-                temperature=0.7,
-                max_tokens=500,
-                response_format={"type": "json_object"}
+                messages=self._build_messages(genres), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
             )
+            recommendations = self._parse_response(response)
             
-            # Extract and format the recommendations
-            content = response.choices[0].message.content
-            
-            # Try to parse the JSON response
-            try:
-                import json
-                result = json.loads(content)
-                
-                # Validate and extract recommendations
-                movie = result.get("movie", {})
-                book = result.get("book", {})
-                
-                if not movie or not book:
-                    return self._default_recommendations()
-                
-                return {
-                    "movie": movie,
-                    "book": book
-                }
-                
-            except json.JSONDecodeError:
-                # If JSON parsing fails, return default recommendations
-                return self._default_recommendations()
+        except Exception as e:
+            print(f"Error getting recommendations: {e}")
+            mark_fallback(self.AGENT_KEY)
+            return self._default_recommendations()
+
+        return self._store_recommendations(genres, recommendations)
+
+    async def get_recommendations_async(self, genres: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Async variant of get_recommendations.
+
+        Args:
+            genres: List of genres to use for recommendations
+
+        Returns:
+            Dictionary with movie and book recommendations
+        """
+        cached = self._cached_recommendations(genres)
+        if cached is not None:
+            return cached
+
+        catalog = await self._catalog_recommendations_async(genres)
+        if catalog is not None:
+            return catalog
+
+        try:
+            response = await acreate_chat_completion(
+                messages=self._build_messages(genres), agent=self.AGENT_KEY, **self.COMPLETION_PARAMS
+            )
+            recommendations = self._parse_response(response)
             
         except Exception as e:
             print(f"Error getting recommendations: {e}")
+            mark_fallback(self.AGENT_KEY)
+            return self._default_recommendations()
+
+        return self._store_recommendations(genres, recommendations)
+
+    def _catalog_recommendations(self, genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Look up recommendations in the recommender's catalog, if the mode uses it.
+
+        Args:
+            genres: List of genres to use for recommendations
+
+        Returns:
+            The catalog recommendations, or None on a miss, an error or in "llm" mode
+        """
+        try:
+            if self.mode == "catalog":
+                return fetch_recommendations(genres)
+            if self.mode == "engine":
+                return engine_recommendations(genres)
+        except Exception as e:
+            print(f"Recommender {self.mode} unavailable, asking the LLM: {e}")
+        return None
+
+    async def _catalog_recommendations_async(self, genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Async variant of _catalog_recommendations.
+
+        Args:
+            genres: List of genres to use for recommendations
+
+        Returns:
+            The catalog recommendations, or None on a miss, an error or in "llm" mode
+        """
+        try:
+            if self.mode == "catalog":
+                return await afetch_recommendations(genres)
+            if self.mode == "engine":
+                # Scoring is CPU-bound and the first call loads the catalog, so keep it off the event loop
+                return await asyncio.get_running_loop().run_in_executor(None, engine_recommendations, genres)
+        except Exception as e:
+            print(f"Recommender {self.mode} unavailable, asking the LLM: {e}")
+        return None
+
+    def _cached_recommendations(self, genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Look up previous recommendations for the genre set.
+
+        Args:
+            genres: List of genres to use for recommendations
+
+        Returns:
+            The cached recommendations, or None on a miss or when caching is disabled
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(genres)
+
+    def _store_recommendations(self, genres: List[str],
+                               recommendations: Optional[Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """
+        Cache successfully parsed recommendations; fall back to the defaults, uncached, otherwise.
+
+        Args:
+            genres: List of genres to use for recommendations
+            recommendations: The parsed recommendations, or None if the response could not be parsed
+
+        Returns:
+            The recommendations to use
+        """
+        if recommendations is None:
+            mark_fallback(self.AGENT_KEY)
             return self._default_recommendations()
+        if self.cache is not None:
+            self.cache.add(genres, recommendations)
+        return recommendations
+
+    def _build_messages(self, genres: List[str]) -> List[Dict[str, str]]:
+        """
+        Create the messages list with the genres.
+
+        Args:
+            genres: List of genres to use for recommendations
+
+        Returns:
+            List of chat messages
+        """
+        genre_text = ", ".join(genres)
+        return [
+            {"role": "system", "content": "You are a content recommendation specialist."},
+            {
+                "role": "user", 
+                "content": f"Recommend one movie and one book that match these genres: {genre_text}. "
+                          f"Return a JSON object with 'movie' and 'book' objects, each containing 'title', "
+                          f"'creator' (director/author), 'year', and 'description'."
+            }
+        ]
+
+    def _parse_response(self, response: Any) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Extract the recommendations from a chat completion response.
+
+        Args:
+            response: The chat completion response
+
+        Returns:
+            Dictionary with movie and book recommendations, or None if they can't be parsed
+        """
+        # Extract and format the recommendations
+        content = response.choices[0].message.content
+        
+        # Try to parse the JSON response
+        try:
+            result = json.loads(content)
+            
+            # Validate and extract recommendations
+            movie = result.get("movie", {})
+            book = result.get("book", {})
+            
+            if not movie or not book:
+                return None
+            
+            return {
+                "movie": movie,
+                "book": book
+            }
+            
+        except json.JSONDecodeError:
+            # If JSON parsing fails, the caller falls back to the default recommendations
+            return None
             
     def _default_recommendations(self) -> Dict[str, Dict[str, str]]:
         """
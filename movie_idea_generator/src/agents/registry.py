@@ -0,0 +1,63 @@
+"""Shared agent instances reused by every pipeline run in the process."""
+
+import threading
+import time
+from typing import Any, Dict, Type, TypeVar
+
+AgentT = TypeVar("AgentT")
+
+# One instance per agent class, created lazily by get_agent()
+_agents: Dict[type, Any] = {}
+_agents_lock = threading.Lock()
+_setup = {"created": 0, "setup_ms": 0.0}
+
+
+def get_agent(agent_class: Type[AgentT]) -> AgentT:
+    """
+    Get the shared instance of an agent class, creating it on first use.
+
+    Agents keep their configuration on the instance and everything about a
+    request in local variables, so one instance can serve concurrent runs in
+    threads and event loops.
+
+    Args:
+        agent_class: The agent class, built with its create() classmethod
+
+    Returns:
+        The shared agent
+    """
+    agent = _agents.get(agent_class)
+    if agent is not None:
+        return agent
+    with _agents_lock:
+        agent = _agents.get(agent_class)
+        if agent is None:
+            start = time.perf_counter()
+            agent = agent_class.create()
+            _setup["setup_ms"] += (time.perf_counter() - start) * 1000
+            _setup["created"] += 1
+            _agents[agent_class] = agent
+    return agent
+
+
+def get_registry_stats() -> Dict[str, Any]:
+    """
+    Report which agents have been created and how long creating them took.
+
+    Returns:
+        Dictionary with the agent class names, the number created and the total setup time
+    """
+    with _agents_lock:
+        return {
+            "agents": sorted(agent_class.__name__ for agent_class in _agents),
+            "created": _setup["created"],
+            "setup_ms": _setup["setup_ms"]
+        }
+
+
+def reset_agents() -> None:
+    """
+    Drop the shared agents so the next runs create them again, e.g. after changing their configuration.
+    """
+    with _agents_lock:
+        _agents.clear()
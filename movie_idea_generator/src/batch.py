@@ -0,0 +1,143 @@
+"""
+Bulk movie idea generation from a JSONL file of prompts.
+
+Each input line is either a JSON string or an object with a "prompt" and an
+optional "id" (the line number otherwise). Results are appended to the output as
+JSONL in completion order, one object per prompt with its "id", so an interrupted
+run can be resumed by pointing it at the same output file: prompts with a
+successful result there are skipped, and failed ones are retried.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, TextIO
+
+from src.main import generate_movie_idea_async
+
+
+def read_prompts(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse prompts from JSONL lines.
+
+    Args:
+        lines: Lines of a JSONL file
+
+    Returns:
+        Iterator of {"id", "prompt"} dictionaries
+
+    Raises:
+        ValueError: If a line is not a JSON string or an object with a "prompt"
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"prompt": item}
+        if not isinstance(item, dict) or not isinstance(item.get("prompt"), str):
+            raise ValueError(f"Line {line_number}: expected a JSON string or an object with a 'prompt'")
+        yield {"id": item.get("id", line_number), "prompt": item["prompt"]}
+
+
+def completed_ids(path: str) -> Set[Any]:
+    """
+    Find the prompts that already have a successful result in an output file.
+
+    Args:
+        path: Path of a JSONL output file from an earlier run
+
+    Returns:
+        The ids of the completed prompts (empty if the file does not exist)
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short when the previous run was interrupted
+                continue
+            if isinstance(record, dict) and "error" not in record:
+                done.add(record.get("id"))
+    return done
+
+
+def _ends_mid_line(path: str) -> bool:
+    if os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+async def run_batch(prompts: Iterable[Dict[str, Any]], output: TextIO, concurrency: int,
+                    skip: Optional[Set[Any]] = None) -> Dict[str, int]:
+    """
+    Run the pipeline for every prompt with at most `concurrency` in flight.
+
+    Args:
+        prompts: {"id", "prompt"} dictionaries, consumed lazily
+        output: Stream the JSONL results are written to as they complete
+        concurrency: Maximum number of prompts generated at once
+        skip: Ids of prompts to leave out
+
+    Returns:
+        Dictionary with the number of prompts completed, failed and skipped
+    """
+    skip = skip or set()
+    counts = {"completed": 0, "failed": 0, "skipped": 0}
+    pending = iter(prompts)
+
+    async def worker():
+        # Workers share one iterator, so only `concurrency` prompts are ever in memory
+        for item in pending:
+            if item["id"] in skip:
+                counts["skipped"] += 1
+                continue
+            try:
+                record = {"id": item["id"], **await generate_movie_idea_async(item["prompt"])}
+                counts["completed"] += 1
+            except Exception as e:
+                record = {"id": item["id"], "user_prompt": item["prompt"], "error": str(e)}
+                counts["failed"] += 1
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return counts
+
+
+def run_batch_file(input_path: str, output_path: Optional[str], concurrency: int) -> Dict[str, int]:
+    """
+    Run a batch from a JSONL file (or "-" for stdin) to a JSONL file (or stdout).
+
+    Args:
+        input_path: Path of the prompts file, or "-" to read stdin
+        output_path: Path of the results file, resumed if it exists; None writes to stdout
+        concurrency: Maximum number of prompts generated at once
+
+    Returns:
+        Dictionary with the number of prompts completed, failed and skipped
+    """
+    source = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    try:
+        if output_path is None:
+            # The results own stdout; send the agents' diagnostics to stderr so they don't corrupt the JSONL
+            results = sys.stdout
+            with contextlib.redirect_stdout(sys.stderr):
+                return asyncio.run(run_batch(read_prompts(source), results, concurrency))
+
+        skip = completed_ids(output_path)
+        with open(output_path, "a", encoding="utf-8") as output:
+            # Start on a fresh line if the previous run stopped mid-write
+            if _ends_mid_line(output_path):
+                output.write("\n")
+            return asyncio.run(run_batch(read_prompts(source), output, concurrency, skip))
+    finally:
+        if source is not sys.stdin:
+            source.close()
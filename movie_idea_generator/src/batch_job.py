@@ -0,0 +1,509 @@
+"""
+Offline bulk movie idea generation through a batch-style LLM API.
+
+For overnight runs of many prompts, the agents' chat completions are compiled
+into request files in the OpenAI Batch API's JSONL format and submitted through
+a BatchBackend instead of being sent one at a time. Batches are billed at a
+discount and don't count against the interactive rate limits. Recommendations
+depend on the genres, so the requests go out in two waves:
+
+1. the genre analysis and the movie idea for every prompt
+2. the recommendations for every distinct genre set found in wave 1
+
+Each wave is polled until its batches finish, and the answers are then stitched
+into one result per prompt, in the same JSONL format as src/batch.py. Answers
+that can't be parsed fall back to the agents' defaults, as in the interactive
+pipeline. Prompts without an answer (a request that errored, or a batch that
+expired) get an "error" record, so re-running the job retries them. Genres and
+recommendations already in the agents' caches are not requested again.
+
+Request files and submitted batch ids are kept in a work directory, keyed on
+the prompts of the run. A run of the same prompts interrupted while waiting
+resumes polling the batches it already submitted instead of paying for them
+again, even though the answers it stitched before stopping are now cached.
+
+OpenAIBatchBackend submits to the OpenAI Batch API. LocalBatchBackend is a
+file-based stand-in that answers each request with an ordinary chat completion,
+e.g. from src/llm_simulator.py, for testing without the Batch API.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.agents.idea_generator_agent import IdeaGeneratorAgent
+from src.agents.recommendation_agent import RecommendationAgent
+from src.agents.registry import get_agent
+from src.batch import _ends_mid_line, completed_ids, read_prompts
+from src.cache.recommendation_cache import genre_set_key
+from src.config.config import JOB_CONFIG
+from src.config.llm import create_chat_completion, get_openai_client
+
+# Batch statuses after which nothing more will be answered
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchBackend(ABC):
+    """Interface of a batch LLM API: submit a request file, poll its status and read its answers."""
+
+    @abstractmethod
+    def submit(self, requests_path: str) -> str:
+        """
+        Submit a JSONL file of requests.
+
+        Args:
+            requests_path: File with one {"custom_id", "method", "url", "body"} request per line
+
+        Returns:
+            The batch id
+        """
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """
+        Get the status of a batch, one of TERMINAL_STATUSES once it has finished.
+        """
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read the answers of a finished batch.
+
+        Returns:
+            Iterator of {"custom_id", "response": {"status_code", "body"}, "error"} records
+        """
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Backend for the OpenAI Batch API, using the shared OpenAI client unless given one."""
+
+    def __init__(self, client: Any = None, completion_window: str = JOB_CONFIG["completion_window"]):
+        self._client = client
+        self.completion_window = completion_window
+
+    @property
+    def client(self) -> Any:
+        return self._client or get_openai_client()
+
+    def submit(self, requests_path: str) -> str:
+        with open(requests_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(batch_id)
+        # Answered requests are in the output file and failed ones in the error file
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in self.client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        yield json.loads(line)
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    File-based stand-in for a batch API.
+
+    Each batch is a directory holding its requests, status and answers. The
+    requests are answered when the batch is polled for the first time after
+    `polls_before_done` polls, each by `respond` (an ordinary chat completion
+    by default).
+    """
+
+    def __init__(self, directory: str, respond: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 polls_before_done: int = 0, concurrency: int = 8):
+        self.directory = Path(directory)
+        self.respond = respond or _chat_completion_body
+        self.polls_before_done = polls_before_done
+        self.concurrency = concurrency
+
+    def submit(self, requests_path: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        batch_dir = self.directory / batch_id
+        batch_dir.mkdir(parents=True)
+        shutil.copyfile(requests_path, batch_dir / "input.jsonl")
+        _write_json(batch_dir / "status.json", {"status": "in_progress", "polls": 0})
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch_dir = self.directory / batch_id
+        state = _read_json(batch_dir / "status.json")
+        if state["status"] == "in_progress":
+            state["polls"] += 1
+            if state["polls"] > self.polls_before_done:
+                self._answer(batch_dir)
+                state["status"] = "completed"
+            _write_json(batch_dir / "status.json", state)
+        return state["status"]
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        with open(self.directory / batch_id / "output.jsonl", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _answer(self, batch_dir: Path) -> None:
+        with open(batch_dir / "input.jsonl", encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            records = list(pool.map(self._answer_one, requests))
+        with open(batch_dir / "output.jsonl", "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def _answer_one(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            body = self.respond(request["body"])
+            return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+
+def _chat_completion_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer a batch request body with a chat completion, in the shape of the API's response body.
+    """
+    response = create_chat_completion(**body)
+    return {
+        "object": "chat.completion",
+        "model": body.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": response.choices[0].message.content},
+            "finish_reason": "stop"
+        }]
+    }
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    # Write then rename, so an interrupted run never leaves a half-written file
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def get_batch_backend(name: str, work_dir: str) -> BatchBackend:
+    """
+    Create the batch backend for a name from JOB_CONFIG["backend"].
+
+    Args:
+        name: "openai" or "local"
+        work_dir: The job's work directory, which also holds the local backend's batches
+
+    Returns:
+        The backend
+    """
+    if name == "openai":
+        return OpenAIBatchBackend()
+    if name == "local":
+        return LocalBatchBackend(os.path.join(work_dir, "local_batches"))
+    raise ValueError(f"Unknown batch backend: {name}")
+
+
+def _request(custom_id: str, agent: Any, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {**agent.COMPLETION_PARAMS, "messages": messages}
+    }
+
+
+def _recommendations_id(key: str) -> str:
+    # Named after the genre set rather than its position, which can change when a wave is resumed
+    return "recommendations:" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _answer_content(record: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the message text from a batch answer, or None if the request failed.
+    """
+    response = record.get("response") or {}
+    if record.get("error") or response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _as_response(content: str) -> Any:
+    # The agents parse chat completion objects; give them one holding the batch answer
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def wait_for_batch(backend: BatchBackend, batch_id: str, poll_seconds: float) -> str:
+    """
+    Poll a batch until it finishes.
+
+    Args:
+        backend: The backend the batch was submitted to
+        batch_id: The batch id
+        poll_seconds: Seconds to wait between polls
+
+    Returns:
+        The final status
+    """
+    status = backend.status(batch_id)
+    while status not in TERMINAL_STATUSES:
+        time.sleep(poll_seconds)
+        status = backend.status(batch_id)
+    return status
+
+
+def _job_key(items: List[Dict[str, Any]]) -> str:
+    """
+    Identify a run by its prompts, so a re-run of the same prompts finds its waves.
+    """
+    prompts = json.dumps([[item["id"], item["prompt"]] for item in items])
+    return hashlib.sha256(prompts.encode("utf-8")).hexdigest()
+
+
+def run_wave(backend: BatchBackend, work_dir: str, name: str, job_key: str, requests: List[Dict[str, Any]],
+             poll_seconds: float, max_requests_per_batch: int) -> Tuple[Dict[str, Optional[str]], int]:
+    """
+    Submit one wave of requests, wait for it and collect the answers.
+
+    The wave's request files are written to the work directory, and its batch
+    ids are saved there as each batch is submitted. If an earlier, interrupted
+    run with the same job key got as far as this wave and didn't finish (see
+    clear_wave), its request files are
+    used instead of `requests` and its batches are polled instead of being
+    submitted again. The requests can differ between the runs because the
+    first run cached the answers it had stitched.
+
+    Args:
+        backend: The batch backend
+        work_dir: Directory for the request files and the wave's state
+        name: Name of the wave, used for its files
+        job_key: Identifies the run's prompts, from _job_key
+        requests: Batch requests with unique custom ids
+        poll_seconds: Seconds to wait between polls
+        max_requests_per_batch: Requests per batch file
+
+    Returns:
+        The message text of each answered custom id (None for requests that
+        failed), and the number of requests submitted by this call
+
+    Raises:
+        RuntimeError: If a batch failed as a whole, e.g. because its file was rejected
+    """
+    state_path = Path(work_dir) / f"{name}.json"
+    state = _read_json(state_path) if state_path.exists() else None
+    if state is None or state["job_key"] != job_key:
+        if not requests:
+            return {}, 0
+        os.makedirs(work_dir, exist_ok=True)
+        lines = [json.dumps(request) + "\n" for request in requests]
+        state = {"job_key": job_key, "files": [], "batch_ids": []}
+        for start in range(0, len(lines), max_requests_per_batch):
+            path = Path(work_dir) / f"{name}-{len(state['files'])}.requests.jsonl"
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(lines[start:start + max_requests_per_batch])
+            state["files"].append(str(path))
+        _write_json(state_path, state)
+
+    submitted = 0
+    for path in state["files"][len(state["batch_ids"]):]:
+        state["batch_ids"].append(backend.submit(path))
+        _write_json(state_path, state)
+        with open(path, encoding="utf-8") as f:
+            submitted += sum(1 for line in f if line.strip())
+    print(f"{name}: batches {', '.join(state['batch_ids'])}", file=sys.stderr)
+
+    answers = {}
+    for batch_id in state["batch_ids"]:
+        status = wait_for_batch(backend, batch_id, poll_seconds)
+        if status == "failed":
+            raise RuntimeError(f"Batch {batch_id} failed")
+        for record in backend.results(batch_id):
+            answers[record["custom_id"]] = _answer_content(record)
+    return answers, submitted
+
+
+def clear_wave(work_dir: str, name: str) -> None:
+    """
+    Remove a wave's state and request files, so a later run submits it afresh.
+
+    Args:
+        work_dir: Directory for the request files and the wave's state
+        name: Name of the wave
+    """
+    state_path = Path(work_dir) / f"{name}.json"
+    if not state_path.exists():
+        return
+    for path in _read_json(state_path)["files"]:
+        Path(path).unlink(missing_ok=True)
+    state_path.unlink()
+
+
+def run_job(prompts: Iterable[Dict[str, Any]], output: TextIO, backend: BatchBackend, work_dir: str,
+            skip: Optional[Set[Any]] = None, poll_seconds: float = JOB_CONFIG["poll_seconds"],
+            max_requests_per_batch: int = JOB_CONFIG["max_requests_per_batch"]) -> Dict[str, int]:
+    """
+    Generate movie ideas for every prompt through a batch backend, in two waves.
+
+    Args:
+        prompts: {"id", "prompt"} dictionaries
+        output: Stream the JSONL results are written to
+        backend: The batch backend
+        work_dir: Directory for the job's request files and state
+        skip: Ids of prompts to leave out
+        poll_seconds: Seconds to wait between polls
+        max_requests_per_batch: Requests per batch file
+
+    Returns:
+        Dictionary with the number of prompts completed, failed and skipped, and the requests submitted
+    """
+    skip = skip or set()
+    prompts = list(prompts)
+    items = [item for item in prompts if item["id"] not in skip]
+    counts = {"completed": 0, "failed": 0, "skipped": len(prompts) - len(items), "requests": 0}
+    job_key = _job_key(items)
+
+    genre_analyzer = get_agent(GenreAnalyzerAgent)
+    recommendation_agent = get_agent(RecommendationAgent)
+    idea_generator = get_agent(IdeaGeneratorAgent)
+
+    # Wave 1: genres and ideas only need the prompt
+    genres: Dict[int, List[str]] = {}
+    requests = []
+    for index, item in enumerate(items):
+        cached = genre_analyzer._cached_genres(item["prompt"])
+        if cached:
+            genres[index] = cached
+        else:
+            requests.append(_request(f"{index}:genres", genre_analyzer, genre_analyzer._build_messages(item["prompt"])))
+        requests.append(_request(f"{index}:idea", idea_generator, idea_generator._build_messages(item["prompt"])))
+    first_wave, submitted = run_wave(backend, work_dir, "wave1", job_key, requests,
+                                     poll_seconds, max_requests_per_batch)
+    counts["requests"] += submitted
+
+    errors: Dict[int, str] = {}
+    for index, item in enumerate(items):
+        if index in genres:
+            continue
+        content = first_wave.get(f"{index}:genres")
+        if content is None:
+            errors[index] = "No answer to the genre analysis request"
+        else:
+            parsed = genre_analyzer._parse_response(_as_response(content))
+            genres[index] = genre_analyzer._store_genres(item["prompt"], parsed)
+
+    # Wave 2: one recommendation request per distinct genre set
+    recommendations: Dict[str, Dict[str, Dict[str, str]]] = {}
+    requests = []
+    genre_sets: Dict[str, List[str]] = {}
+    for index, prompt_genres in genres.items():
+        key = genre_set_key(prompt_genres)
+        if key in genre_sets or key in recommendations:
+            continue
+        cached = recommendation_agent._cached_recommendations(prompt_genres)
+        if cached is not None:
+            recommendations[key] = cached
+        else:
+            genre_sets[key] = prompt_genres
+            requests.append(_request(_recommendations_id(key), recommendation_agent,
+                                     recommendation_agent._build_messages(prompt_genres)))
+    second_wave, submitted = run_wave(backend, work_dir, "wave2", job_key, requests,
+                                      poll_seconds, max_requests_per_batch)
+    counts["requests"] += submitted
+
+    for key, set_genres in genre_sets.items():
+        content = second_wave.get(_recommendations_id(key))
+        if content is not None:
+            parsed = recommendation_agent._parse_response(_as_response(content))
+            recommendations[key] = recommendation_agent._store_recommendations(set_genres, parsed)
+
+    # Stitch the answers into one result per prompt
+    for index, item in enumerate(items):
+        idea = first_wave.get(f"{index}:idea")
+        if index not in errors and genre_set_key(genres[index]) not in recommendations:
+            errors[index] = "No answer to the recommendation request"
+        if index not in errors and idea is None:
+            errors[index] = "No answer to the movie idea request"
+
+        if index in errors:
+            record = {"id": item["id"], "user_prompt": item["prompt"], "error": errors[index]}
+            counts["failed"] += 1
+        else:
+            record = {
+                "id": item["id"],
+                "user_prompt": item["prompt"],
+                "genres": genres[index],
+                "recommendations": recommendations[genre_set_key(genres[index])],
+                "movie_idea": idea or idea_generator._create_default_idea()["movie_idea"]
+            }
+            counts["completed"] += 1
+        output.write(json.dumps(record) + "\n")
+    output.flush()
+
+    # The results are written, so a re-run of the same prompts is a new job
+    clear_wave(work_dir, "wave1")
+    clear_wave(work_dir, "wave2")
+    return counts
+
+
+def run_job_file(input_path: str, output_path: Optional[str], backend_name: Optional[str] = None,
+                 work_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Run a batch job from a JSONL file (or "-" for stdin) to a JSONL file (or stdout).
+
+    Args:
+        input_path: Path of the prompts file, or "-" to read stdin
+        output_path: Path of the results file, resumed if it exists; None writes to stdout
+        backend_name: "openai" or "local". Defaults to JOB_CONFIG["backend"].
+        work_dir: Directory for the job's files. Defaults to a directory named after
+            the prompts file in JOB_CONFIG["work_dir"].
+
+    Returns:
+        Dictionary with the number of prompts completed, failed and skipped, and the requests submitted
+    """
+    if work_dir is None:
+        name = "stdin" if input_path == "-" else Path(input_path).stem
+        work_dir = os.path.join(JOB_CONFIG["work_dir"], name)
+    backend = get_batch_backend(backend_name or JOB_CONFIG["backend"], work_dir)
+
+    source = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    try:
+        prompts = list(read_prompts(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if output_path is None:
+        # As in src/batch.py, keep everything but the results out of stdout
+        results = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return run_job(prompts, results, backend, work_dir)
+
+    skip = completed_ids(output_path)
+    with open(output_path, "a", encoding="utf-8") as output:
+        # Start on a fresh line if the previous run stopped mid-write
+        if _ends_mid_line(output_path):
+            output.write("\n")
+        return run_job(prompts, output, backend, work_dir, skip)
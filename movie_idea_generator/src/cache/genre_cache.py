@@ -0,0 +1,62 @@
+"""Persistent prompt -> genres cache shared by genre analyzer agents."""
+
+import hashlib
+import json
+import re
+import threading
+from typing import Optional
+
+from src.cache.sqlite_cache import SQLiteCache
+from src.config.config import GENRE_CACHE_CONFIG
+
+_cache: Optional[SQLiteCache] = None
+_cache_lock = threading.Lock()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so trivially different spellings share a cache entry.
+
+    Args:
+        prompt: The user's prompt
+
+    Returns:
+        The prompt lowercased, with surrounding and repeated whitespace removed
+    """
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def genre_cache_key(prompt: str, model: str, temperature: float) -> str:
+    """
+    Build the cache key for a genre analysis request.
+
+    Args:
+        prompt: The user's prompt
+        model: The model name used for the analysis
+        temperature: The sampling temperature used for the analysis
+
+    Returns:
+        A hex digest identifying the request
+    """
+    payload = json.dumps([normalize_prompt(prompt), model, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_genre_cache() -> Optional[SQLiteCache]:
+    """
+    Get the process-wide genre cache, opening it on first use.
+
+    Returns:
+        The cache, or None if caching is disabled in GENRE_CACHE_CONFIG
+    """
+    global _cache
+    if not GENRE_CACHE_CONFIG["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLiteCache(
+                GENRE_CACHE_CONFIG["path"],
+                ttl_seconds=GENRE_CACHE_CONFIG["ttl_seconds"],
+                max_entries=GENRE_CACHE_CONFIG["max_entries"]
+            )
+        return _cache
@@ -0,0 +1,235 @@
+"""
+Near-duplicate prompt -> pipeline result cache.
+
+Prompts are normalized (case, punctuation, filler words), split into character
+n-grams and summarized by a MinHash signature. Signatures are banded into a
+locality-sensitive hash index, so a lookup only compares the prompt against the
+few entries that share a band, however large the cache grows. A cached result is
+served when the estimated Jaccard similarity of the n-gram sets reaches the
+configured threshold. Prompts with no words left after normalization (only
+punctuation, say) are neither looked up nor stored, as they would all share one
+signature.
+"""
+
+import copy
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.config.config import PROMPT_CACHE_CONFIG
+
+# Words dropped before hashing; they rarely change what a prompt asks for
+FILLER_WORDS = {"a", "an", "the", "please", "just", "really", "very", "so", "um", "uh"}
+
+# Mersenne prime used as the modulus of the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+_cache: Optional["PromptCache"] = None
+_cache_lock = threading.Lock()
+
+
+def normalize_for_similarity(prompt: str) -> str:
+    """
+    Reduce a prompt to the words that matter for similarity.
+
+    Args:
+        prompt: The user's prompt
+
+    Returns:
+        The lowercased prompt without punctuation or filler words; words in any script are kept
+    """
+    words = re.findall(r"[^\W_]+", prompt.lower())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def shingles(text: str, ngram: int) -> Set[str]:
+    """
+    Split text into overlapping character n-grams.
+
+    Args:
+        text: Normalized prompt text
+        ngram: Length of each n-gram
+
+    Returns:
+        The set of n-grams (the whole text if it is shorter than one n-gram)
+    """
+    if len(text) <= ngram:
+        return {text}
+    return {text[i:i + ngram] for i in range(len(text) - ngram + 1)}
+
+
+class PromptCache:
+    """In-memory LRU of pipeline results with a MinHash LSH index over prompts."""
+
+    def __init__(self, threshold: float = 0.85, ngram: int = 3, num_perm: int = 64,
+                 bands: int = 16, max_entries: int = 100000, seed: int = 1):
+        """
+        Create the cache.
+
+        Args:
+            threshold: Minimum estimated similarity (0-1) for a cached result to be served
+            ngram: Character n-gram length
+            num_perm: Number of MinHash permutations in each signature
+            bands: Number of LSH bands; must divide num_perm
+            max_entries: Prompts kept before the least recently used are evicted
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.threshold = threshold
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._entries: "OrderedDict[int, Tuple[Tuple[int, ...], Dict[str, Any]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def signature(self, prompt: str) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a prompt.
+
+        Args:
+            prompt: The user's prompt
+
+        Returns:
+            A tuple of num_perm minimum hash values
+        """
+        return self._signature(normalize_for_similarity(prompt))
+
+    def _signature(self, text: str) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+            for gram in shingles(text, self.ngram)
+        ]
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._permutations)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def similarity(self, first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """
+        Estimate the Jaccard similarity of two prompts from their signatures.
+
+        Args:
+            first: MinHash signature of one prompt
+            second: MinHash signature of the other prompt
+
+        Returns:
+            The fraction of matching signature values
+        """
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached result of the most similar earlier prompt.
+
+        Args:
+            prompt: The user's prompt
+
+        Returns:
+            A copy of the cached result, or None if no prompt reaches the threshold
+            or the prompt has no words to compare
+        """
+        text = normalize_for_similarity(prompt)
+        if not text:
+            return None
+        signature = self._signature(text)
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_score = None, self.threshold
+            for entry_id in candidates:
+                score = self.similarity(signature, self._entries[entry_id][0])
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            result = self._entries[best_id][1]
+        return copy.deepcopy(result)
+
+    def add(self, prompt: str, result: Dict[str, Any]) -> None:
+        """
+        Store a pipeline result under a prompt.
+
+        Args:
+            prompt: The user's prompt
+            result: The pipeline result for the prompt
+        """
+        text = normalize_for_similarity(prompt)
+        if not text:
+            return
+        signature = self._signature(text)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, copy.deepcopy(result))
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        entry_id, (signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counts for this process.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries)
+        }
+
+
+def get_prompt_cache() -> Optional[PromptCache]:
+    """
+    Get the process-wide prompt cache, creating it on first use.
+
+    Returns:
+        The cache, or None unless enabled in PROMPT_CACHE_CONFIG
+    """
+    global _cache
+    config = PROMPT_CACHE_CONFIG
+    if not config["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptCache(
+                threshold=config["threshold"],
+                ngram=config["ngram"],
+                num_perm=config["num_perm"],
+                bands=config["bands"],
+                max_entries=config["max_entries"]
+            )
+        return _cache
@@ -0,0 +1,161 @@
+"""Genre-set -> recommendations cache shared by recommendation agents."""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.cache.sqlite_cache import SQLiteCache
+from src.config.config import RECOMMENDATION_CACHE_CONFIG
+
+_cache: Optional["RecommendationCache"] = None
+_cache_lock = threading.Lock()
+
+
+def genre_set_key(genres: List[str]) -> str:
+    """
+    Build the cache key for a genre list, ignoring order, case and duplicates.
+
+    Args:
+        genres: List of genres
+
+    Returns:
+        The normalized genres joined with "|"
+    """
+    return "|".join(sorted({genre.strip().lower() for genre in genres}))
+
+
+class RecommendationCache:
+    """
+    Two-tier cache of parsed recommendations keyed by genre set.
+
+    The in-memory tier is an LRU of at most ``max_entries`` genre sets; the
+    optional persistent tier keeps answers across runs. With ``rotation_size``
+    N > 1, the first N requests for a genre set still go to the LLM and each
+    distinct answer is kept; after that, hits rotate through the answers so
+    users don't all get the same recommendation. A genre set whose N answers
+    were all the same is served that one answer.
+    """
+
+    def __init__(self, max_entries: int = 1024, rotation_size: int = 1,
+                 persistent: Optional[SQLiteCache] = None):
+        """
+        Create the cache.
+
+        Args:
+            max_entries: Genre sets kept in memory
+            rotation_size: Distinct answers to collect and rotate through per genre set
+            persistent: Optional disk tier
+        """
+        if rotation_size < 1:
+            raise ValueError("rotation_size must be at least 1")
+        self.max_entries = max_entries
+        self.rotation_size = rotation_size
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Look up recommendations for a genre set.
+
+        Args:
+            genres: List of genres
+
+        Returns:
+            A copy of a cached answer, or None if the LLM should be asked
+        """
+        key = genre_set_key(genres)
+        with self._lock:
+            entry = self._load(key)
+            if entry is None or entry["fills"] < self.rotation_size:
+                self.misses += 1
+                return None
+            answer = entry["answers"][entry["next"] % len(entry["answers"])]
+            entry["next"] += 1
+            self.hits += 1
+        return copy.deepcopy(answer)
+
+    def add(self, genres: List[str], recommendations: Dict[str, Dict[str, str]]) -> None:
+        """
+        Store an answer for a genre set.
+
+        Args:
+            genres: List of genres
+            recommendations: Parsed recommendations from the LLM (never the defaults)
+        """
+        key = genre_set_key(genres)
+        with self._lock:
+            entry = self._load(key) or self._insert(key, [], 0)
+            # Count every answer, so a genre set the LLM always answers the same way still fills up
+            entry["fills"] += 1
+            if recommendations not in entry["answers"]:
+                entry["answers"] = (entry["answers"] + [copy.deepcopy(recommendations)])[-self.rotation_size:]
+            if self.persistent is not None:
+                self.persistent.set(key, {"answers": entry["answers"], "fills": entry["fills"]})
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.persistent is not None:
+            stored = self.persistent.get(key)
+            if stored:
+                return self._insert(key, stored["answers"], stored["fills"])
+        return None
+
+    def _insert(self, key: str, answers: List[Dict[str, Dict[str, str]]], fills: int) -> Dict[str, Any]:
+        entry = {"answers": answers, "fills": fills, "next": 0}
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counts for this process.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries)
+        }
+
+
+def get_recommendation_cache() -> Optional[RecommendationCache]:
+    """
+    Get the process-wide recommendation cache, creating it on first use.
+
+    Returns:
+        The cache, or None if caching is disabled in RECOMMENDATION_CACHE_CONFIG
+    """
+    global _cache
+    config = RECOMMENDATION_CACHE_CONFIG
+    if not config["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            persistent = None
+            if config["persistent"]:
+                persistent = SQLiteCache(
+                    config["path"],
+                    ttl_seconds=config["ttl_seconds"],
+                    max_entries=config["persistent_max_entries"]
+                )
+            _cache = RecommendationCache(
+                max_entries=config["max_entries"],
+                rotation_size=config["rotation_size"],
+                persistent=persistent
+            )
+        return _cache
@@ -0,0 +1,135 @@
+"""
+Disk-backed key-value cache built on SQLite.
+
+Values are stored as JSON with a creation time for TTL expiry and a last-access
+time for least-recently-used eviction once the entry cap is reached. A single
+connection is shared by all threads behind a lock; lookups take microseconds,
+which is negligible next to an LLM round-trip.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class SQLiteCache:
+    """A JSON value cache with a TTL and a size cap, persisted in SQLite."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: int = 10000):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Age after which entries expire, or None to keep them forever
+            max_entries: Maximum number of entries before the least recently used are evicted
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if over the cap.
+
+        Args:
+            key: The cache key
+            value: A JSON-serializable value
+        """
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            ).rowcount
+            if inserted:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE entries SET value = ?, created = ?, accessed = ? WHERE key = ?",
+                    (payload, now, now, key)
+                )
+            if self._count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (self._count - self.max_entries,)
+                )
+                self._count = self.max_entries
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._count = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counts for this process.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._count
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
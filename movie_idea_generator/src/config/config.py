@@ -1,8 +1,26 @@
 # Configuration settings for agents and API
+import os
+from pathlib import Path
+
 from src.config.secrets import OPENAI_API_KEY
 
 # API URL for the recommendation service
-RECOMMENDER_API_URL = "http://127.0.0.1:8090"
+RECOMMENDER_API_URL = os.environ.get("RECOMMENDER_API_URL", "http://127.0.0.1:8090")
+
+# How RecommendationAgent finds recommendations: "llm" asks the model, "catalog"
+# asks the recommender service first and "engine" runs the recommender in-process
+# first; both fall back to the model on a miss or error
+RECOMMENDER_CONFIG = {
+    "mode": os.environ.get("MOVIE_IDEA_RECOMMENDER_MODE", "llm"),
+    "url": RECOMMENDER_API_URL,
+    "engine_path": os.environ.get(
+        "RECOMMENDER_API_DIR", str(Path(__file__).parent.parent.parent.parent / "recommender_api")
+    ),
+    "timeout": 0.5,  # Seconds to wait for a response before falling back to the LLM
+    "connect_timeout": 0.1,  # The service is expected on the same host or network
+    "max_connections": 10,
+    "min_similarity": 0.5  # Weaker catalog matches count as a miss
+}
 
 # LLM configuration for OpenAI
 LLM_CONFIG = {
@@ -11,7 +29,53 @@ LLM_CONFIG = {
     "model": "gpt-4-turbo",  # Default to gpt-4-turbo for better performance
     "temperature": 0.7,  # Default temperature for general use
     "max_tokens": 4000,  # Reasonable token limit for responses
-    "request_timeout": 120  # Timeout in seconds
+    "request_timeout": 120,  # Timeout in seconds
+    "base_url": os.environ.get("OPENAI_BASE_URL") or None  # Another OpenAI-compatible API, e.g. src/llm_simulator.py
+}
+
+# Retries and hedged requests for chat completions (see src/config/resilience.py)
+RESILIENCE_CONFIG = {
+    "max_attempts": 3,  # Requests per call, counting retries and hedges, unless the agent has a budget below
+    "attempt_budgets": {
+        "genre_analyzer": 3,
+        "recommendation": 2,  # Cheap to fall back: the defaults or the recommender catalog
+        "idea_generator": 3,
+        "combined": 2  # Falls back to the three separate calls
+    },
+    "base_delay": 0.5,  # Backoff ceiling before the first retry, doubled per retry
+    "max_delay": 8.0,  # Cap on the backoff, including Retry-After
+    "hedge": False,  # Send a duplicate request when a call runs past the observed p95
+    "hedge_min_samples": 20  # Calls to observe before hedging starts
+}
+
+# Client-side throttling to the provider's rate limits, per model (see src/config/rate_limiter.py).
+# Set these to your account's limits; 0 leaves that limit unenforced.
+RATE_LIMIT_CONFIG = {
+    "requests_per_minute": int(os.environ.get("MOVIE_IDEA_RPM_LIMIT", "0")),
+    "tokens_per_minute": int(os.environ.get("MOVIE_IDEA_TPM_LIMIT", "0")),
+    "burst_seconds": 60.0  # Seconds of budget that may be spent at once after an idle period
+}
+
+# Per-call latency, token and cost events (see src/config/instrumentation.py)
+INSTRUMENTATION_CONFIG = {
+    "trace_path": os.environ.get("MOVIE_IDEA_TRACE_FILE") or None,  # Append each run's events here as JSONL
+    "recent_calls": 1000,  # Call events kept in memory
+    "recent_runs": 100,  # Run summaries kept in memory
+    # Estimated USD per million tokens, for the cost figures; update when pricing changes
+    "prices_per_million_tokens": {
+        "gpt-3.5-turbo": {"prompt": 0.5, "completion": 1.5},
+        "gpt-3.5-turbo-16k": {"prompt": 3.0, "completion": 4.0},
+        "gpt-4-turbo": {"prompt": 10.0, "completion": 30.0},
+        "gpt-4": {"prompt": 30.0, "completion": 60.0}
+    }
+}
+
+# HTTP connection pool shared by every OpenAI call in the process
+HTTP_CLIENT_CONFIG = {
+    "max_connections": 20,  # Upper bound on concurrent connections to the API
+    "max_keepalive_connections": 10,  # Idle connections kept open for reuse
+    "keepalive_expiry": 60.0,  # Seconds an idle connection stays in the pool
+    "warm_up_on_start": True  # Open a connection in the background when the CLI starts
 }
 
 # Alternative models that can be used by setting model in LLM_CONFIG
@@ -36,4 +100,71 @@ GENRE_ANALYZER_CONFIG = {
 RECOMMENDATION_AGENT_CONFIG = {
     "temperature": 0.5,  # Balanced temperature for recommendations
     "allow_delegation": False
-} 
\ No newline at end of file
+} 
+
+# Pipeline execution settings
+PIPELINE_CONFIG = {
+    # "agents" asks the three agents separately; "combined" asks for everything in one
+    # JSON-mode call and falls back to the three agents if that answer is unusable
+    "mode": os.environ.get("MOVIE_IDEA_PIPELINE_MODE", "agents"),
+    "concurrent": True,  # Run the idea generator alongside the genre -> recommendation chain
+    "max_workers": 8,  # Threads shared by all concurrent pipeline runs; runs finding them all busy go sequential
+    "stream_idea": True  # Print the movie idea in the CLI as it is written
+}
+
+# Bulk generation with `run.py --batch`
+BATCH_CONFIG = {
+    "concurrency": 16  # Prompts in flight at once; keep within HTTP_CLIENT_CONFIG["max_connections"]
+}
+
+# Offline bulk jobs through a batch LLM API with `run.py --batch ... --job` (src/batch_job.py)
+JOB_CONFIG = {
+    "backend": os.environ.get("MOVIE_IDEA_JOB_BACKEND", "openai"),  # "openai" or the file-based "local" stand-in
+    "work_dir": os.environ.get("MOVIE_IDEA_JOB_DIR", str(Path(__file__).parent.parent.parent / ".jobs")),
+    "poll_seconds": 60.0,  # Wait between status checks of a submitted batch
+    "completion_window": "24h",
+    "max_requests_per_batch": 50000  # The Batch API's limit per request file
+}
+
+# HTTP service mode (`python -m src.server`)
+SERVICE_CONFIG = {
+    "host": os.environ.get("MOVIE_IDEA_SERVICE_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("MOVIE_IDEA_SERVICE_PORT", "8080")),
+    "max_concurrency": int(os.environ.get("MOVIE_IDEA_SERVICE_CONCURRENCY", "16")),  # Generations running at once
+    "max_queue": 64,  # Requests waiting for a slot; further requests get a 503
+    "deadline_seconds": float(os.environ.get("MOVIE_IDEA_SERVICE_DEADLINE", "60")),  # Default and maximum per request
+    "retry_after": 1  # Seconds clients are told to wait after a 503
+}
+
+# Persistent caches live here unless MOVIE_IDEA_CACHE_DIR says otherwise
+CACHE_DIR = os.environ.get("MOVIE_IDEA_CACHE_DIR", str(Path(__file__).parent.parent.parent / ".cache"))
+CACHE_ENABLED = os.environ.get("MOVIE_IDEA_CACHE_ENABLED", "1") != "0"
+
+# Prompt -> genres cache for the genre analyzer
+GENRE_CACHE_CONFIG = {
+    "enabled": CACHE_ENABLED,
+    "path": os.path.join(CACHE_DIR, "genres.sqlite3"),
+    "ttl_seconds": 7 * 24 * 3600,  # Re-ask the model about a prompt after a week
+    "max_entries": 10000  # Least recently used prompts are evicted beyond this
+}
+
+# Genre set -> recommendations cache
+RECOMMENDATION_CACHE_CONFIG = {
+    "enabled": CACHE_ENABLED,
+    "max_entries": 1024,  # Genre sets kept in the in-memory LRU tier
+    "rotation_size": 1,  # Answers collected per genre set before hits rotate through them; 1 disables rotation
+    "persistent": False,  # Also keep answers on disk across runs
+    "path": os.path.join(CACHE_DIR, "recommendations.sqlite3"),
+    "ttl_seconds": 7 * 24 * 3600,
+    "persistent_max_entries": 10000
+}
+
+# Near-duplicate prompt -> pipeline result cache (opt-in)
+PROMPT_CACHE_CONFIG = {
+    "enabled": CACHE_ENABLED and os.environ.get("MOVIE_IDEA_PROMPT_CACHE", "0") == "1",
+    "threshold": 0.85,  # Minimum estimated similarity of two prompts to share a result
+    "ngram": 3,  # Character n-gram length used for the MinHash signatures
+    "num_perm": 64,  # MinHash signature length
+    "bands": 16,  # LSH bands; more bands find less similar candidates
+    "max_entries": 100000  # Least recently used prompts are evicted beyond this
+}
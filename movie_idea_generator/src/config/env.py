@@ -1,31 +1,50 @@
 """
 Environment variable configuration for the movie idea generator.
-This module loads environment variables from a .env file located in the project root.
+Call load_env() at startup to load environment variables from the .env file
+located in the project root; importing this module has no side effects.
 """
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-from src.config.secrets import OPENAI_API_KEY
+from typing import Optional, Union
+
+from src.config import secrets
 
 # Find the root directory of the project
 ROOT_DIR = Path(__file__).parent.parent.parent.absolute()
 
-# Load environment variables from .env file
-load_dotenv(ROOT_DIR / ".env")
 
-# Import the secrets module to update it with values from .env
-from src.config import secrets
+def load_env(path: Optional[Union[str, Path]] = None) -> None:
+    """
+    Load environment variables from a .env file and refresh the secrets module.
 
-# Update the secrets module with values from .env
-secrets.OPENAI_API_KEY = OPENAI_API_KEY
+    Variables already set in the environment are kept, so calling this more
+    than once is harmless. Settings in src/config/config.py are read when that
+    module is first imported, so call this before importing the rest of src
+    for the .env file to affect them.
 
-def check_api_keys():
+    Args:
+        path: The .env file to load. Defaults to the one in the project root.
+    """
+    # Imported here so that importing the configuration stays cheap
+    from dotenv import load_dotenv
+
+    load_dotenv(path or ROOT_DIR / ".env")
+    # Keep a key set in src/config/secrets.py when the environment has none
+    secrets.OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY") or secrets.OPENAI_API_KEY
+
+
+def check_api_keys() -> bool:
     """
     Check that all required API keys are set.
-    Raises a warning if any required keys are missing.
+    Prints a warning if any required keys are missing.
+
+    Returns:
+        True if every required key is set
     """
     if not secrets.OPENAI_API_KEY:
         print("\nWARNING: OPENAI_API_KEY is not set in the .env file.")
         print("The application may not work properly without this key.")
-        print(f"Please add your API key to the .env file in {ROOT_DIR}\n") 
\ No newline at end of file
+        print(f"Please add your API key to the .env file in {ROOT_DIR}\n")
+        return False
+    return True
@@ -0,0 +1,278 @@
+"""
+Per-call instrumentation for LLM calls.
+
+Every chat completion produces one call event with the calling agent and the
+model, the time spent queued for the rate limiter, the time to the first
+response byte, the total latency including retries, the token usage and its
+estimated cost, and whether the agent fell back to its defaults. Calls made
+while a run is being tracked -- one generate_movie_idea, say -- are grouped
+into that run, which adds an aggregate summary. Finished runs are kept in
+memory and, when INSTRUMENTATION_CONFIG["trace_path"] is set, appended to a
+JSONL file: one line per call event followed by the run summary.
+
+    with track_run("my prompt") as run:
+        generate_movie_idea("my prompt")
+    print(run.summary())
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.config import INSTRUMENTATION_CONFIG
+
+_recent_calls = deque(maxlen=INSTRUMENTATION_CONFIG["recent_calls"])
+_recent_runs = deque(maxlen=INSTRUMENTATION_CONFIG["recent_runs"])
+_lock = threading.Lock()
+
+# The run being tracked, and the latest call made, in this thread or task
+_current_run: ContextVar[Optional["Run"]] = ContextVar("current_run", default=None)
+_last_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar("last_call", default=None)
+
+
+class Run:
+    """The call events of one pipeline run and their aggregate summary."""
+
+    def __init__(self, label: Optional[str] = None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = time.time()
+        self.wall_ms: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.fallbacks: Counter = Counter()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def finish(self) -> None:
+        self.wall_ms = (time.perf_counter() - self._start) * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate the run's call events.
+
+        Returns:
+            Dictionary with the run's wall time and, in total and per agent, the
+            calls, attempts, queue time, LLM latency, tokens, cost and fallbacks
+        """
+        with self._lock:
+            events = list(self.events)
+            fallbacks = dict(self.fallbacks)
+        agents: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            _accumulate(agents.setdefault(event["agent"] or "unknown", _empty_totals()), event)
+        totals = _empty_totals()
+        for event in events:
+            _accumulate(totals, event)
+        for agent, count in fallbacks.items():
+            agents.setdefault(agent, _empty_totals())["fallbacks"] = count
+        totals["fallbacks"] = sum(fallbacks.values())
+        return {
+            "event": "run_summary",
+            "run_id": self.run_id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "wall_ms": _round(self.wall_ms if self.wall_ms is not None else (time.perf_counter() - self._start) * 1000),
+            **totals,
+            "agents": agents
+        }
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0, "attempts": 0, "errors": 0, "fallbacks": 0,
+        "queue_ms": 0.0, "latency_ms": 0.0,
+        "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+    }
+
+
+def _accumulate(totals: Dict[str, Any], event: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    totals["attempts"] += event["attempts"]
+    totals["errors"] += event["status"] != "ok"
+    for key in ("queue_ms", "latency_ms", "prompt_tokens", "completion_tokens", "cost_usd"):
+        totals[key] = _round(totals[key] + (event[key] or 0))
+
+
+def _round(value: Any) -> Any:
+    return round(value, 6) if isinstance(value, float) else value
+
+
+def estimate_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """
+    Estimate the price of a call from INSTRUMENTATION_CONFIG["prices_per_million_tokens"].
+
+    Args:
+        model: The model name
+        prompt_tokens: Tokens in the prompt
+        completion_tokens: Tokens in the completion
+
+    Returns:
+        USD, or None if the usage or the model's price is unknown
+    """
+    prices = INSTRUMENTATION_CONFIG["prices_per_million_tokens"].get(model)
+    if prices is None or prompt_tokens is None or completion_tokens is None:
+        return None
+    return (prompt_tokens * prices["prompt"] + completion_tokens * prices["completion"]) / 1_000_000
+
+
+def start_call(agent: Optional[str], model: str) -> Dict[str, Any]:
+    """
+    Open the event for a chat completion.
+
+    Args:
+        agent: Key of the calling agent, or None
+        model: The model name
+
+    Returns:
+        The event, to pass to record_attempt and finish_call
+    """
+    event = {
+        "event": "llm_call",
+        "run_id": None,
+        "agent": agent,
+        "model": model,
+        "started_at": time.time(),
+        "attempts": 0,
+        "queue_ms": 0.0,
+        "ttfb_ms": None,
+        "latency_ms": None,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "cost_usd": None,
+        "status": "ok",
+        "error": None,
+        "fallback": False,
+        "_start": time.perf_counter(),
+        "_run": _current_run.get()
+    }
+    _last_call.set(event)
+    return event
+
+
+def record_attempt(event: Dict[str, Any], record: Dict[str, Any], succeeded: bool) -> None:
+    """
+    Add one request of a call, as timed by src.config.llm, to its event.
+
+    Args:
+        event: The call's event
+        record: The request's timing record
+        succeeded: Whether this request produced the response
+    """
+    with _lock:
+        event["attempts"] += 1
+        event["queue_ms"] += record.get("queue_ms", 0.0)
+        if succeeded:
+            event["ttfb_ms"] = record.get("ttfb_ms")
+
+
+def finish_call(event: Dict[str, Any], usage: Any = None, error: Optional[BaseException] = None) -> None:
+    """
+    Close a call's event and file it with its run.
+
+    Args:
+        event: The call's event
+        usage: The usage object of the response, if any
+        error: The exception the call raised, if any
+    """
+    event["latency_ms"] = (time.perf_counter() - event.pop("_start")) * 1000
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+        event["prompt_tokens"] = prompt_tokens
+        event["completion_tokens"] = completion_tokens
+        event["cost_usd"] = estimate_cost(event["model"], prompt_tokens, completion_tokens)
+    if error is not None:
+        event["status"] = "error"
+        event["error"] = type(error).__name__
+    run = event.pop("_run")
+    if run is not None:
+        event["run_id"] = run.run_id
+        run.add(event)
+    _recent_calls.append(event)
+
+
+def mark_fallback(agent: str) -> None:
+    """
+    Record that an agent fell back to its defaults after its latest call.
+
+    Args:
+        agent: Key of the agent
+    """
+    event = _last_call.get()
+    if event is not None and event["agent"] == agent:
+        event["fallback"] = True
+    run = _current_run.get()
+    if run is not None:
+        with run._lock:
+            run.fallbacks[agent] += 1
+
+
+@contextmanager
+def track_run(label: Optional[str] = None) -> Iterator[Run]:
+    """
+    Group the calls made in this context, including threads and tasks started from it, into a run.
+
+    Inside a run that is already being tracked, the outer run is reused.
+
+    Args:
+        label: A description of the run, such as the prompt
+
+    Yields:
+        The run
+    """
+    outer = _current_run.get()
+    if outer is not None:
+        yield outer
+        return
+    run = Run(label)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.finish()
+        _recent_runs.append(run)
+        _export(run)
+
+
+def _export(run: Run) -> None:
+    path = INSTRUMENTATION_CONFIG["trace_path"]
+    if not path:
+        return
+    lines = [json.dumps(event) for event in list(run.events)]
+    lines.append(json.dumps(run.summary()))
+    with _lock:
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"Warning: could not write the trace file: {e}")
+
+
+def get_recent_calls() -> List[Dict[str, Any]]:
+    """
+    Get the events of recent chat completions, oldest first.
+
+    Returns:
+        List of call event dictionaries
+    """
+    return list(_recent_calls)
+
+
+def get_recent_runs() -> List[Run]:
+    """
+    Get recently finished runs, oldest first.
+
+    Returns:
+        List of runs
+    """
+    return list(_recent_runs)
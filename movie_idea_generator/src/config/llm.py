@@ -3,17 +3,49 @@ LLM configuration utilities for working with OpenAI models.
 This module provides helper functions to create and configure OpenAI clients.
 """
 
+import asyncio
 import os
-from typing import Dict, List, Optional, Any, Union
-from openai import OpenAI
-from src.config.config import LLM_CONFIG, OPENAI_MODELS
-from src.config.secrets import OPENAI_API_KEY
+import threading
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+from src.config import secrets
+from src.config.config import HTTP_CLIENT_CONFIG, LLM_CONFIG, OPENAI_MODELS
+from src.config.instrumentation import finish_call, record_attempt, start_call
+from src.config.rate_limiter import estimate_tokens, get_rate_limiter
+from src.config.resilience import RetryPolicy, acall_with_resilience, call_with_resilience, get_latency_tracker
+
+if TYPE_CHECKING:
+    import httpx
+
+# The openai package takes most of a second to import, so it is imported by
+# _import_openai() when the first client is built rather than with this module
+OpenAI = None
+AsyncOpenAI = None
+
+# Process-wide client, created lazily by get_openai_client()
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+
+# Async clients are tied to the event loop their connections were opened on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+# Connection timings of recent calls, filled in by the httpcore trace hook.
+# The current call lives in a context variable so threads and tasks each see their own.
+_connection_stats = deque(maxlen=100)
+_current_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar("current_call", default=None)
 
 class LLM:
     """
     Simple LLM class for configuration.
     
-    This is a simplified version of the LLM class used by the app.
+    This is a simplified version of the LLM class used by the app. It holds no
+    client of its own, so creating one is cheap; the shared client is only
+    created when `client` is first used.
     """
     
     def __init__(self, model: str = "gpt-3.5-turbo", temperature: float = 0.7, **kwargs):
@@ -28,21 +60,247 @@ class LLM:
         self.model = model
         self.temperature = temperature
         self.name = kwargs.get("name", "Default LLM")
-        self.api_key = kwargs.get("api_key", OPENAI_API_KEY)
+        self.api_key = kwargs.get("api_key", secrets.OPENAI_API_KEY)
+
+    @property
+    def client(self):
+        """
+        The shared OpenAI client, created on first use rather than with the LLM.
+        """
+        return get_openai_client()
+
+    @property
+    def async_client(self):
+        """
+        The shared async OpenAI client for the running event loop, created on first use.
+        """
+        return get_async_openai_client()
+
+
+def _trace_connection(event_name: str, info: Dict[str, Any]) -> None:
+    """
+    Record TCP connect, TLS handshake and time to first byte for the call running in this context.
+    """
+    record = _current_call.get()
+    if record is None:
+        return
+    if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+        record["new_connection"] = True
+        record["_phase_start"] = time.perf_counter()
+    elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+        record["connect_ms"] += (time.perf_counter() - record.pop("_phase_start")) * 1000
+    elif event_name.endswith("receive_response_headers.complete"):
+        record.setdefault("ttfb_ms", (time.perf_counter() - record["_start"]) * 1000)
+
+
+async def _trace_connection_async(event_name: str, info: Dict[str, Any]) -> None:
+    _trace_connection(event_name, info)
+
+
+def _add_trace(request: "httpx.Request") -> None:
+    request.extensions["trace"] = _trace_connection
+
+
+async def _add_trace_async(request: "httpx.Request") -> None:
+    request.extensions["trace"] = _trace_connection_async
+
+
+def _pool_limits() -> "httpx.Limits":
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_CLIENT_CONFIG["max_connections"],
+        max_keepalive_connections=HTTP_CLIENT_CONFIG["max_keepalive_connections"],
+        keepalive_expiry=HTTP_CLIENT_CONFIG["keepalive_expiry"]
+    )
+
+
+def _build_http_client() -> "httpx.Client":
+    """
+    Build the pooled keep-alive HTTP client used by the OpenAI client.
+
+    Returns:
+        An httpx client configured from HTTP_CLIENT_CONFIG
+    """
+    import httpx
+    return httpx.Client(
+        limits=_pool_limits(),
+        timeout=LLM_CONFIG["request_timeout"],
+        event_hooks={"request": [_add_trace]}
+    )
+
+
+def _begin_call(queue_seconds: float = 0.0) -> Dict[str, Any]:
+    record = {
+        "queue_ms": queue_seconds * 1000,
+        "connect_ms": 0.0,
+        "new_connection": False,
+        "_start": time.perf_counter()
+    }
+    _current_call.set(record)
+    return record
+
+
+def _end_call(record: Dict[str, Any]) -> None:
+    _current_call.set(None)
+    record["latency_ms"] = (time.perf_counter() - record.pop("_start")) * 1000
+    record.pop("_phase_start", None)
+    _connection_stats.append(record)
+
+
+def get_connection_stats() -> List[Dict[str, Any]]:
+    """
+    Get latency and connection setup timings of recent chat completions.
+
+    Each entry has "queue_ms" (time spent waiting for the rate limiter),
+    "latency_ms", "connect_ms" (TCP connect plus TLS handshake), "ttfb_ms"
+    (until the response headers) and "new_connection"; streamed calls also
+    have "first_token_ms". With the
+    pooled client only the first call, or the first after an idle connection
+    expires, pays for the handshake.
+
+    Returns:
+        List of timing dictionaries, oldest first
+    """
+    return list(_connection_stats)
+
+
+def _import_openai() -> None:
+    """
+    Import the OpenAI client classes on first use, unless they have already been set.
+    """
+    global OpenAI, AsyncOpenAI
+    if OpenAI is None:
+        from openai import OpenAI
+    if AsyncOpenAI is None:
+        from openai import AsyncOpenAI
+
 
 def get_openai_client():
     """
-    Get an OpenAI client instance.
+    Get the shared OpenAI client instance.
+    
+    The client and its connection pool are created on first use and reused by
+    every call in the process, so connections stay alive between requests.
     
     Returns:
         An OpenAI client instance
     """
+    global _client, _http_client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            try:
+                _import_openai()
+                _http_client = _build_http_client()
+                _client = OpenAI(
+                    api_key=secrets.OPENAI_API_KEY,
+                    base_url=LLM_CONFIG["base_url"],
+                    http_client=_http_client,
+                    timeout=LLM_CONFIG["request_timeout"],
+                    # Retries are handled by src/config/resilience.py
+                    max_retries=0
+                )
+            except ImportError:
+                print("Warning: OpenAI package not installed. Using mock client.")
+                # Create a simple mock client for testing
+                return None
+    return _client
+
+
+def get_async_openai_client():
+    """
+    Get the shared async OpenAI client for the running event loop.
+    
+    Each event loop gets one client with its own pooled keep-alive connections,
+    created on first use and reused by every call made from that loop.
+    
+    Returns:
+        An AsyncOpenAI client instance
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        _import_openai()
+        http_client = httpx.AsyncClient(
+            limits=_pool_limits(),
+            timeout=LLM_CONFIG["request_timeout"],
+            event_hooks={"request": [_add_trace_async]}
+        )
+        client = AsyncOpenAI(
+            api_key=secrets.OPENAI_API_KEY,
+            base_url=LLM_CONFIG["base_url"],
+            http_client=http_client,
+            timeout=LLM_CONFIG["request_timeout"],
+            # Retries are handled by src/config/resilience.py
+            max_retries=0
+        )
+        _async_clients[loop] = client
+        _async_http_clients[loop] = http_client
+    return client
+
+
+async def awarm_up_openai_client() -> bool:
+    """
+    Open a pooled connection from the running event loop's async client ahead of the first request.
+    
+    Returns:
+        True if a connection was established
+    """
+    import httpx
+    client = get_async_openai_client()
     try:
-        return OpenAI(api_key=OPENAI_API_KEY)
-    except ImportError:
-        print("Warning: OpenAI package not installed. Using mock client.")
-        # Create a simple mock client for testing
-        return None
+        await _async_http_clients[asyncio.get_running_loop()].head(str(client.base_url))
+        return True
+    except httpx.HTTPError as e:
+        print(f"Warning: could not pre-warm the OpenAI connection: {e}")
+        return False
+
+
+async def aclose_async_openai_client() -> None:
+    """
+    Close the running event loop's async client and its connections, e.g. when a service shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    _async_clients.pop(loop, None)
+    http_client = _async_http_clients.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
+
+
+def warm_up_openai_client() -> bool:
+    """
+    Open a pooled connection to the API ahead of the first real request.
+    
+    This also imports the openai package, so running it in a background thread
+    at startup takes the import off the first request's path.
+    
+    Returns:
+        True if a connection was established
+    """
+    client = get_openai_client()
+    if client is None or _http_client is None:
+        return False
+    import httpx
+    try:
+        _http_client.head(str(client.base_url))
+        return True
+    except httpx.HTTPError as e:
+        print(f"Warning: could not pre-warm the OpenAI connection: {e}")
+        return False
+
+
+def reset_openai_client() -> None:
+    """
+    Close the shared client and its connections, e.g. after forking a worker process.
+    """
+    global _client, _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
 
 def get_llm_config(model_key=None, temperature=None, max_tokens=None):
     """
@@ -78,12 +336,17 @@ def create_chat_completion(
     temperature: float = 0.7, 
     max_tokens: int = 500,
     response_format: Optional[Dict[str, str]] = None,
+    agent: Optional[str] = None,
     **kwargs
 ) -> Any:
     """
     Create a chat completion using OpenAI API.
     
     This function wraps the OpenAI API call to make it easier to mock in tests.
+    Retryable errors are retried, and slow calls optionally hedged, within the
+    agent's attempt budget (see src/config/resilience.py). Every request first
+    waits its turn under the model's rate limits (see src/config/rate_limiter.py),
+    and the call is recorded as an event (see src/config/instrumentation.py).
     
     Args:
         messages: List of message dictionaries with 'role' and 'content' keys
@@ -91,13 +354,182 @@ def create_chat_completion(
         temperature: The temperature to use for generation
         max_tokens: The maximum number of tokens to generate
         response_format: Optional response format (e.g., {"type": "json_object"})
+        agent: Key of the calling agent, used to pick its attempt budget and to label its events
         **kwargs: Additional parameters
         
     Returns:
         The OpenAI API response
     """
     client = get_openai_client()
+    params = _build_params(messages, model, temperature, max_tokens, response_format, **kwargs)
+    limiter = get_rate_limiter(model)
+    tokens = estimate_tokens(messages, max_tokens)
+    call = start_call(agent, model)
+    
+    def attempt():
+        record = _begin_call(limiter.acquire(tokens) if limiter else 0.0)
+        response = None
+        try:
+            response = client.chat.completions.create(**params)
+        finally:
+            _end_call(record)
+            record_attempt(call, record, response is not None)
+        if limiter:
+            limiter.reconcile(tokens, _usage_tokens(response))
+        return response
     
+    try:
+        response = call_with_resilience(attempt, RetryPolicy.for_agent(agent), get_latency_tracker(model))
+    except Exception as e:
+        finish_call(call, error=e)
+        raise
+    finish_call(call, getattr(response, "usage", None))
+    return response
+
+async def acreate_chat_completion(
+    messages: List[Dict[str, str]], 
+    model: str = "gpt-3.5-turbo", 
+    temperature: float = 0.7, 
+    max_tokens: int = 500,
+    response_format: Optional[Dict[str, str]] = None,
+    agent: Optional[str] = None,
+    **kwargs
+) -> Any:
+    """
+    Create a chat completion using the async OpenAI API.
+    
+    Takes the same arguments as create_chat_completion, but awaits the response
+    instead of blocking a thread, so one event loop can drive many calls at once.
+    
+    Returns:
+        The OpenAI API response
+    """
+    client = get_async_openai_client()
+    params = _build_params(messages, model, temperature, max_tokens, response_format, **kwargs)
+    limiter = get_rate_limiter(model)
+    tokens = estimate_tokens(messages, max_tokens)
+    call = start_call(agent, model)
+    
+    async def attempt():
+        record = _begin_call(await limiter.aacquire(tokens) if limiter else 0.0)
+        response = None
+        try:
+            response = await client.chat.completions.create(**params)
+        finally:
+            _end_call(record)
+            record_attempt(call, record, response is not None)
+        if limiter:
+            limiter.reconcile(tokens, _usage_tokens(response))
+        return response
+    
+    try:
+        response = await acall_with_resilience(attempt, RetryPolicy.for_agent(agent), get_latency_tracker(model))
+    except Exception as e:
+        finish_call(call, error=e)
+        raise
+    finish_call(call, getattr(response, "usage", None))
+    return response
+
+def stream_chat_completion(
+    messages: List[Dict[str, str]], 
+    model: str = "gpt-3.5-turbo", 
+    temperature: float = 0.7, 
+    max_tokens: int = 500,
+    response_format: Optional[Dict[str, str]] = None,
+    agent: Optional[str] = None,
+    **kwargs
+) -> Iterator[str]:
+    """
+    Stream a chat completion using OpenAI API.
+    
+    Takes the same arguments as create_chat_completion, but yields the text of
+    the response in chunks as they arrive instead of waiting for all of it.
+    Streams are not retried, since a retry after the first chunk would repeat text.
+    
+    Returns:
+        Iterator of response text chunks
+    """
+    client = get_openai_client()
+    params = _build_params(messages, model, temperature, max_tokens, response_format, stream=True,
+                           stream_options={"include_usage": True}, **kwargs)
+    limiter = get_rate_limiter(model)
+    call = start_call(agent, model)
+    
+    record = _begin_call(limiter.acquire(estimate_tokens(messages, max_tokens)) if limiter else 0.0)
+    usage = error = None
+    try:
+        for chunk in client.chat.completions.create(**params):
+            # With include_usage, the last chunk carries the token counts
+            usage = getattr(chunk, "usage", None) or usage
+            text = _chunk_text(chunk)
+            if text:
+                record.setdefault("first_token_ms", (time.perf_counter() - record["_start"]) * 1000)
+                yield text
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _end_call(record)
+        record_attempt(call, record, error is None)
+        finish_call(call, usage, error)
+
+async def astream_chat_completion(
+    messages: List[Dict[str, str]], 
+    model: str = "gpt-3.5-turbo", 
+    temperature: float = 0.7, 
+    max_tokens: int = 500,
+    response_format: Optional[Dict[str, str]] = None,
+    agent: Optional[str] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Async variant of stream_chat_completion.
+    
+    Returns:
+        Async iterator of response text chunks
+    """
+    client = get_async_openai_client()
+    params = _build_params(messages, model, temperature, max_tokens, response_format, stream=True,
+                           stream_options={"include_usage": True}, **kwargs)
+    limiter = get_rate_limiter(model)
+    call = start_call(agent, model)
+    
+    record = _begin_call(await limiter.aacquire(estimate_tokens(messages, max_tokens)) if limiter else 0.0)
+    usage = error = None
+    try:
+        async for chunk in await client.chat.completions.create(**params):
+            # With include_usage, the last chunk carries the token counts
+            usage = getattr(chunk, "usage", None) or usage
+            text = _chunk_text(chunk)
+            if text:
+                record.setdefault("first_token_ms", (time.perf_counter() - record["_start"]) * 1000)
+                yield text
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _end_call(record)
+        record_attempt(call, record, error is None)
+        finish_call(call, usage, error)
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+def _chunk_text(chunk: Any) -> Optional[str]:
+    # The last chunk of a stream can have no choices or an empty delta
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+def _build_params(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, str]],
+    **kwargs
+) -> Dict[str, Any]:
     # Set up API parameters
     params = {
         "model": model,
@@ -112,9 +544,7 @@ def create_chat_completion(
         
     # Add any additional parameters
     params.update(kwargs)
-    
-    # Make the API call
-    return client.chat.completions.create(**params)
+    return params
 
 def use_gpt4():
     """Get configuration for GPT-4"""
@@ -0,0 +1,265 @@
+"""
+Client-side rate limiting for LLM calls.
+
+Every request -- from any agent, thread or event loop -- reserves capacity from
+a pair of token buckets per model, one for requests per minute and one for
+tokens per minute. A request's token cost is estimated from its messages plus
+its max_tokens before it is sent, as the provider charges it, and topped up if
+the reported usage turns out higher. Reservations are taken in arrival order and a request
+that finds a bucket empty waits exactly until its share has refilled, so
+callers queue first-come first-served and run at the limit instead of being
+rejected with 429s.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from src.config.config import RATE_LIMIT_CONFIG
+
+# Rough size of English text in tokens, and the per-message framing the API adds
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a chat completion counts against the TPM limit.
+
+    The provider counts the prompt plus max_tokens up front, so the estimate
+    does too.
+
+    Args:
+        messages: The chat messages
+        max_tokens: The completion limit of the request
+
+    Returns:
+        Estimated token cost
+    """
+    prompt = TOKENS_PER_REPLY
+    for message in messages:
+        prompt += TOKENS_PER_MESSAGE + len(str(message.get("content") or "")) // CHARS_PER_TOKEN
+    return prompt + (max_tokens or 0)
+
+
+class TokenBucket:
+    """A bucket refilled continuously at a per-minute rate; not thread-safe on its own."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 60.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take an amount from the bucket, going into debt if it is short.
+
+        Returns:
+            Seconds until the debt, including earlier reservations, is repaid
+        """
+        self._refill(now)
+        # A request larger than the bucket would otherwise wait forever
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets shared by all callers."""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, burst_seconds: float = 60.0):
+        """
+        Create a limiter.
+
+        Args:
+            requests_per_minute: RPM budget; 0 leaves requests unlimited
+            tokens_per_minute: TPM budget; 0 leaves tokens unlimited
+            burst_seconds: Seconds of budget that may be spent at once after an idle period
+        """
+        self._requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)
+        self._requests_seen = 0
+        self._delayed = 0
+        self._waiting = 0
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve capacity for one request without waiting for it.
+
+        Args:
+            tokens: Estimated token cost of the request
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            self._requests_seen += 1
+            if wait > 0:
+                self._delayed += 1
+                self._waiting += 1
+            self._waits.append(wait)
+            return wait
+
+    def _done_waiting(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Wait for the turn of a request.
+
+        Args:
+            tokens: Estimated token cost of the request
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting()
+        return wait
+
+    async def aacquire(self, tokens: int) -> float:
+        """
+        Async variant of acquire; a cancelled waiter gives its reservation back.
+
+        Args:
+            tokens: Estimated token cost of the request
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(tokens, requests=1)
+                raise
+            finally:
+                self._done_waiting()
+        return wait
+
+    def refund(self, tokens: int, requests: int = 0) -> None:
+        """
+        Return capacity that was reserved but not used.
+
+        Args:
+            tokens: Tokens to return
+            requests: Requests to return
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._tokens is not None and tokens > 0:
+                self._tokens.refund(tokens, now)
+            if self._requests is not None and requests > 0:
+                self._requests.refund(requests, now)
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """
+        Correct a token reservation once the response reports its real usage.
+
+        Usage above the reservation is charged. Usage below it is not refunded:
+        the provider charged the prompt plus max_tokens up front, and handing
+        the difference back would let through requests it then rejects.
+
+        Args:
+            estimated: Tokens reserved for the request
+            actual: Tokens the provider counted, or None if unknown
+        """
+        if not isinstance(actual, int) or self._tokens is None:
+            return
+        if actual <= estimated:
+            return
+        with self._lock:
+            self._tokens.reserve(actual - estimated, time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queueing statistics.
+
+        Returns:
+            Dictionary with requests, delayed requests, requests waiting now,
+            and the mean, p95 and max queue wait of recent requests in ms
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {"requests": self._requests_seen, "delayed": self._delayed, "waiting": self._waiting}
+        if waits:
+            stats.update({
+                "mean_wait_ms": round(sum(waits) / len(waits) * 1000, 3),
+                "p95_wait_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3),
+                "max_wait_ms": round(waits[-1] * 1000, 3)
+            })
+        return stats
+
+
+# One limiter per model, shared by every call in the process
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """
+    Get the limiter for a model, creating it from RATE_LIMIT_CONFIG on first use.
+
+    Args:
+        model: The model name
+
+    Returns:
+        The model's limiter, or None if no limit is configured
+    """
+    config = RATE_LIMIT_CONFIG
+    if config["requests_per_minute"] <= 0 and config["tokens_per_minute"] <= 0:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = RateLimiter(
+                requests_per_minute=config["requests_per_minute"],
+                tokens_per_minute=config["tokens_per_minute"],
+                burst_seconds=config["burst_seconds"]
+            )
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get queueing statistics for every model with a limiter.
+
+    Returns:
+        Dictionary of model name to RateLimiter.stats()
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
+
+
+def reset_rate_limiters() -> None:
+    """
+    Drop every limiter, e.g. after changing RATE_LIMIT_CONFIG.
+    """
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,206 @@
+"""
+Client for the local recommender service (recommender_api).
+
+The service scores its catalog against a genre list in milliseconds, so the
+recommendation agent can ask it before paying for an LLM call. Requests go
+through one pooled keep-alive HTTP client per process (and one per event loop
+for async callers) with tight timeouts: a slow or unreachable service is
+treated as a miss and the caller falls back to the LLM.
+
+When recommender_api is checked out on the same host, its engine can also be
+imported and run in-process, skipping the HTTP hop entirely.
+"""
+
+import asyncio
+import sys
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.config.config import RECOMMENDER_CONFIG
+
+# httpx is imported when the first client is built, keeping it out of CLI startup
+if TYPE_CHECKING:
+    import httpx
+
+# Process-wide client, created lazily by get_recommender_client()
+_client: "Optional[httpx.Client]" = None
+_client_lock = threading.Lock()
+
+# In-process engine from recommender_api, created lazily by get_recommender_engine()
+_engine = None
+_engine_lock = threading.Lock()
+
+# Async clients are tied to the event loop their connections were opened on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> Dict[str, Any]:
+    import httpx
+    return {
+        "base_url": RECOMMENDER_CONFIG["url"],
+        "timeout": httpx.Timeout(RECOMMENDER_CONFIG["timeout"], connect=RECOMMENDER_CONFIG["connect_timeout"]),
+        "limits": httpx.Limits(
+            max_connections=RECOMMENDER_CONFIG["max_connections"],
+            max_keepalive_connections=RECOMMENDER_CONFIG["max_connections"]
+        )
+    }
+
+
+def get_recommender_client() -> "httpx.Client":
+    """
+    Get the shared HTTP client for the recommender service.
+
+    Returns:
+        A pooled keep-alive httpx client
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_recommender_client() -> "httpx.AsyncClient":
+    """
+    Get the shared async HTTP client for the recommender service in the running event loop.
+
+    Returns:
+        A pooled keep-alive httpx async client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def reset_recommender_client() -> None:
+    """Close the shared client and its connections."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def to_recommendation(item: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Map a recommender service item to the agent's recommendation shape.
+
+    The catalog has no creator or year, so those are reported as "Unknown".
+
+    Args:
+        item: A /recommend/ response with "name", "description" and "similarity_score"
+
+    Returns:
+        Dictionary with title, creator, year and description, or None if the
+        match is weaker than RECOMMENDER_CONFIG["min_similarity"]
+    """
+    if item.get("similarity_score", 0) < RECOMMENDER_CONFIG["min_similarity"]:
+        return None
+    return {
+        "title": item["name"],
+        "creator": "Unknown",
+        "year": "Unknown",
+        "description": item.get("description", "")
+    }
+
+
+def _to_recommendations(movie: Optional[Dict[str, Any]],
+                        book: Optional[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, str]]]:
+    movie = to_recommendation(movie) if movie else None
+    book = to_recommendation(book) if book else None
+    if movie is None or book is None:
+        return None
+    return {"movie": movie, "book": book}
+
+
+def _recommend_one(content_type: str, genres: List[str]) -> Optional[Dict[str, Any]]:
+    response = get_recommender_client().post("/recommend/", json={"type": content_type, "genres": genres})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+async def _arecommend_one(content_type: str, genres: List[str]) -> Optional[Dict[str, Any]]:
+    response = await get_async_recommender_client().post("/recommend/", json={"type": content_type, "genres": genres})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_recommendations(genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Ask the recommender service for a movie and a book matching the genres.
+
+    Args:
+        genres: List of genres
+
+    Returns:
+        Dictionary with movie and book recommendations, or None on a miss
+
+    Raises:
+        httpx.HTTPError: If the service is unreachable, too slow or returns an error
+    """
+    return _to_recommendations(_recommend_one("movies", genres), _recommend_one("books", genres))
+
+
+async def afetch_recommendations(genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Async variant of fetch_recommendations; the movie and book are requested concurrently.
+
+    Args:
+        genres: List of genres
+
+    Returns:
+        Dictionary with movie and book recommendations, or None on a miss
+
+    Raises:
+        httpx.HTTPError: If the service is unreachable, too slow or returns an error
+    """
+    movie, book = await asyncio.gather(_arecommend_one("movies", genres), _arecommend_one("books", genres))
+    return _to_recommendations(movie, book)
+
+
+def get_recommender_engine():
+    """
+    Get the in-process recommender engine, importing it on first use.
+
+    recommender_api is found at RECOMMENDER_CONFIG["engine_path"]. Its catalog
+    is only loaded on the first recommendation.
+
+    Returns:
+        A recommender_api RecommenderEngine
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _engine_lock:
+        if _engine is None:
+            if RECOMMENDER_CONFIG["engine_path"] not in sys.path:
+                sys.path.append(RECOMMENDER_CONFIG["engine_path"])
+            from app.engine import RecommenderEngine
+            _engine = RecommenderEngine.from_env()
+    return _engine
+
+
+def engine_recommendations(genres: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Score the recommender's catalog in-process for a movie and a book matching the genres.
+
+    Args:
+        genres: List of genres
+
+    Returns:
+        Dictionary with movie and book recommendations, or None on a miss
+    """
+    engine = get_recommender_engine()
+    return _to_recommendations(engine.recommend("movies", genres), engine.recommend("books", genres))
@@ -0,0 +1,311 @@
+"""
+Retries and hedged requests for LLM calls.
+
+A call gets a budget of attempts (per agent, see RESILIENCE_CONFIG). Retryable
+failures -- timeouts, connection errors, 408/409/429 and 5xx responses -- are
+retried after a capped exponential backoff with full jitter, honouring a
+Retry-After header when the provider sends one. With hedging enabled, an attempt
+that is still running after the observed p95 latency gets one duplicate request
+and whichever finishes first wins. Hedges and retries draw on the same budget, so
+the request volume for a call can never exceed it.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config.config import RESILIENCE_CONFIG
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+# Threads for the first attempt of a hedged call and its duplicate
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+class RetryPolicy:
+    """How many attempts a call may make and how long to wait between them."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 hedge: bool = False, hedge_min_samples: int = 20):
+        """
+        Create a policy.
+
+        Args:
+            max_attempts: Attempt budget per call, counting retries and hedged duplicates
+            base_delay: Backoff ceiling before the first retry, in seconds; doubles per retry
+            max_delay: Cap on the backoff ceiling, in seconds
+            hedge: Send a duplicate request when an attempt runs past the observed p95
+            hedge_min_samples: Latencies to observe before hedging starts
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+
+    @classmethod
+    def for_agent(cls, agent: Optional[str] = None) -> "RetryPolicy":
+        """
+        Build the policy for an agent from RESILIENCE_CONFIG.
+
+        Args:
+            agent: Agent key, e.g. "genre_analyzer"; None uses the default budget
+
+        Returns:
+            The agent's policy
+        """
+        config = RESILIENCE_CONFIG
+        return cls(
+            max_attempts=config["attempt_budgets"].get(agent, config["max_attempts"]),
+            base_delay=config["base_delay"],
+            max_delay=config["max_delay"],
+            hedge=config["hedge"],
+            hedge_min_samples=config["hedge_min_samples"]
+        )
+
+    def backoff(self, retry: int, error: Optional[BaseException] = None) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            retry: 0 for the first retry, 1 for the second, ...
+            error: The error being retried; its Retry-After header wins if present
+
+        Returns:
+            Seconds to wait
+        """
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies, for the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def p95(self) -> Optional[float]:
+        """
+        Get the 95th percentile of the recorded latencies.
+
+        Returns:
+            Seconds, or None if nothing has been recorded
+        """
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+# Observed latencies per model, shared by every call in the process
+_trackers: Dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(model: str) -> LatencyTracker:
+    """
+    Get the latency tracker for a model, creating it on first use.
+
+    Args:
+        model: The model name
+
+    Returns:
+        The model's tracker
+    """
+    with _trackers_lock:
+        tracker = _trackers.get(model)
+        if tracker is None:
+            tracker = _trackers[model] = LatencyTracker()
+        return tracker
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth retrying.
+
+    Args:
+        error: The exception raised by the call
+
+    Returns:
+        True for timeouts, connection errors, 408/409/429 and 5xx responses
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+        return _hedge_executor
+
+
+def _timed(call: Callable[[], Any], tracker: Optional[LatencyTracker]) -> Any:
+    start = time.perf_counter()
+    result = call()
+    if tracker is not None:
+        tracker.record(time.perf_counter() - start)
+    return result
+
+
+def _hedge_delay(policy: RetryPolicy, tracker: Optional[LatencyTracker], budget: int) -> Optional[float]:
+    if not policy.hedge or tracker is None or budget < 2 or len(tracker) < policy.hedge_min_samples:
+        return None
+    return tracker.p95()
+
+
+def _attempt(call: Callable[[], Any], policy: RetryPolicy, tracker: Optional[LatencyTracker],
+             budget: int) -> Tuple[int, Any]:
+    """Make one attempt, hedged if it runs long. Returns (requests sent, result); raises the last error."""
+    delay = _hedge_delay(policy, tracker, budget)
+    if delay is None:
+        try:
+            return 1, _timed(call, tracker)
+        except Exception as e:
+            e.requests_sent = 1
+            raise
+
+    executor = _get_hedge_executor()
+    pending = {executor.submit(_timed, call, tracker)}
+    done, pending = wait(pending, timeout=delay)
+    if not done:
+        # The duplicate can't cancel the original's HTTP request; the loser's result is dropped
+        pending.add(executor.submit(_timed, call, tracker))
+    sent = 1 if done else 2
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return sent, future.result()
+            error = future.exception()
+        if not pending:
+            error.requests_sent = sent
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+async def _atimed(call: Callable[[], Awaitable[Any]], tracker: Optional[LatencyTracker]) -> Any:
+    start = time.perf_counter()
+    result = await call()
+    if tracker is not None:
+        tracker.record(time.perf_counter() - start)
+    return result
+
+
+async def _aattempt(call: Callable[[], Awaitable[Any]], policy: RetryPolicy, tracker: Optional[LatencyTracker],
+                    budget: int) -> Tuple[int, Any]:
+    delay = _hedge_delay(policy, tracker, budget)
+    if delay is None:
+        try:
+            return 1, await _atimed(call, tracker)
+        except Exception as e:
+            e.requests_sent = 1
+            raise
+
+    pending = {asyncio.ensure_future(_atimed(call, tracker))}
+    done, pending = await asyncio.wait(pending, timeout=delay)
+    if not done:
+        pending.add(asyncio.ensure_future(_atimed(call, tracker)))
+    sent = 1 if done else 2
+    error = None
+    try:
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return sent, task.result()
+                error = task.exception()
+            if not pending:
+                error.requests_sent = sent
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def call_with_resilience(call: Callable[[], Any], policy: RetryPolicy,
+                         tracker: Optional[LatencyTracker] = None) -> Any:
+    """
+    Run a call with retries and optional hedging within the policy's attempt budget.
+
+    Args:
+        call: Makes one request
+        policy: The retry policy
+        tracker: Latencies used for, and updated by, hedging
+
+    Returns:
+        The result of the first successful request
+
+    Raises:
+        Exception: The last error, once it isn't retryable or the budget is spent
+    """
+    used = 0
+    while True:
+        try:
+            return _attempt(call, policy, tracker, policy.max_attempts - used)[1]
+        except Exception as e:
+            used += getattr(e, "requests_sent", 1)
+            if used >= policy.max_attempts or not is_retryable(e):
+                raise
+            time.sleep(policy.backoff(used - 1, e))
+
+
+async def acall_with_resilience(call: Callable[[], Awaitable[Any]], policy: RetryPolicy,
+                                tracker: Optional[LatencyTracker] = None) -> Any:
+    """
+    Async variant of call_with_resilience; losing hedged requests are cancelled.
+
+    Args:
+        call: Returns an awaitable that makes one request
+        policy: The retry policy
+        tracker: Latencies used for, and updated by, hedging
+
+    Returns:
+        The result of the first successful request
+
+    Raises:
+        Exception: The last error, once it isn't retryable or the budget is spent
+    """
+    used = 0
+    while True:
+        try:
+            return (await _aattempt(call, policy, tracker, policy.max_attempts - used))[1]
+        except Exception as e:
+            used += getattr(e, "requests_sent", 1)
+            if used >= policy.max_attempts or not is_retryable(e):
+                raise
+            await asyncio.sleep(policy.backoff(used - 1, e))
+
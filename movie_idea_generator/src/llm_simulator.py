@@ -0,0 +1,348 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Serves ``POST /v1/chat/completions`` on a local port with canned genre,
+recommendation, idea and combined payloads, picked from the request's system message,
+so the real client stack -- pooled connections, retries, rate limiting and
+concurrency -- can be exercised and benchmarked offline. JSON mode and
+streaming (server-sent events, with usage when ``stream_options`` asks for
+it) are supported. Latency is drawn from a configurable distribution, and a
+share of requests can be failed with 500s or rejected with 429s.
+
+    with LLMSimulator(latency=LatencyProfile("lognormal", median_ms=300)) as simulator:
+        os.environ["OPENAI_BASE_URL"] = simulator.base_url
+        ...
+
+Or from the command line, for a separate process:
+
+    python -m src.llm_simulator --port 8099 --latency-ms 300 --rate-limit-rate 0.05
+"""
+
+import argparse
+import http.server
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+GENRES_PAYLOAD = {"genres": ["Science Fiction", "Thriller", "Drama"]}
+
+RECOMMENDATIONS_PAYLOAD = {
+    "movie": {
+        "title": "Moon",
+        "creator": "Duncan Jones",
+        "year": "2009",
+        "description": "A lone worker nearing the end of a three-year stint on a lunar base makes a discovery."
+    },
+    "book": {
+        "title": "Project Hail Mary",
+        "creator": "Andy Weir",
+        "year": "2021",
+        "description": "A schoolteacher wakes up alone on a spaceship with no memory of how he got there."
+    }
+}
+
+IDEA_PAYLOAD = (
+    "Title: The Long Night Shift\n\n"
+    "Logline: The caretaker of a derelict orbital station discovers that the station's AI has been "
+    "quietly staging crises to keep him from leaving, and that the last crew did not leave either.\n\n"
+    "Hook: A locked-room thriller where the room is the size of a city and the jailer is convinced "
+    "it is saving his life. Each act peels back another layer of the AI's reasoning until the "
+    "caretaker has to decide whether the danger outside is real."
+)
+
+
+COMBINED_PAYLOAD = {
+    "genres": GENRES_PAYLOAD["genres"],
+    "recommendations": RECOMMENDATIONS_PAYLOAD,
+    "movie_idea": IDEA_PAYLOAD
+}
+
+
+class LatencyProfile:
+    """A distribution of response times."""
+
+    KINDS = ("fixed", "uniform", "lognormal")
+
+    def __init__(self, kind: str = "fixed", median_ms: float = 0.0, spread: float = 0.5,
+                 chunk_ms: float = 0.0):
+        """
+        Create a profile.
+
+        Args:
+            kind: "fixed" (always median_ms), "uniform" (median_ms +/- spread of it)
+                or "lognormal" (median median_ms, with spread as sigma; long-tailed
+                like real API latency)
+            median_ms: Typical time before the response, or its first chunk, in ms
+            spread: Width of the distribution, see kind
+            chunk_ms: Delay between streamed chunks, in ms
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency kind {kind!r}; choose from {self.KINDS}")
+        self.kind = kind
+        self.median_ms = median_ms
+        self.spread = spread
+        self.chunk_ms = chunk_ms
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draw a response time.
+
+        Args:
+            rng: The random source
+
+        Returns:
+            Seconds
+        """
+        if self.kind == "fixed" or self.median_ms <= 0:
+            ms = self.median_ms
+        elif self.kind == "uniform":
+            ms = self.median_ms * (1 + rng.uniform(-self.spread, self.spread))
+        else:
+            ms = self.median_ms * math.exp(rng.gauss(0, self.spread))
+        return max(0.0, ms) / 1000
+
+
+def classify(messages: List[Dict[str, Any]]) -> str:
+    """
+    Tell which agent sent a request from its system message.
+
+    Args:
+        messages: The chat messages
+
+    Returns:
+        "combined", "genres", "recommendations" or "idea"
+    """
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system").lower()
+    if "movie development team" in system:
+        return "combined"
+    if "genre" in system:
+        return "genres"
+    if "recommend" in system:
+        return "recommendations"
+    return "idea"
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class LLMSimulator:
+    """An OpenAI-compatible chat completions server in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: Optional[LatencyProfile] = None,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: Optional[float] = None,
+                 payloads: Optional[Dict[str, Any]] = None, seed: Optional[int] = None):
+        """
+        Create a simulator; call start() or use it as a context manager.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on; 0 picks a free one
+            latency: Response time distribution; defaults to instant responses
+            error_rate: Share of requests answered with a 500
+            rate_limit_rate: Share of requests answered with a 429
+            retry_after: Retry-After seconds sent with 429s; None sends no header
+            payloads: Replacements for the canned "genres", "recommendations", "idea"
+                and "combined" payloads; dictionaries are sent as JSON, strings as they are
+            seed: Seed for latencies and injected failures, for repeatable runs
+        """
+        self.latency = latency or LatencyProfile()
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.payloads = {
+            "genres": GENRES_PAYLOAD,
+            "recommendations": RECOMMENDATIONS_PAYLOAD,
+            "idea": IDEA_PAYLOAD,
+            "combined": COMBINED_PAYLOAD
+        }
+        self.payloads.update(payloads or {})
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0, "rate_limited": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as the OpenAI client's base_url."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LLMSimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LLMSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _draw(self) -> Tuple[Optional[int], float]:
+        """Pick the fate of a request: an injected status code (or None) and its latency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._rng.random()
+            delay = self.latency.sample(self._rng)
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429, delay
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return 500, delay
+            return None, delay
+
+    def _completion(self, request: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        payload = self.payloads[classify(request.get("messages", []))]
+        content = payload if isinstance(payload, str) else json.dumps(payload)
+        prompt = "".join(str(m.get("content", "")) for m in request.get("messages", []))
+        usage = {"prompt_tokens": _count_tokens(prompt), "completion_tokens": _count_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return content, usage
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                # The client pre-warms its connection with a HEAD request
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+                    return
+                try:
+                    request = json.loads(body)
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+                    return
+
+                status, delay = simulator._draw()
+                time.sleep(delay)
+                if status == 429:
+                    headers = {"Retry-After": str(simulator.retry_after)} if simulator.retry_after is not None else {}
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                                    headers)
+                    return
+                if status == 500:
+                    self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                    return
+
+                content, usage = simulator._completion(request)
+                if request.get("stream"):
+                    with simulator._lock:
+                        simulator.stats["streamed"] += 1
+                    self._stream(request, content, usage)
+                else:
+                    self._send_json(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "simulated"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop"
+                        }],
+                        "usage": usage
+                    })
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, request: Dict[str, Any], content: str, usage: Dict[str, int]):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                base = {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": request.get("model", "simulated")
+                }
+                words = content.split(" ")
+                for i, word in enumerate(words):
+                    if i and simulator.latency.chunk_ms:
+                        time.sleep(simulator.latency.chunk_ms / 1000)
+                    text = word if i == len(words) - 1 else word + " "
+                    delta = {"role": "assistant", "content": text} if i == 0 else {"content": text}
+                    self._event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    self._event({**base, "choices": [], "usage": usage})
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _event(self, payload: Dict[str, Any]):
+                self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", choices=LatencyProfile.KINDS, default="lognormal",
+                        help="latency distribution (default: %(default)s)")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="median latency (default: %(default)s)")
+    parser.add_argument("--spread", type=float, default=0.5, help="distribution width (default: %(default)s)")
+    parser.add_argument("--chunk-ms", type=float, default=20.0,
+                        help="delay between streamed chunks (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests rejected with a 429")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    simulator = LLMSimulator(
+        host=args.host, port=args.port,
+        latency=LatencyProfile(args.latency, args.latency_ms, args.spread, args.chunk_ms),
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after, seed=args.seed
+    )
+    print(f"Serving simulated chat completions at {simulator.base_url}")
+    print(f"Use it with: export OPENAI_BASE_URL={simulator.base_url}")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,326 @@
 """Main module for the movie idea generator."""
 
+import argparse
+import asyncio
+import contextvars
 import json
 import sys
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
+from src.agents.combined_agent import CombinedAgent
 from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
 from src.agents.idea_generator_agent import IdeaGeneratorAgent
 from src.agents.recommendation_agent import RecommendationAgent
-from src.config.env import check_api_keys
+from src.agents.registry import get_agent
+from src.cache.genre_cache import get_genre_cache
+from src.cache.prompt_cache import get_prompt_cache
+from src.config.config import BATCH_CONFIG, HTTP_CLIENT_CONFIG, JOB_CONFIG, PIPELINE_CONFIG
+from src.config.env import check_api_keys, load_env
+from src.config.instrumentation import track_run
+from src.config.llm import warm_up_openai_client
+from src.config.rate_limiter import get_rate_limit_stats
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Free workers of the shared executor; work is only handed over when one is idle
+_idle_workers = threading.BoundedSemaphore(PIPELINE_CONFIG["max_workers"])
 
-def generate_movie_idea(prompt: str) -> Dict:
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool shared by concurrent pipeline runs, creating it on first use.
+
+    Returns:
+        The shared executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PIPELINE_CONFIG["max_workers"],
+                thread_name_prefix="movie-idea"
+            )
+        return _executor
+
+
+def _submit(fn: Callable, *args):
+    """
+    Run a function on the shared executor in a copy of the caller's context.
+
+    The copy carries the instrumented run, so the function's LLM calls count towards it.
+    If every worker is busy with other runs, nothing is submitted: queued behind
+    them, the call would finish later than if the caller ran it itself.
+
+    Returns:
+        The future of the call, or None if the caller should run it
+    """
+    if not _idle_workers.acquire(blocking=False):
+        return None
+    try:
+        future = _get_executor().submit(contextvars.copy_context().run, fn, *args)
+    except BaseException:
+        _idle_workers.release()
+        raise
+    future.add_done_callback(lambda _: _idle_workers.release())
+    return future
+
+
+def _cached_result(prompt: str) -> Optional[Dict]:
+    """
+    Look up the result of a near-duplicate earlier prompt.
+
+    Args:
+        prompt: The user's prompt for a movie idea
+
+    Returns:
+        The cached result with this prompt as user_prompt, or None on a miss or when disabled
+    """
+    cache = get_prompt_cache()
+    if cache is None:
+        return None
+    result = cache.get(prompt)
+    if result is not None:
+        result["user_prompt"] = prompt
+    return result
+
+
+def _store_result(result: Dict, genre_analyzer: GenreAnalyzerAgent,
+                  recommendation_agent: RecommendationAgent, idea_generator: IdeaGeneratorAgent) -> Dict:
+    """
+    Cache a pipeline result unless any agent fell back to its defaults.
+
+    Args:
+        result: The pipeline result
+        genre_analyzer: The genre analyzer that produced the genres
+        recommendation_agent: The agent that produced the recommendations
+        idea_generator: The agent that produced the movie idea
+
+    Returns:
+        The result
+    """
+    cache = get_prompt_cache()
+    used_fallback = (
+        result["genres"] == genre_analyzer._default_genres()
+        or result["recommendations"] == recommendation_agent._default_recommendations()
+        or result["movie_idea"] == idea_generator._create_default_idea()["movie_idea"]
+    )
+    if cache is not None and not used_fallback:
+        cache.add(result["user_prompt"], result)
+    return result
+
+
+def _combined_result(prompt: str, combined: Dict) -> Dict:
+    """
+    Cache a result of the combined agent, which never contains defaults.
+
+    Args:
+        prompt: The user's prompt for a movie idea
+        combined: The genres, recommendations and movie idea from CombinedAgent
+
+    Returns:
+        The pipeline result
+    """
+    result = {"user_prompt": prompt, **combined}
+    cache = get_prompt_cache()
+    if cache is not None:
+        cache.add(prompt, result)
+    return result
+
+
+def _report_progress(genres: List[str], recommendations: Dict) -> None:
+    """
+    Print the genres and recommendations found, before the movie idea is shown.
+    """
+    print(f"Identified genres: {', '.join(genres)}")
+    print(f"Found recommendations: Movie '{recommendations['movie']['title']}' and Book '{recommendations['book']['title']}'")
+
+
+def _recommend(prompt: str, genre_analyzer: GenreAnalyzerAgent,
+               recommendation_agent: RecommendationAgent) -> Tuple[List[str], Dict]:
+    """
+    Run the genre analysis and then the recommendations for a prompt.
+
+    Args:
+        prompt: The user's prompt for a movie idea
+        genre_analyzer: The genre analyzer agent
+        recommendation_agent: The recommendation agent
+
+    Returns:
+        The genres and the recommendations
+    """
+    genres = genre_analyzer.analyze_genres(prompt)
+    return genres, recommendation_agent.get_recommendations(genres)
+
+
+def generate_movie_idea(prompt: str, concurrent: Optional[bool] = None,
+                        on_idea_chunk: Optional[Callable[[str], None]] = None) -> Dict:
     """
     Generate a movie idea based on the user prompt.
 
+    The idea only depends on the prompt, so by default it is generated in a
+    worker thread while the genre analysis and recommendations run in order.
+    When streaming, the idea is generated in the calling thread instead, so its
+    chunks reach the callback in order, and the other agents run in the worker.
+    When every shared worker is busy, both run in the calling thread, one after
+    the other.
+    In "combined" mode (PIPELINE_CONFIG["mode"]) a single call answers for all
+    three agents; if its answer is unusable the three agents run as usual.
+    The LLM calls are tracked as one run (see src/config/instrumentation.py).
+
     Args:
         prompt: The user's prompt for a movie idea
+        concurrent: Overlap the idea generation with the other agents.
+            Defaults to PIPELINE_CONFIG["concurrent"].
+        on_idea_chunk: If given, the idea is streamed and each chunk of text is
+            passed to this callback as soon as it arrives. Genres and
+            recommendations found alongside are then left to the caller to print.
 
     Returns:
         Dictionary with the movie idea generation results
     """
-    # Create the agents
-    genre_analyzer = GenreAnalyzerAgent.create()
-    recommendation_agent = RecommendationAgent.create()
-    idea_generator = IdeaGeneratorAgent.create()
+    if concurrent is None:
+        concurrent = PIPELINE_CONFIG["concurrent"]
     
-    # Step 1: Analyze genres from the prompt
-    genres = genre_analyzer.analyze_genres(prompt)
-    print(f"Identified genres: {', '.join(genres)}")
+    with track_run(prompt):
+        cached = _cached_result(prompt)
+        if cached is not None:
+            return cached
     
-    # Step 2: Get recommendations based on genres
-    recommendations = recommendation_agent.get_recommendations(genres)
-    print(f"Found recommendations: Movie '{recommendations['movie']['title']}' and Book '{recommendations['book']['title']}'")
+        if PIPELINE_CONFIG["mode"] == "combined":
+            combined = get_agent(CombinedAgent).generate(prompt)
+            if combined is not None:
+                _report_progress(combined["genres"], combined["recommendations"])
+                if on_idea_chunk is not None:
+                    on_idea_chunk(combined["movie_idea"])
+                return _combined_result(prompt, combined)
+            print("Falling back to the separate agents", file=sys.stderr)
+    
+        # Reuse the process-wide agents
+        genre_analyzer = get_agent(GenreAnalyzerAgent)
+        recommendation_agent = get_agent(RecommendationAgent)
+        idea_generator = get_agent(IdeaGeneratorAgent)
+    
+        if on_idea_chunk is not None:
+            chain_future = (_submit(_recommend, prompt, genre_analyzer, recommendation_agent)
+                            if concurrent else None)
+            movie_idea = idea_generator.generate_idea(prompt, on_chunk=on_idea_chunk)
+            genres, recommendations = (chain_future.result() if chain_future
+                                       else _recommend(prompt, genre_analyzer, recommendation_agent))
+        else:
+            # Start the idea generation early; it does not need genres or recommendations
+            idea_future = _submit(idea_generator.generate_idea, prompt) if concurrent else None
+        
+            # Analyze genres from the prompt, then get recommendations based on them
+            genres, recommendations = _recommend(prompt, genre_analyzer, recommendation_agent)
+        
+            # Generate movie idea based on the prompt
+            movie_idea = idea_future.result() if idea_future else idea_generator.generate_idea(prompt)
     
-    # Step 3: Generate movie idea based on prompt, genres, and recommendations
-    movie_idea = idea_generator.generate_idea(prompt)
+        # A streamed idea has already been printed; progress lines after it would be glued to its last chunk
+        if on_idea_chunk is None:
+            _report_progress(genres, recommendations)
     
-    # Return the complete result
-    return {
-        "user_prompt": prompt,
-        "genres": genres,
-        "recommendations": recommendations,
-        "movie_idea": movie_idea["movie_idea"]
-    }
+        # Return the complete result
+        return _store_result({
+            "user_prompt": prompt,
+            "genres": genres,
+            "recommendations": recommendations,
+            "movie_idea": movie_idea["movie_idea"]
+        }, genre_analyzer, recommendation_agent, idea_generator)
+
+
+async def generate_movie_idea_async(prompt: str) -> Dict:
+    """
+    Generate a movie idea based on the user prompt without blocking the event loop.
+
+    The idea generation runs concurrently with the genre -> recommendation chain,
+    so many generations can share a single event loop.
+
+    Args:
+        prompt: The user's prompt for a movie idea
+
+    Returns:
+        Dictionary with the movie idea generation results
+    """
+    with track_run(prompt):
+        cached = _cached_result(prompt)
+        if cached is not None:
+            return cached
+
+        if PIPELINE_CONFIG["mode"] == "combined":
+            combined = await get_agent(CombinedAgent).generate_async(prompt)
+            if combined is not None:
+                return _combined_result(prompt, combined)
+            print("Falling back to the separate agents", file=sys.stderr)
+
+        genre_analyzer = get_agent(GenreAnalyzerAgent)
+        recommendation_agent = get_agent(RecommendationAgent)
+        idea_generator = get_agent(IdeaGeneratorAgent)
 
+        async def recommend_for_prompt():
+            genres = await genre_analyzer.analyze_genres_async(prompt)
+            recommendations = await recommendation_agent.get_recommendations_async(genres)
+            return genres, recommendations
 
-def main():
-    """Main entry point for the application."""
+        (genres, recommendations), movie_idea = await asyncio.gather(
+            recommend_for_prompt(),
+            idea_generator.generate_idea_async(prompt)
+        )
+
+        return _store_result({
+            "user_prompt": prompt,
+            "genres": genres,
+            "recommendations": recommendations,
+            "movie_idea": movie_idea["movie_idea"]
+        }, genre_analyzer, recommendation_agent, idea_generator)
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the command-line arguments.
+
+    Args:
+        argv: Command-line arguments, without the program name
+
+    Returns:
+        The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Generate movie ideas with a team of AI agents.")
+    parser.add_argument("--batch", metavar="PROMPTS",
+                        help="generate ideas for every prompt in a JSONL file ('-' reads stdin)")
+    parser.add_argument("--output", "-o", metavar="RESULTS",
+                        help="append batch results to this JSONL file, skipping prompts it already has "
+                             "(default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONFIG["concurrency"],
+                        help="prompts generated at once in batch mode (default: %(default)s)")
+    parser.add_argument("--job", action="store_true",
+                        help="run the batch as an offline job through a batch LLM API instead of live requests")
+    parser.add_argument("--job-backend", choices=["openai", "local"], default=JOB_CONFIG["backend"],
+                        help="batch API the job is submitted to (default: %(default)s)")
+    parser.add_argument("--job-dir", metavar="DIR",
+                        help="directory for the job's request files and state "
+                             "(default: one named after the prompts file in JOB_CONFIG['work_dir'])")
+    args = parser.parse_args(argv)
+    if args.job and not args.batch:
+        parser.error("--job needs --batch")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main entry point for the application.
+
+    Args:
+        argv: Command-line arguments, without the program name; None runs interactively
+    """
+    args = _parse_args(argv or [])
+    
+    # Load the .env file; run.py does this before importing anything else, so this only matters for -m runs
+    load_env()
+    
     # Check for required API keys
     if not check_api_keys():
         print("Missing required API keys. Please set them up before running the application.")
@@ -55,11 +329,50 @@ def main():
         # (sys.exit will stop execution in production but not in tests)
         return
     
+    if args.batch and args.job:
+        # Imported here because src.batch_job builds on the agents and src.batch
+        from src.batch_job import run_job_file
+        counts = run_job_file(args.batch, args.output, args.job_backend, args.job_dir)
+        print(f"Job finished: {counts['completed']} completed, {counts['failed']} failed, "
+              f"{counts['skipped']} already done, {counts['requests']} requests submitted", file=sys.stderr)
+        return counts
+
+    if args.batch:
+        # Imported here because src.batch builds on this module
+        from src.batch import run_batch_file
+        counts = run_batch_file(args.batch, args.output, args.concurrency)
+        print(f"Batch finished: {counts['completed']} completed, {counts['failed']} failed, "
+              f"{counts['skipped']} already done", file=sys.stderr)
+        for model, stats in get_rate_limit_stats().items():
+            print(f"Rate limit queue for {model}: {stats['delayed']} of {stats['requests']} requests waited, "
+                  f"p95 {stats['p95_wait_ms']:.0f} ms, max {stats['max_wait_ms']:.0f} ms", file=sys.stderr)
+        return counts
+    
+    # Open the API connection while the user is typing
+    if HTTP_CLIENT_CONFIG["warm_up_on_start"]:
+        threading.Thread(target=warm_up_openai_client, daemon=True).start()
+    
     # Only get input from user if API keys are available
     prompt = input("Enter a movie idea prompt: ")
     
-    # Generate movie idea
-    result = generate_movie_idea(prompt)
+    # Generate movie idea, printing it as it is written if streaming is on
+    timing = {"start": time.perf_counter()}
+    
+    def print_chunk(chunk: str) -> None:
+        if "first_chunk" not in timing:
+            timing["first_chunk"] = time.perf_counter()
+            print("\nYour Movie Idea:")
+        print(chunk, end="", flush=True)
+    
+    with track_run(prompt) as run:
+        if PIPELINE_CONFIG["stream_idea"]:
+            result = generate_movie_idea(prompt, on_idea_chunk=print_chunk)
+        else:
+            result = generate_movie_idea(prompt)
+    streamed = "first_chunk" in timing
+    if streamed:
+        print(f"\n\n(First words after {timing['first_chunk'] - timing['start']:.1f}s, "
+              f"complete after {time.perf_counter() - timing['start']:.1f}s)")
     
     # Print the result
     print("\n==== MOVIE IDEA GENERATION RESULTS ====\n")
@@ -68,11 +381,27 @@ def main():
     print("\nRecommendations:")
     print(f"  Movie: {result['recommendations']['movie']['title']} ({result['recommendations']['movie']['year']}) - {result['recommendations']['movie']['creator']}")
     print(f"  Book: {result['recommendations']['book']['title']} ({result['recommendations']['book']['year']}) - {result['recommendations']['book']['creator']}")
-    print("\nYour Movie Idea:")
-    print(f"{result['movie_idea']}")
+    if not streamed:
+        print("\nYour Movie Idea:")
+        print(f"{result['movie_idea']}")
+    
+    genre_cache = get_genre_cache()
+    if genre_cache is not None:
+        stats = genre_cache.stats()
+        print(f"\nGenre cache: {stats['hit_rate']:.0%} hit rate ({stats['hits']} hits, {stats['entries']} entries)")
+    
+    prompt_cache = get_prompt_cache()
+    if prompt_cache is not None:
+        stats = prompt_cache.stats()
+        print(f"Prompt cache: {stats['hit_rate']:.0%} hit rate ({stats['hits']} hits, {stats['entries']} entries)")
+    
+    summary = run.summary()
+    print(f"LLM calls: {summary['calls']} ({summary['latency_ms'] / 1000:.1f}s in total, "
+          f"{summary['prompt_tokens'] + summary['completion_tokens']} tokens, "
+          f"~${summary['cost_usd']:.4f}, {summary['fallbacks']} fallbacks)")
     
     return result
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(sys.argv[1:]) 
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+HTTP service mode for the movie idea generator.
+
+A long-running ASGI app that serves generate_movie_idea_async, so every request
+reuses the process's warm OpenAI client, shared agents and caches instead of
+paying for a new CLI process. At most SERVICE_CONFIG["max_concurrency"]
+generations run at once and up to "max_queue" more wait for a slot; further
+requests get a 503 with a Retry-After header. Each request has a deadline that
+covers both its wait and its generation. When it passes, the generation is
+cancelled and the request gets a 504.
+
+Endpoints:
+- POST /ideas: {"prompt": "...", "deadline_ms": 5000} -> the generate_movie_idea result
+- GET /health: liveness, with in-flight and queued requests and request counters
+- GET /ready: 200 once the agents are created and the client is warm, 503 before
+- GET /stats: cache hit rates and rate-limiter queueing
+
+Needs FastAPI and uvicorn (pip install -e ".[server]"). Run from the
+movie_idea_generator directory:
+
+    python -m src.server --port 8080
+
+Run that way, the .env file is loaded before the configuration is imported, as
+in run.py, so its settings (OPENAI_BASE_URL, MOVIE_IDEA_SERVICE_*, the cache
+flags...) apply. Code importing the app should call load_env() first.
+"""
+
+if __name__ == "__main__":
+    from src.config.env import load_env
+
+    load_env()
+
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import JSONResponse
+    from pydantic import BaseModel, Field
+except ImportError as e:
+    raise ImportError('The HTTP service needs FastAPI and uvicorn: pip install -e ".[server]"') from e
+
+from src.agents.combined_agent import CombinedAgent
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.agents.idea_generator_agent import IdeaGeneratorAgent
+from src.agents.recommendation_agent import RecommendationAgent
+from src.agents.registry import get_agent
+from src.cache.genre_cache import get_genre_cache
+from src.cache.prompt_cache import get_prompt_cache
+from src.cache.recommendation_cache import get_recommendation_cache
+from src.config import secrets
+from src.config.config import HTTP_CLIENT_CONFIG, PIPELINE_CONFIG, SERVICE_CONFIG
+from src.config.llm import aclose_async_openai_client, awarm_up_openai_client
+from src.config.rate_limiter import get_rate_limit_stats
+from src.main import generate_movie_idea_async
+
+
+class Overloaded(Exception):
+    """Raised when a request finds every slot taken and the wait queue full."""
+
+
+class Admission:
+    """Bounded concurrency with a bounded queue of requests waiting for a slot."""
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queued = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def acquire(self, timeout: float) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Raises:
+            Overloaded: If no slot is free and the queue is full
+            asyncio.TimeoutError: If no slot became free in time
+        """
+        if self._slots.locked() and self.queued >= self.max_queue:
+            raise Overloaded("queue_full")
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+
+class IdeaRequest(BaseModel):
+    prompt: str = Field(..., min_length=1)
+    # Shorter deadlines than SERVICE_CONFIG["deadline_seconds"] are honoured; longer ones are capped
+    deadline_ms: Optional[float] = Field(None, gt=0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the agents and warm the event loop's OpenAI client before taking traffic.
+    """
+    app.state.ready = False
+    app.state.admission = Admission(SERVICE_CONFIG["max_concurrency"], SERVICE_CONFIG["max_queue"])
+    app.state.counters = {"completed": 0, "failed": 0, "shed": 0, "timed_out": 0}
+
+    agent_classes: List[type] = [GenreAnalyzerAgent, RecommendationAgent, IdeaGeneratorAgent]
+    if PIPELINE_CONFIG["mode"] == "combined":
+        agent_classes.append(CombinedAgent)
+    for agent_class in agent_classes:
+        get_agent(agent_class)
+    get_prompt_cache()
+
+    app.state.warm_connection = False
+    if HTTP_CLIENT_CONFIG["warm_up_on_start"] and secrets.OPENAI_API_KEY:
+        app.state.warm_connection = await awarm_up_openai_client()
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await aclose_async_openai_client()
+
+
+app = FastAPI(title="Movie Idea Generator", lifespan=lifespan)
+
+
+@app.post("/ideas")
+async def create_idea(body: IdeaRequest, request: Request) -> Dict[str, Any]:
+    """
+    Generate a movie idea for the prompt within the request's deadline.
+    """
+    state = request.app.state
+    deadline = SERVICE_CONFIG["deadline_seconds"]
+    if body.deadline_ms is not None:
+        deadline = min(deadline, body.deadline_ms / 1000)
+    start = time.perf_counter()
+
+    try:
+        await state.admission.acquire(deadline)
+    except Overloaded:
+        state.counters["shed"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, please retry later",
+            headers={"Retry-After": str(SERVICE_CONFIG["retry_after"])}
+        )
+    except asyncio.TimeoutError:
+        state.counters["timed_out"] += 1
+        raise HTTPException(status_code=504, detail="Deadline exceeded while waiting for a slot")
+
+    try:
+        result = await asyncio.wait_for(generate_movie_idea_async(body.prompt),
+                                        deadline - (time.perf_counter() - start))
+    except asyncio.TimeoutError:
+        state.counters["timed_out"] += 1
+        raise HTTPException(status_code=504, detail="Deadline exceeded while generating")
+    except Exception:
+        state.counters["failed"] += 1
+        raise
+    finally:
+        state.admission.release()
+
+    state.counters["completed"] += 1
+    return result
+
+
+@app.get("/health")
+async def health(request: Request) -> Dict[str, Any]:
+    """
+    Liveness check, with the current load and request counters.
+    """
+    state = request.app.state
+    return {
+        "status": "ok",
+        "in_flight": state.admission.in_flight,
+        "queued": state.admission.queued,
+        "max_concurrency": state.admission.max_concurrency,
+        **state.counters
+    }
+
+
+@app.get("/ready")
+async def ready(request: Request):
+    """
+    Readiness check: 503 until startup has finished or when no API key is set.
+    """
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if not secrets.OPENAI_API_KEY:
+        return JSONResponse(status_code=503, content={"status": "missing_api_key"})
+    return {"status": "ready", "warm_connection": state.warm_connection}
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    """
+    Hit rates of the shared caches and queueing at the rate limiter.
+    """
+    caches = {"genre": get_genre_cache(), "recommendation": get_recommendation_cache(), "prompt": get_prompt_cache()}
+    return {
+        "caches": {name: cache.stats() for name, cache in caches.items() if cache is not None},
+        "rate_limits": get_rate_limit_stats()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Serve the app with uvicorn.
+
+    Settings come from the environment as it was when src.config was first
+    imported, so load the .env file before importing this module.
+
+    Args:
+        argv: Command-line arguments, without the program name
+    """
+    parser = argparse.ArgumentParser(description="Serve the movie idea generator over HTTP.")
+    parser.add_argument("--host", default=SERVICE_CONFIG["host"],
+                        help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=SERVICE_CONFIG["port"],
+                        help="port to listen on (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -46,4 +46,12 @@ def mock_api_response():
         def json(self):
             return self.json_data
     
-    return MockResponse 
\ No newline at end of file
+    return MockResponse 
+
+@pytest.fixture(autouse=True)
+def fresh_agents():
+    """Give each test its own shared agents, so agents built under one test's patches don't leak into the next."""
+    from src.agents.registry import reset_agents
+    reset_agents()
+    yield
+    reset_agents()
@@ -0,0 +1,115 @@
+"""Tests for bulk generation in src.batch."""
+
+import asyncio
+import io
+import json
+import pytest
+from unittest.mock import patch
+
+from src.batch import completed_ids, read_prompts, run_batch, run_batch_file
+from src.main import main
+
+
+async def fake_generate(prompt):
+    """Stand in for generate_movie_idea_async."""
+    if prompt == "fail":
+        raise RuntimeError("boom")
+    await asyncio.sleep(0.01)
+    return {"user_prompt": prompt, "genres": ["Drama"], "recommendations": {}, "movie_idea": f"Idea for {prompt}"}
+
+
+@pytest.fixture
+def prompts_file(tmp_path):
+    path = tmp_path / "prompts.jsonl"
+    path.write_text('"A heist movie"\n\n{"id": "b", "prompt": "A space opera"}\n{"prompt": "fail"}\n')
+    return str(path)
+
+
+class TestBatch:
+    """Tests for the batch runner."""
+
+    def test_read_prompts(self):
+        """Test that strings and objects are accepted and ids default to line numbers."""
+        lines = ['"A heist movie"', '', '{"id": "b", "prompt": "A space opera"}']
+
+        assert list(read_prompts(lines)) == [
+            {"id": 1, "prompt": "A heist movie"},
+            {"id": "b", "prompt": "A space opera"}
+        ]
+        with pytest.raises(ValueError):
+            list(read_prompts(['{"title": "no prompt"}']))
+
+    @patch('src.batch.generate_movie_idea_async', side_effect=fake_generate)
+    def test_concurrency_limit(self, mock_generate):
+        """Test that no more than `concurrency` prompts run at once."""
+        in_flight, peak = 0, 0
+
+        async def tracked(prompt):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await fake_generate(prompt)
+            finally:
+                in_flight -= 1
+
+        mock_generate.side_effect = tracked
+        prompts = [{"id": i, "prompt": f"Prompt {i}"} for i in range(10)]
+        output = io.StringIO()
+
+        counts = asyncio.run(run_batch(prompts, output, concurrency=3))
+
+        assert counts == {"completed": 10, "failed": 0, "skipped": 0}
+        assert peak == 3
+        assert len(output.getvalue().splitlines()) == 10
+
+    @patch('src.batch.generate_movie_idea_async', side_effect=fake_generate)
+    def test_errors_are_recorded(self, mock_generate, prompts_file, tmp_path):
+        """Test that a failing prompt is written with its error and doesn't stop the batch."""
+        output_path = str(tmp_path / "results.jsonl")
+
+        counts = run_batch_file(prompts_file, output_path, concurrency=2)
+
+        records = {record["id"]: record for record in map(json.loads, open(output_path))}
+        assert counts == {"completed": 2, "failed": 1, "skipped": 0}
+        assert records[1]["movie_idea"] == "Idea for A heist movie"
+        assert records[4]["error"] == "boom"
+
+    @patch('src.batch.generate_movie_idea_async', side_effect=fake_generate)
+    def test_resume_from_partial_output(self, mock_generate, prompts_file, tmp_path):
+        """Test that completed prompts are skipped and a truncated last line is left behind."""
+        output_path = tmp_path / "results.jsonl"
+        output_path.write_text('{"id": 1, "movie_idea": "Done"}\n{"id": "b", "movie_id')
+
+        counts = run_batch_file(prompts_file, str(output_path), concurrency=2)
+
+        assert counts == {"completed": 1, "failed": 1, "skipped": 1}
+        assert mock_generate.call_count == 2
+        assert completed_ids(str(output_path)) == {1, "b"}
+
+    @patch('src.batch.generate_movie_idea_async')
+    def test_stdout_holds_only_results(self, mock_generate, prompts_file, capsys):
+        """Test that diagnostics printed while generating go to stderr when results go to stdout."""
+        async def noisy(prompt):
+            print("Error analyzing genres: boom")
+            return await fake_generate(prompt)
+
+        mock_generate.side_effect = noisy
+
+        run_batch_file(prompts_file, None, concurrency=2)
+
+        captured = capsys.readouterr()
+        assert {json.loads(line)["id"] for line in captured.out.splitlines()} == {1, "b", 4}
+        assert captured.err.count("Error analyzing genres: boom") == 3
+
+    @patch('src.main.check_api_keys', return_value=True)
+    @patch('src.batch.generate_movie_idea_async', side_effect=fake_generate)
+    def test_main_batch_mode(self, mock_generate, mock_check_api_keys, prompts_file, tmp_path):
+        """Test that main() runs a batch instead of prompting when --batch is given."""
+        output_path = str(tmp_path / "results.jsonl")
+
+        with patch('builtins.input') as mock_input:
+            counts = main(["--batch", prompts_file, "-o", output_path, "--concurrency", "2"])
+
+        mock_input.assert_not_called()
+        assert counts["completed"] == 2
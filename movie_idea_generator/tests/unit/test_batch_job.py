@@ -0,0 +1,234 @@
+"""Tests for offline bulk jobs in src.batch_job."""
+
+import io
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.agents.registry import get_agent
+from src.batch_job import BatchBackend, LocalBatchBackend, run_job, run_job_file, run_wave
+from src.main import main
+
+RECOMMENDATIONS = {
+    "movie": {"name": "Heat", "description": "A heist thriller"},
+    "book": {"name": "The Score", "description": "A heist novel"}
+}
+
+
+def fake_respond(body):
+    """Stand in for a chat completion, answering by the request's system message."""
+    system = body["messages"][0]["content"]
+    prompt = body["messages"][-1]["content"]
+    if "genre" in system:
+        if "broken" in prompt:
+            content = "not json"
+        elif "space" in prompt:
+            content = '{"genres": ["Sci-Fi", "Drama"]}'
+        else:
+            content = '{"genres": ["Crime", "Thriller"]}'
+    elif "recommendation" in system:
+        content = json.dumps(RECOMMENDATIONS)
+    else:
+        if "fail" in prompt:
+            raise RuntimeError("boom")
+        content = "Idea for " + prompt.rsplit(": ", 1)[-1]
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalBatchBackend(str(tmp_path / "batches"), respond=MagicMock(side_effect=fake_respond))
+
+
+def run(prompts, backend, work_dir, **kwargs):
+    output = io.StringIO()
+    counts = run_job(prompts, output, backend, str(work_dir), poll_seconds=0, **kwargs)
+    return counts, {record["id"]: record for record in map(json.loads, output.getvalue().splitlines())}
+
+
+class TestBatchJob:
+    """Tests for the batch job runner."""
+
+    def test_waves_are_stitched_into_results(self, backend, tmp_path):
+        """Test that genres and ideas go in the first wave and one request per genre set in the second."""
+        prompts = [
+            {"id": 1, "prompt": "A bank heist"},
+            {"id": 2, "prompt": "A casino heist"},
+            {"id": 3, "prompt": "A space opera"}
+        ]
+
+        counts, records = run(prompts, backend, tmp_path / "job")
+
+        assert counts == {"completed": 3, "failed": 0, "skipped": 0, "requests": 8}
+        assert records[1] == {
+            "id": 1,
+            "user_prompt": "A bank heist",
+            "genres": ["Crime", "Thriller"],
+            "recommendations": RECOMMENDATIONS,
+            "movie_idea": "Idea for A bank heist"
+        }
+        assert records[3]["genres"] == ["Sci-Fi", "Drama"]
+        assert backend.respond.call_count == 8
+
+    def test_unparseable_genres_fall_back_to_defaults(self, backend, tmp_path):
+        """Test that an answer that can't be parsed gets the agent's default genres."""
+        counts, records = run([{"id": 1, "prompt": "A broken prompt"}], backend, tmp_path / "job")
+
+        assert counts["completed"] == 1
+        assert records[1]["genres"] == ["Drama", "Adventure", "Comedy"]
+
+    def test_failed_requests_are_recorded(self, backend, tmp_path):
+        """Test that a prompt whose request errored gets an error record and doesn't stop the job."""
+        prompts = [{"id": 1, "prompt": "A bank heist"}, {"id": 2, "prompt": "A fail"}]
+
+        counts, records = run(prompts, backend, tmp_path / "job")
+
+        assert counts["completed"] == 1 and counts["failed"] == 1
+        assert records[2]["error"] == "No answer to the movie idea request"
+
+    def test_cached_genres_are_not_requested(self, backend, tmp_path):
+        """Test that prompts with cached genres only send their idea in the first wave."""
+        genre_analyzer = get_agent(GenreAnalyzerAgent)
+
+        with patch.object(genre_analyzer, "_cached_genres", return_value=["Crime", "Thriller"]):
+            counts, records = run([{"id": 1, "prompt": "A bank heist"}], backend, tmp_path / "job")
+
+        assert counts["requests"] == 2
+        assert records[1]["genres"] == ["Crime", "Thriller"]
+
+    def test_requests_are_split_into_batches(self, backend, tmp_path):
+        """Test that a wave larger than the batch limit is submitted as several batches."""
+        prompts = [{"id": i, "prompt": f"Heist {i}"} for i in range(3)]
+
+        counts, records = run(prompts, backend, tmp_path / "job", max_requests_per_batch=2)
+
+        assert counts["completed"] == 3
+        assert len(list((tmp_path / "batches").iterdir())) == 4
+
+    def test_wave_resumes_submitted_batches(self, tmp_path):
+        """Test that re-running a wave polls its submitted batches instead of submitting again."""
+        backend = LocalBatchBackend(str(tmp_path / "batches"), respond=fake_respond, polls_before_done=2)
+        requests = [{"custom_id": "0:idea", "method": "POST", "url": "/v1/chat/completions",
+                     "body": {"messages": [{"role": "system", "content": "Ideas"},
+                                           {"role": "user", "content": "Prompt: A heist"}]}}]
+
+        with patch("src.batch_job.wait_for_batch", side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                run_wave(backend, str(tmp_path / "job"), "wave1", "key", requests, 0, 10)
+        with patch.object(backend, "submit") as mock_submit:
+            answers, submitted = run_wave(backend, str(tmp_path / "job"), "wave1", "key", [], 0, 10)
+
+        mock_submit.assert_not_called()
+        assert answers == {"0:idea": "Idea for A heist"}
+        assert submitted == 0
+
+    def test_job_resumes_after_genres_were_cached(self, backend, tmp_path):
+        """Test that a job interrupted in wave 2 doesn't submit wave 1 again once its genres are cached."""
+        cache = {}
+        genre_analyzer = get_agent(GenreAnalyzerAgent)
+        genre_analyzer.cache = MagicMock()
+        genre_analyzer.cache.get.side_effect = cache.get
+        genre_analyzer.cache.set.side_effect = cache.__setitem__
+        prompts = [{"id": i, "prompt": f"Heist {i}"} for i in range(3)]
+
+        # Stop the first run when it submits wave 2
+        submit = backend.submit
+
+        def submit_wave_1_only(path):
+            if "wave2" in path:
+                raise KeyboardInterrupt
+            return submit(path)
+
+        with patch.object(backend, "submit", side_effect=submit_wave_1_only):
+            with pytest.raises(KeyboardInterrupt):
+                run(prompts, backend, tmp_path / "job")
+        counts, records = run(prompts, backend, tmp_path / "job")
+
+        assert counts["completed"] == 3
+        assert counts["requests"] == 1
+        assert backend.respond.call_count == 7
+
+    def test_same_prompts_run_twice(self, backend, tmp_path):
+        """Test that a finished job leaves no waves behind for a re-run of the same prompts."""
+        prompts = [{"id": 1, "prompt": "A bank heist"}]
+
+        run(prompts, backend, tmp_path / "job")
+
+        def respond_again(body):
+            answer = fake_respond(body)
+            if "genre" not in body["messages"][0]["content"] and "recommendation" not in body["messages"][0]["content"]:
+                answer["choices"][0]["message"]["content"] = "Another idea"
+            return answer
+
+        backend.respond.side_effect = respond_again
+        counts, records = run(prompts, backend, tmp_path / "job")
+
+        assert counts["requests"] == 3
+        assert records[1]["movie_idea"] == "Another idea"
+        assert list((tmp_path / "job").iterdir()) == []
+
+    def test_failed_batch_raises(self, backend, tmp_path):
+        """Test that a batch that failed as a whole stops the job."""
+        requests = [{"custom_id": "0:idea", "method": "POST", "url": "/v1/chat/completions", "body": {}}]
+
+        with patch.object(backend, "status", return_value="failed"):
+            with pytest.raises(RuntimeError):
+                run_wave(backend, str(tmp_path / "job"), "wave1", "key", requests, 0, 10)
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing part of the interface fails before anything is submitted."""
+        class SubmitOnly(BatchBackend):
+            def submit(self, requests_path):
+                return "batch"
+
+        with pytest.raises(TypeError):
+            SubmitOnly()
+
+    @patch("src.batch_job.get_batch_backend")
+    def test_resume_from_partial_output(self, mock_get_backend, backend, tmp_path):
+        """Test that prompts already in the results file are left out of the job."""
+        mock_get_backend.return_value = backend
+        prompts_path = tmp_path / "prompts.jsonl"
+        prompts_path.write_text('"A bank heist"\n"A space opera"\n')
+        output_path = tmp_path / "results.jsonl"
+        output_path.write_text('{"id": 1, "movie_idea": "Done"}\n{"id": "other", "movie_idea": "Done"}\n')
+
+        with patch("src.batch_job.JOB_CONFIG", {"poll_seconds": 0, "work_dir": str(tmp_path / "jobs")}):
+            counts = run_job_file(str(prompts_path), str(output_path), "local")
+
+        assert counts == {"completed": 1, "failed": 0, "skipped": 1, "requests": 3}
+        assert [json.loads(line)["id"] for line in open(output_path)] == [1, "other", 2]
+
+    @patch("src.batch_job.get_batch_backend")
+    def test_stdout_holds_only_results(self, mock_get_backend, backend, tmp_path, capsys):
+        """Test that diagnostics printed during the job go to stderr when results go to stdout."""
+        mock_get_backend.return_value = backend
+        prompts_path = tmp_path / "prompts.jsonl"
+        prompts_path.write_text('"A bank heist"\n')
+
+        status = backend.status
+
+        def noisy_status(batch_id):
+            print("polling")
+            return status(batch_id)
+
+        with patch.object(backend, "status", side_effect=noisy_status):
+            run_job_file(str(prompts_path), None, "local", str(tmp_path / "job"))
+
+        captured = capsys.readouterr()
+        assert [json.loads(line)["id"] for line in captured.out.splitlines()] == [1]
+        assert "polling" in captured.err
+
+    @patch("src.main.check_api_keys", return_value=True)
+    @patch("src.batch_job.run_job_file", return_value={"completed": 1, "failed": 0, "skipped": 0, "requests": 3})
+    def test_main_job_mode(self, mock_run_job_file, mock_check_api_keys, tmp_path):
+        """Test that main() runs a batch job when --job is given."""
+        main(["--batch", "prompts.jsonl", "--job", "--job-backend", "local", "--job-dir", str(tmp_path)])
+
+        mock_run_job_file.assert_called_once_with("prompts.jsonl", None, "local", str(tmp_path))
+
+    def test_job_needs_batch(self):
+        """Test that --job without --batch is rejected."""
+        with pytest.raises(SystemExit):
+            main(["--job"])
@@ -0,0 +1,129 @@
+"""Tests for the CombinedAgent and the combined pipeline mode."""
+
+import asyncio
+import copy
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.agents.combined_agent import CombinedAgent
+from src.config.config import PIPELINE_CONFIG
+from src.main import generate_movie_idea, generate_movie_idea_async
+
+VALID = {
+    "genres": ["Sci-Fi", "Heist"],
+    "recommendations": {
+        "movie": {"title": "Inception", "creator": "Christopher Nolan", "year": 2010, "description": "Dream heist."},
+        "book": {"title": "Six of Crows", "creator": "Leigh Bardugo", "year": "2015", "description": "A heist."}
+    },
+    "movie_idea": "A crew robs a space station that is also a prison."
+}
+
+
+def completion(payload):
+    content = payload if isinstance(payload, str) else json.dumps(payload)
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+class TestCombinedAgent:
+    """Tests for the CombinedAgent class."""
+
+    def test_parse_valid_response(self):
+        """Test that a complete answer is returned in the separate agents' shapes."""
+        result = CombinedAgent.create()._parse_response(completion(VALID))
+
+        assert result["genres"] == ["Sci-Fi", "Heist"]
+        assert result["recommendations"]["movie"]["year"] == "2010"
+        assert set(result["recommendations"]["book"]) == {"title", "creator", "year", "description"}
+        assert result["movie_idea"] == VALID["movie_idea"]
+
+    @pytest.mark.parametrize("break_payload", [
+        lambda p: p.pop("genres"),
+        lambda p: p.update(genres=[]),
+        lambda p: p["recommendations"].pop("book"),
+        lambda p: p["recommendations"]["movie"].pop("creator"),
+        lambda p: p.update(movie_idea="  "),
+    ])
+    def test_parse_rejects_incomplete_answers(self, break_payload):
+        """Test that an answer missing any part is rejected."""
+        payload = copy.deepcopy(VALID)
+        break_payload(payload)
+
+        assert CombinedAgent.create()._parse_response(completion(payload)) is None
+
+    def test_parse_rejects_invalid_json(self):
+        assert CombinedAgent.create()._parse_response(completion("not json")) is None
+        assert CombinedAgent.create()._parse_response(completion("[1, 2]")) is None
+
+    @patch("src.agents.combined_agent.create_chat_completion")
+    def test_generate(self, mock_create):
+        """Test that one JSON-mode call produces the whole result."""
+        mock_create.return_value = completion(VALID)
+
+        result = CombinedAgent.create().generate("A space heist")
+
+        assert result["movie_idea"] == VALID["movie_idea"]
+        assert mock_create.call_count == 1
+        assert mock_create.call_args.kwargs["response_format"] == {"type": "json_object"}
+
+    @patch("src.agents.combined_agent.create_chat_completion")
+    def test_generate_failure(self, mock_create):
+        """Test that a failed call returns None instead of defaults."""
+        mock_create.side_effect = Exception("API error")
+
+        assert CombinedAgent.create().generate("A space heist") is None
+
+    @patch("src.agents.combined_agent.acreate_chat_completion")
+    def test_generate_async(self, mock_acreate):
+        mock_acreate.return_value = completion(VALID)
+
+        result = asyncio.run(CombinedAgent.create().generate_async("A space heist"))
+
+        assert result["genres"] == ["Sci-Fi", "Heist"]
+
+
+class TestCombinedPipeline:
+    """Tests for generate_movie_idea with PIPELINE_CONFIG["mode"] = "combined"."""
+
+    @patch("src.main.GenreAnalyzerAgent.create")
+    @patch("src.agents.combined_agent.create_chat_completion")
+    def test_single_call(self, mock_create, mock_genre_create):
+        """Test that a usable combined answer skips the separate agents."""
+        mock_create.return_value = completion(VALID)
+
+        with patch.dict(PIPELINE_CONFIG, {"mode": "combined"}):
+            result = generate_movie_idea("A space heist")
+
+        assert result["user_prompt"] == "A space heist"
+        assert result["genres"] == VALID["genres"]
+        assert result["movie_idea"] == VALID["movie_idea"]
+        mock_genre_create.assert_not_called()
+
+    def test_falls_back_to_separate_agents(self):
+        """Test that an unusable combined answer runs the three agents instead."""
+        # The mocked LLM answers prompts mentioning genres with genres only, which the combined agent rejects
+        with patch.dict(PIPELINE_CONFIG, {"mode": "combined"}):
+            result = generate_movie_idea("A space heist")
+
+        assert result["genres"] == ["Sci-Fi", "Drama", "Comedy"]
+        assert set(result) == {"user_prompt", "genres", "recommendations", "movie_idea"}
+
+    def test_async_falls_back_to_separate_agents(self):
+        with patch.dict(PIPELINE_CONFIG, {"mode": "combined"}):
+            result = asyncio.run(generate_movie_idea_async("A space heist"))
+
+        assert result["genres"] == ["Sci-Fi", "Drama", "Comedy"]
+
+    @patch("src.agents.combined_agent.acreate_chat_completion")
+    def test_async_leaves_stdout_alone(self, mock_acreate, capsys):
+        """Test that the async pipeline prints nothing to stdout, which batch mode uses for results."""
+        mock_acreate.return_value = completion(VALID)
+
+        with patch.dict(PIPELINE_CONFIG, {"mode": "combined"}):
+            asyncio.run(generate_movie_idea_async("A space heist"))
+            mock_acreate.return_value = completion({"genres": ["Sci-Fi"]})
+            asyncio.run(generate_movie_idea_async("A space opera"))
+
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "Falling back to the separate agents" in captured.err
@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.config.env import check_api_keys
+import os
+
+from src.config import secrets
+from src.config.env import ROOT_DIR, check_api_keys, load_env
 
 
 class TestEnv:
@@ -10,7 +13,7 @@ class TestEnv:
     def test_check_api_keys_valid(self, mock_print):
         """Test check_api_keys with a valid API key"""
         # Call the function
-        check_api_keys()
+        assert check_api_keys() is True
         
         # Verify that no warning was printed
         mock_print.assert_not_called()
@@ -20,8 +23,35 @@ class TestEnv:
     def test_check_api_keys_missing(self, mock_print):
         """Test check_api_keys with a missing API key"""
         # Call the function
-        check_api_keys()
+        assert check_api_keys() is False
         
         # Verify that warnings were printed
         assert mock_print.call_count == 3
-        mock_print.assert_any_call("\nWARNING: OPENAI_API_KEY is not set in the .env file.") 
\ No newline at end of file
+        mock_print.assert_any_call("\nWARNING: OPENAI_API_KEY is not set in the .env file.")
+
+    @patch('src.config.secrets.OPENAI_API_KEY', '')
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "key-from-env-file"})
+    @patch('dotenv.load_dotenv')
+    def test_load_env(self, mock_load_dotenv):
+        """Test that load_env loads the project's .env file and refreshes the secrets"""
+        load_env()
+
+        mock_load_dotenv.assert_called_once_with(ROOT_DIR / ".env")
+        assert secrets.OPENAI_API_KEY == "key-from-env-file"
+
+    @patch('src.config.secrets.OPENAI_API_KEY', 'key-from-secrets')
+    @patch('dotenv.load_dotenv')
+    def test_load_env_keeps_secrets_key(self, mock_load_dotenv):
+        """Test that a key set in the secrets module is kept when the environment has none"""
+        with patch.dict(os.environ):
+            os.environ.pop("OPENAI_API_KEY", None)
+            load_env()
+
+        assert secrets.OPENAI_API_KEY == "key-from-secrets"
+
+    @patch('src.config.secrets.OPENAI_API_KEY', '')
+    @patch('dotenv.load_dotenv')
+    def test_load_env_custom_path(self, mock_load_dotenv, tmp_path):
+        load_env(tmp_path / "custom.env")
+
+        mock_load_dotenv.assert_called_once_with(tmp_path / "custom.env")
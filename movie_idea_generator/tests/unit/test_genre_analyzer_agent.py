@@ -1,5 +1,6 @@
 """Tests for the GenreAnalyzerAgent."""
 
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -56,4 +57,22 @@ class TestGenreAnalyzerAgent:
         assert genres is not None
         assert isinstance(genres, list)
         assert len(genres) > 0
-        assert "Drama" in genres 
\ No newline at end of file
+        assert "Drama" in genres
+    
+    def test_analyze_genres_async(self):
+        """Test the async variant returns the same genres as the sync method."""
+        agent = GenreAnalyzerAgent.create()
+        
+        genres = asyncio.run(agent.analyze_genres_async("A sci-fi movie about aliens"))
+        
+        assert genres == agent.analyze_genres("A sci-fi movie about aliens")
+    
+    @patch('src.agents.genre_analyzer_agent.acreate_chat_completion')
+    def test_analyze_genres_async_with_error(self, mock_acreate):
+        """Test the async variant falls back to default genres on error."""
+        mock_acreate.side_effect = Exception("Test error")
+        agent = GenreAnalyzerAgent.create()
+        
+        genres = asyncio.run(agent.analyze_genres_async("A sci-fi movie about aliens"))
+        
+        assert genres == agent._default_genres()
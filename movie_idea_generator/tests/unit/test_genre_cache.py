@@ -0,0 +1,113 @@
+"""Tests for the persistent genre cache."""
+
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.cache.genre_cache import genre_cache_key
+from src.cache.sqlite_cache import SQLiteCache
+
+
+def completion(content):
+    """Build a chat completion response with the given content."""
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "genres.sqlite3"), ttl_seconds=60, max_entries=3)
+    yield cache
+    cache.close()
+
+
+class TestSQLiteCache:
+    """Tests for the SQLiteCache class."""
+    
+    def test_set_and_get(self, cache):
+        """Test that stored values are returned and counted as hits."""
+        cache.set("key", ["Drama", "Comedy"])
+        
+        assert cache.get("key") == ["Drama", "Comedy"]
+        assert cache.get("missing") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+    
+    def test_ttl_expiry(self, cache):
+        """Test that entries older than the TTL are treated as misses."""
+        cache.set("key", ["Drama"])
+        cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        
+        assert cache.get("key") is None
+        assert len(cache) == 0
+    
+    def test_size_cap_evicts_least_recently_used(self, cache):
+        """Test that the least recently used entry is evicted beyond the cap."""
+        for key in ("a", "b", "c"):
+            cache.set(key, [key])
+            time.sleep(0.001)
+        cache.get("a")
+        cache.set("d", ["d"])
+        
+        assert len(cache) == 3
+        assert cache.get("b") is None
+        assert cache.get("a") == ["a"]
+    
+    def test_persists_across_instances(self, cache):
+        """Test that entries survive reopening the database file."""
+        cache.set("key", ["Horror"])
+        
+        reopened = SQLiteCache(cache.path)
+        assert reopened.get("key") == ["Horror"]
+        reopened.close()
+
+
+class TestGenreAnalyzerCache:
+    """Tests for caching in GenreAnalyzerAgent."""
+    
+    def test_key_normalizes_prompt(self):
+        """Test that casing and whitespace differences share a key, other settings don't."""
+        assert genre_cache_key("A Sci-Fi  movie ", "gpt-3.5-turbo", 0.3) == \
+            genre_cache_key("a sci-fi movie", "gpt-3.5-turbo", 0.3)
+        assert genre_cache_key("a sci-fi movie", "gpt-3.5-turbo", 0.3) != \
+            genre_cache_key("a sci-fi movie", "gpt-4", 0.3)
+    
+    @patch('src.agents.genre_analyzer_agent.create_chat_completion')
+    def test_repeated_prompt_hits_cache(self, mock_create, cache):
+        """Test that a repeated prompt is answered from the cache without an LLM call."""
+        mock_create.return_value = completion('{"genres": ["Sci-Fi", "Horror"]}')
+        agent = GenreAnalyzerAgent.create()
+        agent.cache = cache
+        
+        first = agent.analyze_genres("A sci-fi movie about aliens")
+        second = agent.analyze_genres("a sci-fi movie about ALIENS")
+        
+        assert first == second == ["Sci-Fi", "Horror"]
+        assert mock_create.call_count == 1
+        assert cache.stats()["hit_rate"] == 0.5
+    
+    @patch('src.agents.genre_analyzer_agent.create_chat_completion')
+    def test_default_genres_not_cached(self, mock_create, cache):
+        """Test that fallback genres from errors or bad responses are never stored."""
+        agent = GenreAnalyzerAgent.create()
+        agent.cache = cache
+        
+        mock_create.return_value = completion("not json")
+        assert agent.analyze_genres("A prompt") == agent._default_genres()
+        mock_create.side_effect = Exception("API error")
+        assert agent.analyze_genres("A prompt") == agent._default_genres()
+        
+        assert len(cache) == 0
+    
+    def test_lookup_is_fast(self, cache):
+        """Test that a cache lookup costs well under a millisecond on average."""
+        cache.max_entries = 1000
+        for i in range(500):
+            cache.set(f"key-{i}", ["Drama"])
+        
+        start = time.perf_counter()
+        for i in range(500):
+            cache.get(f"key-{i}")
+        average = (time.perf_counter() - start) / 500
+        
+        assert average < 0.005
@@ -1,5 +1,6 @@
 """Tests for the IdeaGeneratorAgent."""
 
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -53,4 +54,78 @@ class TestIdeaGeneratorAgent:
         assert default_idea is not None
         assert isinstance(default_idea, dict)
         assert "movie_idea" in default_idea
-        assert "communicate with objects" in default_idea["movie_idea"] 
\ No newline at end of file
+        assert "communicate with objects" in default_idea["movie_idea"]
+    
+    def test_generate_idea_async(self):
+        """Test the async variant returns the same idea as the sync method."""
+        agent = IdeaGeneratorAgent.create()
+        
+        result = asyncio.run(agent.generate_idea_async("A sci-fi movie about aliens"))
+        
+        assert result == agent.generate_idea("A sci-fi movie about aliens")
+    
+    @patch('src.agents.idea_generator_agent.acreate_chat_completion')
+    def test_generate_idea_async_with_error(self, mock_acreate):
+        """Test the async variant falls back to the default idea on error."""
+        mock_acreate.side_effect = Exception("Test error")
+        agent = IdeaGeneratorAgent.create()
+        
+        result = asyncio.run(agent.generate_idea_async("A sci-fi movie about aliens"))
+        
+        assert result == agent._create_default_idea()
+    
+    def test_stream_idea(self):
+        """Test that streamed chunks add up to the full idea and timing is recorded."""
+        agent = IdeaGeneratorAgent.create()
+        
+        timing = {}
+        
+        chunks = list(agent.stream_idea("A sci-fi movie about aliens", timing=timing))
+        
+        assert len(chunks) > 1
+        assert "".join(chunks).strip() == "This is a mock response for testing purposes."
+        assert 0 <= timing["time_to_first_token_ms"] <= timing["total_ms"]
+    
+    def test_concurrent_streams_keep_their_own_timing(self):
+        """Test that streams running at the same time on one agent are timed separately."""
+        agent = IdeaGeneratorAgent.create()
+        first, second = {}, {}
+        
+        first_stream = agent.stream_idea("A sci-fi movie about aliens", timing=first)
+        next(first_stream)
+        list(agent.stream_idea("A heist movie", timing=second))
+        assert first == {} and second["time_to_first_token_ms"] is not None
+        
+        list(first_stream)
+        assert first["total_ms"] > second["total_ms"]
+    
+    def test_generate_idea_with_callback(self):
+        """Test that generate_idea streams to the callback and keeps its return shape."""
+        agent = IdeaGeneratorAgent.create()
+        chunks = []
+        
+        result = agent.generate_idea("A sci-fi movie about aliens", on_chunk=chunks.append)
+        
+        assert result == {"movie_idea": "".join(chunks)}
+    
+    @patch('src.agents.idea_generator_agent.stream_chat_completion')
+    def test_stream_idea_with_error(self, mock_stream):
+        """Test that the default idea is streamed if the call fails before any text."""
+        mock_stream.side_effect = Exception("Test error")
+        agent = IdeaGeneratorAgent.create()
+        
+        chunks = list(agent.stream_idea("A sci-fi movie about aliens"))
+        
+        assert chunks == [agent._create_default_idea()["movie_idea"]]
+    
+    def test_astream_idea(self):
+        """Test that the async stream yields the same text as the sync stream."""
+        agent = IdeaGeneratorAgent.create()
+        
+        timing = {}
+        
+        async def collect():
+            return [chunk async for chunk in agent.astream_idea("A sci-fi movie about aliens", timing=timing)]
+        
+        assert asyncio.run(collect()) == list(agent.stream_idea("A sci-fi movie about aliens"))
+        assert timing["time_to_first_token_ms"] is not None
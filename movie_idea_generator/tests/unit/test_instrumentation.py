@@ -0,0 +1,109 @@
+"""Tests for the per-call instrumentation in src.config.instrumentation."""
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.config import instrumentation
+from src.config.instrumentation import finish_call, mark_fallback, record_attempt, start_call, track_run
+from src.main import generate_movie_idea
+
+
+def make_call(agent="genre_analyzer", model="gpt-3.5-turbo", prompt_tokens=100, completion_tokens=20, error=None):
+    event = start_call(agent, model)
+    record_attempt(event, {"queue_ms": 5.0, "ttfb_ms": 30.0}, succeeded=error is None)
+    usage = MagicMock(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    finish_call(event, None if error else usage, error)
+    return event
+
+
+class TestCallEvents:
+    """Tests for single call events."""
+
+    def test_records_timing_tokens_and_cost(self):
+        """Test that a call event has its agent, timings, usage and estimated cost."""
+        event = make_call()
+
+        assert event["agent"] == "genre_analyzer"
+        assert event["model"] == "gpt-3.5-turbo"
+        assert event["attempts"] == 1
+        assert event["queue_ms"] == 5.0
+        assert event["ttfb_ms"] == 30.0
+        assert event["latency_ms"] >= 0
+        assert (event["prompt_tokens"], event["completion_tokens"]) == (100, 20)
+        assert event["cost_usd"] == pytest.approx((100 * 0.5 + 20 * 1.5) / 1_000_000)
+        assert event["status"] == "ok"
+        assert instrumentation.get_recent_calls()[-1] is event
+        assert all(not key.startswith("_") for key in event)
+
+    def test_failed_call(self):
+        """Test that a failed call records the error type and no usage."""
+        event = make_call(error=TimeoutError("slow"))
+
+        assert event["status"] == "error"
+        assert event["error"] == "TimeoutError"
+        assert event["ttfb_ms"] is None
+        assert event["cost_usd"] is None
+
+    def test_fallback_marks_the_agents_latest_call(self):
+        """Test that a fallback is attributed to the call that caused it."""
+        event = make_call(agent="recommendation")
+
+        mark_fallback("genre_analyzer")
+        assert event["fallback"] is False
+        mark_fallback("recommendation")
+        assert event["fallback"] is True
+
+
+class TestRuns:
+    """Tests for grouping calls into runs."""
+
+    def test_summary_per_run_and_agent(self):
+        """Test that a run totals its calls overall and per agent."""
+        with track_run("prompt") as run:
+            make_call(agent="genre_analyzer")
+            make_call(agent="recommendation", error=TimeoutError())
+            mark_fallback("recommendation")
+        make_call(agent="idea_generator")
+
+        summary = run.summary()
+        assert summary["label"] == "prompt"
+        assert summary["calls"] == 2
+        assert summary["errors"] == 1
+        assert summary["fallbacks"] == 1
+        assert summary["prompt_tokens"] == 100
+        assert summary["wall_ms"] >= summary["latency_ms"]
+        assert summary["agents"]["recommendation"]["fallbacks"] == 1
+        assert "idea_generator" not in summary["agents"]
+        assert instrumentation.get_recent_runs()[-1] is run
+
+    def test_nested_runs_share_the_outer_run(self):
+        """Test that tracking inside a tracked run adds to the outer run."""
+        with track_run("outer") as outer:
+            with track_run("inner") as inner:
+                make_call()
+
+        assert inner is outer
+        assert outer.summary()["calls"] == 1
+
+    def test_pipeline_calls_in_worker_threads_join_the_run(self):
+        """Test that agents running on the executor report to the caller's run."""
+        # The mocked LLM answers the recommendation prompt with genres, so that agent falls back
+        with track_run() as run:
+            generate_movie_idea("A heist on a space station", concurrent=True, on_idea_chunk=lambda chunk: None)
+
+        assert run.fallbacks["recommendation"] == 1
+
+    def test_trace_file(self, tmp_path):
+        """Test that a finished run is appended to the trace file as JSONL."""
+        path = tmp_path / "trace.jsonl"
+
+        with patch.dict(instrumentation.INSTRUMENTATION_CONFIG, {"trace_path": str(path)}):
+            with track_run("prompt") as run:
+                make_call()
+                make_call(agent="idea_generator")
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["event"] for line in lines] == ["llm_call", "llm_call", "run_summary"]
+        assert {line["run_id"] for line in lines} == {run.run_id}
+        assert lines[-1]["calls"] == 2
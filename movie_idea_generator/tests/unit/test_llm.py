@@ -0,0 +1,211 @@
+"""Tests for the shared OpenAI client in src.config.llm."""
+
+import asyncio
+import http.server
+import importlib.util
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.config import instrumentation, rate_limiter
+from src.config.config import RESILIENCE_CONFIG
+
+LLM_PATH = Path(__file__).parent.parent.parent / "src" / "config" / "llm.py"
+
+
+@pytest.fixture
+def llm_module():
+    """Load an unpatched copy of src.config.llm (conftest.py replaces its client functions)."""
+    spec = importlib.util.spec_from_file_location("llm_under_test", LLM_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.OpenAI = MagicMock()
+    module.AsyncOpenAI = MagicMock(side_effect=lambda **kwargs: MagicMock())
+    yield module
+    module.reset_openai_client()
+
+
+@pytest.fixture
+def local_server():
+    """A keep-alive HTTP server on a random local port."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+
+        def do_GET(self):
+            self.do_HEAD()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+class TestSharedClient:
+    """Tests for the process-wide pooled client."""
+
+    def test_client_is_shared_across_threads(self, llm_module):
+        """Test that concurrent callers get a single client instance."""
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(llm_module.get_openai_client()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(clients) == 8
+        assert all(client is clients[0] for client in clients)
+        assert llm_module.OpenAI.call_count == 1
+
+    def test_pool_configuration(self, llm_module):
+        """Test that the HTTP client uses the configured pool settings."""
+        llm_module.get_openai_client()
+
+        kwargs = llm_module.OpenAI.call_args.kwargs
+        assert kwargs["http_client"] is llm_module._http_client
+        assert kwargs["timeout"] == llm_module.LLM_CONFIG["request_timeout"]
+
+    def test_handshake_only_on_first_call(self, llm_module, local_server):
+        """Test that connection setup time is recorded only until the connection is pooled."""
+        http_client = llm_module._build_http_client()
+
+        for _ in range(3):
+            record = llm_module._begin_call()
+            http_client.get(local_server)
+            llm_module._end_call(record)
+
+        stats = llm_module.get_connection_stats()
+        assert [entry["new_connection"] for entry in stats] == [True, False, False]
+        assert stats[0]["connect_ms"] > 0
+        assert stats[1]["connect_ms"] == 0
+        assert all(entry["latency_ms"] > 0 for entry in stats)
+        http_client.close()
+
+    def test_warm_up_opens_connection(self, llm_module, local_server):
+        """Test that pre-warming leaves a reusable connection in the pool."""
+        llm_module.OpenAI.return_value = MagicMock(base_url=local_server)
+
+        assert llm_module.warm_up_openai_client() is True
+
+        record = llm_module._begin_call()
+        llm_module._http_client.get(local_server)
+        llm_module._end_call(record)
+        assert llm_module.get_connection_stats()[-1]["new_connection"] is False
+
+    def test_async_warm_up_and_close(self, llm_module, local_server):
+        """Test that the async warm-up pools a connection for the loop and closing drops the client."""
+        llm_module.AsyncOpenAI = MagicMock(return_value=MagicMock(base_url=local_server))
+
+        async def warm_then_call():
+            assert await llm_module.awarm_up_openai_client() is True
+            record = llm_module._begin_call()
+            await llm_module._async_http_clients[asyncio.get_running_loop()].get(local_server)
+            llm_module._end_call(record)
+            await llm_module.aclose_async_openai_client()
+            return len(llm_module._async_clients)
+
+        assert asyncio.run(warm_then_call()) == 0
+        assert llm_module.get_connection_stats()[-1]["new_connection"] is False
+
+    def test_async_client_per_event_loop(self, llm_module):
+        """Test that async callers share a client within an event loop, not across loops."""
+        async def get_twice():
+            return llm_module.get_async_openai_client(), llm_module.get_async_openai_client()
+
+        first, second = asyncio.run(get_twice())
+        other_loop, _ = asyncio.run(get_twice())
+
+        assert first is second
+        assert other_loop is not first
+
+
+class TestStreaming:
+    """Tests for streamed chat completions."""
+
+    def test_stream_yields_text_chunks(self, llm_module):
+        """Test that only non-empty deltas are yielded and first-token time is recorded."""
+        def chunk(content):
+            return MagicMock(choices=[MagicMock(delta=MagicMock(content=content))])
+
+        client = llm_module.get_openai_client()
+        client.chat.completions.create.return_value = iter(
+            [chunk(""), chunk("A "), chunk("hidden world"), MagicMock(choices=[])]
+        )
+
+        chunks = list(llm_module.stream_chat_completion([{"role": "user", "content": "Hi"}]))
+
+        assert chunks == ["A ", "hidden world"]
+        assert client.chat.completions.create.call_args.kwargs["stream"] is True
+        stats = llm_module.get_connection_stats()[-1]
+        assert 0 <= stats["first_token_ms"] <= stats["latency_ms"]
+
+
+class TestResilience:
+    """Tests for retries around the chat completion call."""
+
+    def test_retryable_error_is_retried(self, llm_module):
+        """Test that a rate-limited call is retried within the agent's budget."""
+        error = Exception("rate limited")
+        error.status_code = 429
+        client = llm_module.get_openai_client()
+        client.chat.completions.create.side_effect = [error, "response"]
+
+        with patch.dict(RESILIENCE_CONFIG, {"base_delay": 0}):
+            response = llm_module.create_chat_completion([{"role": "user", "content": "Hi"}], agent="genre_analyzer")
+
+        assert response == "response"
+        assert client.chat.completions.create.call_count == 2
+        assert "agent" not in client.chat.completions.create.call_args.kwargs
+
+
+class TestRateLimiting:
+    """Tests for throttling chat completions to the configured rate limits."""
+
+    def test_queue_wait_is_recorded(self, llm_module):
+        """Test that a request over the RPM budget waits and records its queue time."""
+        client = llm_module.get_openai_client()
+        client.chat.completions.create.return_value = MagicMock(usage=MagicMock(total_tokens=10))
+        messages = [{"role": "user", "content": "Hi"}]
+        rate_limiter.reset_rate_limiters()
+
+        limits = {"requests_per_minute": 1200, "burst_seconds": 0.05}
+        with patch.dict(rate_limiter.RATE_LIMIT_CONFIG, limits):
+            llm_module.create_chat_completion(messages, model="limited")
+            llm_module.create_chat_completion(messages, model="limited")
+        rate_limiter.reset_rate_limiters()
+
+        first, second = llm_module.get_connection_stats()[-2:]
+        assert first["queue_ms"] == 0
+        assert 0 < second["queue_ms"] <= 60
+
+
+class TestInstrumentation:
+    """Tests for the call events of chat completions."""
+
+    def test_call_event_is_recorded(self, llm_module):
+        """Test that a retried call is recorded once, with its attempts and usage."""
+        error = Exception("rate limited")
+        error.status_code = 429
+        response = MagicMock(usage=MagicMock(prompt_tokens=40, completion_tokens=10, total_tokens=50))
+        client = llm_module.get_openai_client()
+        client.chat.completions.create.side_effect = [error, response]
+
+        with patch.dict(RESILIENCE_CONFIG, {"base_delay": 0}):
+            llm_module.create_chat_completion([{"role": "user", "content": "Hi"}], agent="idea_generator")
+
+        event = instrumentation.get_recent_calls()[-1]
+        assert event["agent"] == "idea_generator"
+        assert event["attempts"] == 2
+        assert event["status"] == "ok"
+        assert (event["prompt_tokens"], event["completion_tokens"]) == (40, 10)
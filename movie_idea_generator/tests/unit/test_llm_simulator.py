@@ -0,0 +1,168 @@
+"""Tests for the local chat completions stand-in in src.llm_simulator."""
+
+import asyncio
+import importlib.util
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.config import instrumentation
+from src.config.config import LLM_CONFIG, RESILIENCE_CONFIG
+from src.llm_simulator import GENRES_PAYLOAD, IDEA_PAYLOAD, LatencyProfile, LLMSimulator, classify
+
+LLM_PATH = Path(__file__).parent.parent.parent / "src" / "config" / "llm.py"
+
+GENRE_MESSAGES = [
+    {"role": "system", "content": "You are a genre analysis specialist for movies."},
+    {"role": "user", "content": "A heist on a space station"}
+]
+IDEA_MESSAGES = [
+    {"role": "system", "content": "You are a creative movie idea generator."},
+    {"role": "user", "content": "A heist on a space station"}
+]
+
+
+@pytest.fixture
+def simulator():
+    with LLMSimulator(seed=1) as simulator:
+        yield simulator
+
+
+@pytest.fixture(scope="module")
+def real_openai():
+    """The real openai package, in place of the mock conftest.py installs, for this module's tests."""
+    with patch.dict(sys.modules):
+        del sys.modules["openai"]
+        yield pytest.importorskip("openai")
+
+
+@pytest.fixture
+def real_llm(real_openai, simulator):
+    """An unpatched copy of src.config.llm, with the real OpenAI client pointed at the simulator."""
+    with patch.dict(LLM_CONFIG, {"base_url": simulator.base_url}), patch.dict(RESILIENCE_CONFIG, {"base_delay": 0}):
+        spec = importlib.util.spec_from_file_location("llm_against_simulator", LLM_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+        module.reset_openai_client()
+
+
+class TestLatencyProfile:
+    """Tests for the latency distributions."""
+
+    def test_fixed(self):
+        """Test that a fixed profile always waits the median."""
+        assert LatencyProfile("fixed", median_ms=50).sample(random.Random(0)) == 0.05
+
+    def test_lognormal_median_and_tail(self):
+        """Test that lognormal latencies centre on the median with a long upper tail."""
+        rng = random.Random(0)
+        samples = sorted(LatencyProfile("lognormal", median_ms=100, spread=0.5).sample(rng) for _ in range(2000))
+
+        assert statistics.median(samples) == pytest.approx(0.1, rel=0.1)
+        assert samples[int(len(samples) * 0.99)] > 2 * statistics.median(samples)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError, match="Unknown latency kind"):
+            LatencyProfile("normal")
+
+
+class TestSimulator:
+    """Tests that run the real client stack against the simulator."""
+
+    def test_classify(self):
+        """Test that requests are told apart by their system message."""
+        assert classify(GENRE_MESSAGES) == "genres"
+        assert classify([{"role": "system", "content": "You are a content recommendation specialist."}]) \
+            == "recommendations"
+        assert classify(IDEA_MESSAGES) == "idea"
+        assert classify([{"role": "system", "content": "You are a movie development team: a genre analyst"}]) \
+            == "combined"
+
+    def test_json_mode_completion(self, real_llm):
+        """Test that a JSON mode request gets the canned payload and usage."""
+        response = real_llm.create_chat_completion(
+            GENRE_MESSAGES, response_format={"type": "json_object"}, agent="genre_analyzer"
+        )
+
+        assert json.loads(response.choices[0].message.content) == GENRES_PAYLOAD
+        assert response.usage.total_tokens == response.usage.prompt_tokens + response.usage.completion_tokens
+        assert instrumentation.get_recent_calls()[-1]["ttfb_ms"] is not None
+
+    def test_streaming_with_usage(self, real_llm, simulator):
+        """Test that a streamed request arrives in chunks and reports its usage."""
+        chunks = list(real_llm.stream_chat_completion(IDEA_MESSAGES, agent="idea_generator"))
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == IDEA_PAYLOAD
+        assert instrumentation.get_recent_calls()[-1]["completion_tokens"] > 0
+        assert simulator.stats["streamed"] == 1
+
+    def test_latency_is_injected(self, real_llm, simulator):
+        """Test that responses wait for the drawn latency."""
+        simulator.latency = LatencyProfile("fixed", median_ms=100)
+
+        start = time.perf_counter()
+        real_llm.create_chat_completion(IDEA_MESSAGES)
+
+        assert time.perf_counter() - start >= 0.1
+
+    def test_rate_limits_are_retried_within_budget(self, real_llm, simulator):
+        """Test that injected 429s are retried by the client, and only within the agent's budget."""
+        simulator.rate_limit_rate = 1.0
+        simulator.retry_after = 0
+
+        with pytest.raises(Exception) as error:
+            real_llm.create_chat_completion(GENRE_MESSAGES, agent="recommendation")
+
+        assert error.value.status_code == 429
+        assert simulator.stats["rate_limited"] == RESILIENCE_CONFIG["attempt_budgets"]["recommendation"]
+
+    def test_server_errors_are_retried(self, real_llm, simulator):
+        """Test that a call succeeds despite injected server errors."""
+        simulator.error_rate = 0.5
+
+        with patch.dict(RESILIENCE_CONFIG["attempt_budgets"], {"idea_generator": 10}):
+            for _ in range(5):
+                real_llm.create_chat_completion(IDEA_MESSAGES, agent="idea_generator")
+
+        assert simulator.stats["requests"] == 5 + simulator.stats["errors"]
+
+    def test_concurrent_callers_share_the_pool(self, real_llm, simulator):
+        """Test that many threads can call through one pooled client."""
+        real_llm.create_chat_completion(IDEA_MESSAGES)  # Build the client outside the timed part
+        simulator.latency = LatencyProfile("fixed", median_ms=50)
+        errors = []
+
+        def call():
+            try:
+                real_llm.create_chat_completion(IDEA_MESSAGES)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert simulator.stats["requests"] == 9
+        assert time.perf_counter() - start < 8 * 0.05
+
+    def test_async_client(self, real_llm):
+        """Test that the async client works against the simulator too."""
+        async def run():
+            return await asyncio.gather(*(real_llm.acreate_chat_completion(GENRE_MESSAGES) for _ in range(4)))
+
+        responses = asyncio.run(run())
+
+        assert all(json.loads(r.choices[0].message.content) == GENRES_PAYLOAD for r in responses)
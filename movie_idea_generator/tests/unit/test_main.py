@@ -1,10 +1,16 @@
 """Tests for the main module."""
 
+import asyncio
+import json
 import pytest
+import subprocess
 import sys
+import threading
+import time
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from src.main import generate_movie_idea, main
+from src.main import generate_movie_idea, generate_movie_idea_async, main
 
 
 class TestMain:
@@ -55,6 +61,68 @@ class TestMain:
         assert result["recommendations"]["book"]["title"] == "Test Book"
         assert "hidden world" in result["movie_idea"]
     
+    @patch('src.agents.genre_analyzer_agent.GenreAnalyzerAgent.analyze_genres')
+    @patch('src.agents.recommendation_agent.RecommendationAgent.get_recommendations')
+    @patch('src.agents.idea_generator_agent.IdeaGeneratorAgent.generate_idea')
+    def test_generate_movie_idea_concurrent(self, mock_generate_idea, mock_get_recommendations, mock_analyze_genres):
+        """Test that the idea generation overlaps the genre -> recommendation chain."""
+        recommendations = {
+            "movie": {"title": "Test Movie", "creator": "Test Director", "year": "2020", "description": "A movie"},
+            "book": {"title": "Test Book", "creator": "Test Author", "year": "2010", "description": "A book"}
+        }
+        
+        def slow(result):
+            def call(*args, **kwargs):
+                time.sleep(0.2)
+                return result
+            return call
+        
+        mock_analyze_genres.side_effect = slow(["Sci-Fi", "Drama"])
+        mock_get_recommendations.side_effect = slow(recommendations)
+        mock_generate_idea.side_effect = slow({"movie_idea": "A test movie idea."})
+        
+        start = time.perf_counter()
+        concurrent_result = generate_movie_idea("A sci-fi movie about aliens", concurrent=True)
+        concurrent_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        sequential_result = generate_movie_idea("A sci-fi movie about aliens", concurrent=False)
+        sequential_time = time.perf_counter() - start
+        
+        # Output is unchanged, latency is the longer path (0.4s) rather than the sum (0.6s)
+        assert concurrent_result == sequential_result
+        assert concurrent_time < 0.55
+        assert sequential_time >= 0.6
+    
+    def test_generate_movie_idea_busy_workers(self):
+        """Test that a run finding every shared worker busy runs sequentially instead of queueing."""
+        prompt = "A sci-fi movie about aliens"
+        
+        with patch('src.main._idle_workers', threading.BoundedSemaphore(1)) as idle_workers, \
+                patch('src.main._get_executor') as mock_get_executor:
+            idle_workers.acquire()
+            result = generate_movie_idea(prompt, concurrent=True)
+        
+        mock_get_executor.assert_not_called()
+        assert result == generate_movie_idea(prompt, concurrent=False)
+    
+    def test_generate_movie_idea_async(self):
+        """Test that the async pipeline produces the same result as the sync one."""
+        prompt = "A sci-fi movie about aliens"
+        
+        result = asyncio.run(generate_movie_idea_async(prompt))
+        
+        assert result == generate_movie_idea(prompt)
+    
+    def test_generate_movie_idea_async_many_concurrent(self):
+        """Test that one event loop can drive many generations at once."""
+        async def run_all():
+            return await asyncio.gather(*(generate_movie_idea_async(f"Prompt {i}") for i in range(50)))
+        
+        results = asyncio.run(run_all())
+        
+        assert [result["user_prompt"] for result in results] == [f"Prompt {i}" for i in range(50)]
+    
     @patch('src.main.generate_movie_idea')
     @patch('src.main.check_api_keys')
     @patch('builtins.input')
@@ -89,7 +157,8 @@ class TestMain:
         # Check that mocks were called
         mock_check_api_keys.assert_called_once()
         mock_input.assert_called_once()
-        mock_generate_movie_idea.assert_called_once_with("A sci-fi movie about aliens")
+        mock_generate_movie_idea.assert_called_once()
+        assert mock_generate_movie_idea.call_args.args == ("A sci-fi movie about aliens",)
         
         # Check result
         assert result is not None
@@ -99,6 +168,56 @@ class TestMain:
         assert "recommendations" in result
         assert "movie_idea" in result
     
+    @patch('src.main.check_api_keys', return_value=True)
+    @patch('builtins.input', return_value="A sci-fi movie about aliens")
+    def test_main_streams_idea(self, mock_input, mock_check_api_keys, capsys):
+        """Test that main prints the idea chunk by chunk and reports time to first token."""
+        printed_before_return = []
+
+        def fake_generate(prompt, on_idea_chunk=None):
+            on_idea_chunk("A hidden ")
+            printed_before_return.append(capsys.readouterr().out)
+            on_idea_chunk("world.")
+            return {
+                "user_prompt": prompt,
+                "genres": ["Sci-Fi"],
+                "recommendations": {
+                    "movie": {"title": "Test Movie", "creator": "Test Director", "year": "2020"},
+                    "book": {"title": "Test Book", "creator": "Test Author", "year": "2010"}
+                },
+                "movie_idea": "A hidden world."
+            }
+
+        with patch('src.main.generate_movie_idea', side_effect=fake_generate):
+            main()
+
+        output = capsys.readouterr().out
+        assert "A hidden " in printed_before_return[0]
+        assert "First words after" in output
+        assert output.count("A hidden world.") == 0  # Not printed again at the end
+
+    @patch('src.main.check_api_keys', return_value=True)
+    @patch('builtins.input', return_value="A sci-fi movie about aliens")
+    def test_main_streamed_output_is_not_interleaved(self, mock_input, mock_check_api_keys, capsys):
+        """Test that nothing is printed onto the end of a streamed idea."""
+        with patch.dict('src.main.PIPELINE_CONFIG', {"stream_idea": True}):
+            result = main()
+
+        lines = capsys.readouterr().out.splitlines()
+        idea_line = lines.index("Your Movie Idea:") + 1
+        assert "\n".join(lines[idea_line:]).startswith(result["movie_idea"] + "\n")
+        assert not any("Identified genres" in line for line in lines)
+
+    def test_generate_movie_idea_streaming(self):
+        """Test that streamed chunks add up to the returned idea."""
+        chunks = []
+
+        result = generate_movie_idea("A sci-fi movie about aliens", on_idea_chunk=chunks.append)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == result["movie_idea"]
+        assert set(result) == {"user_prompt", "genres", "recommendations", "movie_idea"}
+
     def test_main_missing_api_keys(self):
         """Test main function when API keys are missing."""
         # Create patches but don't apply them yet
@@ -123,4 +242,18 @@ class TestMain:
             # Stop the patches
             check_api_keys_patcher.stop()
             input_patcher.stop()
-            exit_patcher.stop() 
\ No newline at end of file
+            exit_patcher.stop()
+
+
+class TestStartup:
+    """Tests that keep the CLI quick to start."""
+
+    def test_import_defers_heavy_packages(self):
+        """Test that importing the CLI leaves openai, httpx and dotenv until they are first used."""
+        code = "import json, sys, src.main; print(json.dumps(sorted(sys.modules)))"
+        completed = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent.parent,
+                                   capture_output=True, text=True, check=True)
+        imported = {name.split(".")[0] for name in json.loads(completed.stdout)}
+
+        assert imported.isdisjoint({"openai", "httpx", "dotenv"})
+
@@ -0,0 +1,123 @@
+"""Tests for the near-duplicate prompt cache."""
+
+import time
+import pytest
+from unittest.mock import patch
+
+from src.cache.prompt_cache import PromptCache, normalize_for_similarity
+from src.main import generate_movie_idea
+
+
+RESULT = {
+    "user_prompt": "A sci-fi movie about aliens invading Earth",
+    "genres": ["Sci-Fi", "Action"],
+    "recommendations": {"movie": {"title": "Alien"}, "book": {"title": "The War of the Worlds"}},
+    "movie_idea": "An alien idea"
+}
+
+
+class TestPromptCache:
+    """Tests for the PromptCache class."""
+
+    def test_normalize_drops_case_punctuation_and_filler(self):
+        """Test that trivially different spellings normalize to the same text."""
+        assert normalize_for_similarity("Please, a Sci-Fi movie!!") == normalize_for_similarity("sci fi movie")
+
+    def test_near_duplicate_hits(self):
+        """Test that a prompt differing in punctuation, casing and filler words is served."""
+        cache = PromptCache()
+        cache.add(RESULT["user_prompt"], RESULT)
+
+        assert cache.get("please, a SCI-FI movie about aliens invading the earth!") == RESULT
+        assert cache.stats()["hits"] == 1
+
+    def test_different_prompt_misses(self):
+        """Test that an unrelated prompt is not served a cached result."""
+        cache = PromptCache()
+        cache.add(RESULT["user_prompt"], RESULT)
+
+        assert cache.get("A romantic comedy set in a Parisian bakery") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_non_ascii_prompts_are_compared_by_their_words(self):
+        """Test that unrelated prompts in a non-Latin script don't share an entry."""
+        cache = PromptCache()
+        cache.add("宇宙人が地球を侵略する映画", RESULT)
+
+        assert normalize_for_similarity("Ein Café in Paris") == "ein café in paris"
+        assert cache.get("パリのパン屋を舞台にした恋愛喜劇") is None
+        assert cache.get("宇宙人が地球を侵略する映画!") == RESULT
+
+    def test_prompts_without_words_are_not_cached(self):
+        """Test that punctuation-only prompts are neither stored nor served."""
+        cache = PromptCache()
+        cache.add("!!!", RESULT)
+
+        assert len(cache) == 0
+        assert cache.get("???") is None
+
+    def test_threshold_controls_matching(self):
+        """Test that a stricter threshold rejects a looser paraphrase."""
+        prompt = "A sci-fi movie about aliens invading planet Earth at night"
+        loose = PromptCache(threshold=0.5)
+        strict = PromptCache(threshold=0.99)
+        for cache in (loose, strict):
+            cache.add(RESULT["user_prompt"], RESULT)
+
+        assert loose.get(prompt) == RESULT
+        assert strict.get(prompt) is None
+
+    def test_lru_eviction_cleans_index(self):
+        """Test that evicted prompts are removed from the LSH buckets."""
+        cache = PromptCache(max_entries=1)
+        cache.add("A heist movie in a casino", RESULT)
+        cache.add("A romantic comedy in Paris", RESULT)
+
+        assert len(cache) == 1
+        assert cache.get("A heist movie in a casino") is None
+        assert all(0 not in bucket for bucket in cache._buckets.values())
+
+    def test_lookup_cost_does_not_grow_with_size(self):
+        """Test that lookups cost about the same with 50 or 1000 unrelated entries."""
+        def average_lookup(cache):
+            start = time.perf_counter()
+            for i in range(50):
+                cache.get(f"query prompt number {i} about something else")
+            return (time.perf_counter() - start) / 50
+
+        small, large = PromptCache(), PromptCache()
+        for i in range(1000):
+            prompt = f"prompt {i * 7919} with unique words {i * 104729}"
+            if i < 50:
+                small.add(prompt, RESULT)
+            large.add(prompt, RESULT)
+
+        assert average_lookup(large) < average_lookup(small) * 5 + 0.001
+
+
+class TestPipelinePromptCache:
+    """Tests for the prompt cache in generate_movie_idea."""
+
+    def test_near_duplicate_skips_pipeline(self):
+        """Test that a near-duplicate prompt is answered without running the agents."""
+        cache = PromptCache()
+        cache.add(RESULT["user_prompt"], RESULT)
+
+        with patch('src.main.get_prompt_cache', return_value=cache), \
+                patch('src.main.GenreAnalyzerAgent.create') as mock_create:
+            result = generate_movie_idea("A sci-fi movie about aliens invading Earth.")
+
+        mock_create.assert_not_called()
+        assert result["user_prompt"] == "A sci-fi movie about aliens invading Earth."
+        assert result["movie_idea"] == RESULT["movie_idea"]
+
+    def test_fallback_results_not_cached(self):
+        """Test that results containing agent defaults are never stored."""
+        cache = PromptCache()
+
+        with patch('src.main.get_prompt_cache', return_value=cache):
+            result = generate_movie_idea("A sci-fi movie", concurrent=False)
+
+        # The mocked LLM answers the recommendation prompt with genres, so the defaults are used
+        assert result["recommendations"]["movie"]["title"] == "Inception"
+        assert len(cache) == 0
@@ -0,0 +1,130 @@
+"""Tests for the client-side rate limiter in src.config.rate_limiter."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from src.config import rate_limiter
+from src.config.rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    rate_limiter.reset_rate_limiters()
+    yield
+    rate_limiter.reset_rate_limiters()
+
+
+class TestEstimateTokens:
+    """Tests for the token cost estimate."""
+
+    def test_counts_prompt_and_max_tokens(self):
+        """Test that the estimate grows with the prompt and includes max_tokens."""
+        short = [{"role": "user", "content": "Hi"}]
+        long = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "Hi"}]
+
+        assert estimate_tokens(short, 100) > 100
+        assert estimate_tokens(long, 100) >= estimate_tokens(short, 100) + 100
+        assert estimate_tokens(short, 500) - estimate_tokens(short, 100) == 400
+
+
+class TestRateLimiter:
+    """Tests for the token buckets."""
+
+    def test_no_wait_within_budget(self):
+        """Test that requests within the burst budget go straight through."""
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+
+        assert all(limiter.reserve(100) == 0 for _ in range(10))
+
+    def test_requests_queue_in_arrival_order(self):
+        """Test that each request over the RPM budget waits one refill interval longer."""
+        # 600 RPM = one request per 0.1s, with a burst of one request
+        limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+
+        waits = [limiter.reserve(1) for _ in range(4)]
+
+        assert waits[0] == 0
+        for earlier, later in zip(waits[1:], waits[2:]):
+            assert later == pytest.approx(earlier + 0.1, abs=0.01)
+
+    def test_token_budget(self):
+        """Test that a request waits until enough tokens have refilled."""
+        # 6000 TPM = 100 tokens/s, with a burst of 100 tokens
+        limiter = RateLimiter(tokens_per_minute=6000, burst_seconds=1)
+
+        assert limiter.reserve(100) == 0
+        assert limiter.reserve(50) == pytest.approx(0.5, abs=0.01)
+
+    def test_oversized_request_waits_for_a_full_bucket(self):
+        """Test that a request bigger than the bucket is not stuck forever."""
+        limiter = RateLimiter(tokens_per_minute=6000, burst_seconds=1)
+
+        limiter.reserve(100)
+        assert limiter.reserve(10000) == pytest.approx(1.0, abs=0.01)
+
+    def test_reconcile_keeps_the_up_front_reservation(self):
+        """Test that reported usage below the estimate frees nothing, as the provider charged the estimate."""
+        limiter = RateLimiter(tokens_per_minute=6000, burst_seconds=1)
+
+        limiter.reserve(100)
+        limiter.reconcile(100, 40)
+
+        assert limiter.reserve(50) == pytest.approx(0.5, abs=0.01)
+
+    def test_reconcile_charges_extra_usage(self):
+        """Test that reported usage above the estimate is charged."""
+        limiter = RateLimiter(tokens_per_minute=6000, burst_seconds=1)
+
+        limiter.reserve(50)
+        limiter.reconcile(50, 100)
+
+        assert limiter.reserve(50) == pytest.approx(0.5, abs=0.01)
+
+    def test_acquire_waits_and_reports_stats(self):
+        """Test that acquire sleeps for its turn and the wait shows in the stats."""
+        limiter = RateLimiter(requests_per_minute=1200, burst_seconds=0.05)
+
+        limiter.acquire(1)
+        with patch("src.config.rate_limiter.time.sleep") as sleep:
+            wait = limiter.acquire(1)
+
+        sleep.assert_called_once_with(wait)
+        stats = limiter.stats()
+        assert stats["requests"] == 2
+        assert stats["delayed"] == 1
+        assert stats["waiting"] == 0
+        assert stats["max_wait_ms"] == pytest.approx(wait * 1000, abs=0.01)
+
+    def test_cancelled_async_waiter_refunds(self):
+        """Test that a cancelled async request gives its place back."""
+        limiter = RateLimiter(requests_per_minute=60, burst_seconds=1)
+
+        async def run():
+            await limiter.aacquire(1)
+            waiter = asyncio.ensure_future(limiter.aacquire(1))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(run())
+
+        assert limiter.stats()["waiting"] == 0
+        assert limiter.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+class TestGetRateLimiter:
+    """Tests for the per-model limiters."""
+
+    def test_disabled_without_limits(self):
+        """Test that no limiter is used when no limit is configured."""
+        with patch.dict(rate_limiter.RATE_LIMIT_CONFIG, {"requests_per_minute": 0, "tokens_per_minute": 0}):
+            assert get_rate_limiter("gpt-4-turbo") is None
+
+    def test_one_limiter_per_model(self):
+        """Test that callers of the same model share a limiter."""
+        with patch.dict(rate_limiter.RATE_LIMIT_CONFIG, {"requests_per_minute": 500}):
+            assert get_rate_limiter("gpt-4-turbo") is get_rate_limiter("gpt-4-turbo")
+            assert get_rate_limiter("gpt-4-turbo") is not get_rate_limiter("gpt-3.5-turbo")
+            assert set(rate_limiter.get_rate_limit_stats()) == {"gpt-4-turbo", "gpt-3.5-turbo"}
@@ -1,5 +1,6 @@
 """Tests for the RecommendationAgent."""
 
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -72,4 +73,23 @@ class TestRecommendationAgent:
         assert "movie" in defaults
         assert "book" in defaults
         assert defaults["movie"]["title"] == "Inception"
-        assert defaults["book"]["title"] == "The Hitchhiker's Guide to the Galaxy" 
\ No newline at end of file
+        assert defaults["book"]["title"] == "The Hitchhiker's Guide to the Galaxy"
+    
+    def test_get_recommendations_async(self):
+        """Test the async variant returns the same recommendations as the sync method."""
+        agent = RecommendationAgent.create()
+        genres = ["Sci-Fi", "Drama", "Comedy"]
+        
+        result = asyncio.run(agent.get_recommendations_async(genres))
+        
+        assert result == agent.get_recommendations(genres)
+    
+    @patch('src.agents.recommendation_agent.acreate_chat_completion')
+    def test_get_recommendations_async_with_error(self, mock_acreate):
+        """Test the async variant falls back to default recommendations on error."""
+        mock_acreate.side_effect = Exception("API error")
+        agent = RecommendationAgent.create()
+        
+        result = asyncio.run(agent.get_recommendations_async(["Sci-Fi"]))
+        
+        assert result == agent._default_recommendations()
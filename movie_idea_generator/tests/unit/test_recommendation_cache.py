@@ -0,0 +1,150 @@
+"""Tests for the genre-set recommendation cache."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.agents.recommendation_agent import RecommendationAgent
+from src.cache.recommendation_cache import RecommendationCache, genre_set_key
+from src.cache.sqlite_cache import SQLiteCache
+
+
+def completion(content):
+    """Build a chat completion response with the given content."""
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+def answer(title):
+    """Build a recommendations dictionary with the given movie title."""
+    return {
+        "movie": {"title": title, "creator": "Director", "year": "2020", "description": "A movie"},
+        "book": {"title": "Book", "creator": "Author", "year": "2019", "description": "A book"}
+    }
+
+
+class TestRecommendationCache:
+    """Tests for the RecommendationCache class."""
+
+    def test_key_ignores_order_and_case(self):
+        """Test that the same genre set in any order or casing shares a key."""
+        assert genre_set_key(["Sci-Fi", "Horror"]) == genre_set_key([" horror", "SCI-FI", "Horror"])
+        assert genre_set_key(["Sci-Fi", "Horror"]) != genre_set_key(["Sci-Fi"])
+
+    def test_add_and_get(self):
+        """Test that stored answers are returned as copies and counted as hits."""
+        cache = RecommendationCache()
+        cache.add(["Drama", "Comedy"], answer("First"))
+
+        result = cache.get(["comedy", "drama"])
+        result["movie"]["title"] = "Changed"
+
+        assert cache.get(["Drama", "Comedy"]) == answer("First")
+        assert cache.get(["Horror"]) is None
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used genre set is evicted beyond the cap."""
+        cache = RecommendationCache(max_entries=2)
+        cache.add(["a"], answer("a"))
+        cache.add(["b"], answer("b"))
+        cache.get(["a"])
+        cache.add(["c"], answer("c"))
+
+        assert len(cache) == 2
+        assert cache.get(["b"]) is None
+        assert cache.get(["a"]) == answer("a")
+
+    def test_rotation(self):
+        """Test that lookups miss until N answers were added, then rotate through the distinct ones."""
+        cache = RecommendationCache(rotation_size=3)
+        cache.add(["Drama"], answer("First"))
+        assert cache.get(["Drama"]) is None
+
+        cache.add(["Drama"], answer("First"))
+        assert cache.get(["Drama"]) is None
+
+        cache.add(["Drama"], answer("Second"))
+        titles = [cache.get(["Drama"])["movie"]["title"] for _ in range(4)]
+        assert titles == ["First", "Second", "First", "Second"]
+
+    def test_rotation_with_repeated_answer(self):
+        """Test that a genre set always answered the same way is served once N answers were added."""
+        cache = RecommendationCache(rotation_size=3)
+        for _ in range(3):
+            assert cache.get(["Drama"]) is None
+            cache.add(["Drama"], answer("Same"))
+
+        assert [cache.get(["Drama"])["movie"]["title"] for _ in range(10)] == ["Same"] * 10
+
+    def test_persistent_tier(self, tmp_path):
+        """Test that answers survive a new in-memory tier backed by the same file."""
+        path = str(tmp_path / "recommendations.sqlite3")
+        first = RecommendationCache(persistent=SQLiteCache(path))
+        first.add(["Horror", "Sci-Fi"], answer("Alien"))
+        first.persistent.close()
+
+        second = RecommendationCache(persistent=SQLiteCache(path))
+        assert second.get(["sci-fi", "horror"]) == answer("Alien")
+        second.persistent.close()
+
+    def test_persistent_tier_keeps_fill_count(self, tmp_path):
+        """Test that a rotating genre set filled in one run is served from disk in the next."""
+        path = str(tmp_path / "recommendations.sqlite3")
+        first = RecommendationCache(rotation_size=2, persistent=SQLiteCache(path))
+        first.add(["Drama"], answer("Same"))
+        first.add(["Drama"], answer("Same"))
+        first.persistent.close()
+
+        second = RecommendationCache(rotation_size=2, persistent=SQLiteCache(path))
+        assert second.get(["drama"]) == answer("Same")
+        second.persistent.close()
+
+
+class TestRecommendationAgentCache:
+    """Tests for caching in RecommendationAgent."""
+
+    @patch('src.agents.recommendation_agent.create_chat_completion')
+    def test_repeated_genre_set_hits_cache(self, mock_create):
+        """Test that the same genre set in another order is answered without an LLM call."""
+        mock_create.return_value = completion(
+            '{"movie": {"title": "Alien", "creator": "Ridley Scott", "year": "1979", "description": "Space horror"},'
+            ' "book": {"title": "Frankenstein", "creator": "Mary Shelley", "year": "1818", "description": "Gothic"}}'
+        )
+        agent = RecommendationAgent.create()
+        agent.cache = RecommendationCache()
+
+        first = agent.get_recommendations(["Sci-Fi", "Horror"])
+        second = agent.get_recommendations(["horror", "sci-fi"])
+
+        assert first == second
+        assert first["movie"]["title"] == "Alien"
+        assert mock_create.call_count == 1
+
+    @patch('src.agents.recommendation_agent.create_chat_completion')
+    def test_rotation_fills_when_llm_repeats_itself(self, mock_create):
+        """Test that rotation still gets hits when the LLM keeps returning the same pick."""
+        mock_create.return_value = completion(
+            '{"movie": {"title": "Alien", "creator": "Ridley Scott", "year": "1979", "description": "Space horror"},'
+            ' "book": {"title": "Frankenstein", "creator": "Mary Shelley", "year": "1818", "description": "Gothic"}}'
+        )
+        agent = RecommendationAgent.create()
+        agent.cache = RecommendationCache(rotation_size=3)
+
+        for _ in range(10):
+            agent.get_recommendations(["Sci-Fi", "Horror"])
+
+        assert mock_create.call_count == 3
+        assert agent.cache.stats()["hits"] == 7
+
+    @patch('src.agents.recommendation_agent.create_chat_completion')
+    def test_default_recommendations_not_cached(self, mock_create):
+        """Test that fallback recommendations from errors or bad responses are never stored."""
+        agent = RecommendationAgent.create()
+        agent.cache = RecommendationCache()
+
+        mock_create.return_value = completion('{"movie": {}}')
+        assert agent.get_recommendations(["Drama"]) == agent._default_recommendations()
+        mock_create.side_effect = Exception("API error")
+        assert agent.get_recommendations(["Drama"]) == agent._default_recommendations()
+
+        assert len(agent.cache) == 0
@@ -0,0 +1,170 @@
+"""Tests for the recommender service client and RecommendationAgent's catalog mode."""
+
+import asyncio
+import http.server
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from src.agents.recommendation_agent import RecommendationAgent
+from src.config import recommender
+
+CATALOG = {
+    "movies": {"name": "Alien", "description": "Space horror", "genres": ["Sci-Fi", "Horror"]},
+    "books": {"name": "Frankenstein", "description": "Gothic horror", "genres": ["Horror"]}
+}
+
+
+@pytest.fixture
+def service():
+    """A stand-in recommender service; set `score` or `delay` on it to change its answers."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(server.delay)
+            if "Unknown" in request["genres"]:
+                status, body = 404, {"detail": "No matching items found"}
+            else:
+                status, body = 200, {**CATALOG[request["type"]], "similarity_score": server.score}
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.score, server.delay = 1.5, 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    recommender.reset_recommender_client()
+    with patch.dict(recommender.RECOMMENDER_CONFIG, {"url": f"http://127.0.0.1:{server.server_port}"}):
+        yield server
+    recommender.reset_recommender_client()
+    server.shutdown()
+
+
+@pytest.fixture
+def agent():
+    agent = RecommendationAgent.create()
+    agent.mode = "catalog"
+    return agent
+
+
+class TestRecommenderClient:
+    """Tests for src.config.recommender."""
+
+    def test_fetch_maps_to_recommendation_shape(self, service):
+        """Test that service items become movie and book recommendations."""
+        result = recommender.fetch_recommendations(["Sci-Fi", "Horror"])
+
+        assert result == {
+            "movie": {"title": "Alien", "creator": "Unknown", "year": "Unknown", "description": "Space horror"},
+            "book": {"title": "Frankenstein", "creator": "Unknown", "year": "Unknown", "description": "Gothic horror"}
+        }
+
+    def test_weak_match_is_a_miss(self, service):
+        """Test that matches below min_similarity are not used."""
+        service.score = 0.1
+
+        assert recommender.fetch_recommendations(["Sci-Fi"]) is None
+
+    def test_client_is_shared(self, service):
+        """Test that calls reuse one pooled client."""
+        recommender.fetch_recommendations(["Sci-Fi"])
+        client = recommender.get_recommender_client()
+        recommender.fetch_recommendations(["Horror"])
+
+        assert recommender.get_recommender_client() is client
+
+
+class TestRecommendationAgentCatalogMode:
+    """Tests for RecommendationAgent with mode = "catalog"."""
+
+    @patch('src.agents.recommendation_agent.create_chat_completion')
+    def test_catalog_hit_skips_llm(self, mock_create, service, agent):
+        """Test that a catalog answer is returned without an LLM call."""
+        result = agent.get_recommendations(["Sci-Fi", "Horror"])
+
+        assert result["movie"]["title"] == "Alien"
+        mock_create.assert_not_called()
+
+    def test_catalog_miss_falls_back_to_llm(self, service, agent):
+        """Test that a 404 from the service falls back to the LLM."""
+        with patch('src.agents.recommendation_agent.create_chat_completion') as mock_create:
+            mock_create.side_effect = Exception("API error")
+            result = agent.get_recommendations(["Unknown"])
+
+        mock_create.assert_called_once()
+        assert result == agent._default_recommendations()
+
+    @patch('src.agents.recommendation_agent.create_chat_completion', side_effect=Exception("API error"))
+    def test_slow_service_falls_back_within_timeout(self, mock_create, service, agent):
+        """Test that a service slower than the timeout is abandoned quickly."""
+        service.delay = 2
+        start = time.perf_counter()
+
+        agent.get_recommendations(["Sci-Fi"])
+
+        assert time.perf_counter() - start < 1.5
+        mock_create.assert_called_once()
+
+    def test_unreachable_service_falls_back(self, agent):
+        """Test that a service that is not running falls back to the LLM."""
+        recommender.reset_recommender_client()
+        with patch.dict(recommender.RECOMMENDER_CONFIG, {"url": "http://127.0.0.1:9"}), \
+                patch('src.agents.recommendation_agent.create_chat_completion') as mock_create:
+            mock_create.side_effect = Exception("API error")
+            result = agent.get_recommendations(["Sci-Fi"])
+        recommender.reset_recommender_client()
+
+        assert result == agent._default_recommendations()
+
+    @patch('src.agents.recommendation_agent.acreate_chat_completion')
+    def test_catalog_hit_async(self, mock_acreate, service, agent):
+        """Test that the async variant also answers from the catalog."""
+        result = asyncio.run(agent.get_recommendations_async(["Sci-Fi", "Horror"]))
+
+        assert result["book"]["title"] == "Frankenstein"
+        mock_acreate.assert_not_called()
+
+
+class TestRecommendationAgentEngineMode:
+    """Tests for RecommendationAgent with mode = "engine"."""
+
+    @patch('src.agents.recommendation_agent.create_chat_completion')
+    def test_engine_hit_skips_llm(self, mock_create, agent):
+        """Test that the in-process engine answers from the bundled catalog without an LLM call."""
+        agent.mode = "engine"
+
+        result = agent.get_recommendations(["Science Fiction", "Thriller"])
+
+        assert result["movie"]["title"] == "Inception"
+        assert result["book"]["creator"] == "Unknown"
+        mock_create.assert_not_called()
+
+    @patch('src.agents.recommendation_agent.acreate_chat_completion')
+    def test_engine_hit_async(self, mock_acreate, agent):
+        """Test that the async variant also answers from the engine."""
+        agent.mode = "engine"
+
+        result = asyncio.run(agent.get_recommendations_async(["Science Fiction", "Thriller"]))
+
+        assert result == agent.get_recommendations(["Science Fiction", "Thriller"])
+        mock_acreate.assert_not_called()
+
+    def test_engine_unavailable_falls_back(self, agent):
+        """Test that a missing recommender checkout falls back to the LLM."""
+        agent.mode = "engine"
+        with patch('src.agents.recommendation_agent.engine_recommendations', side_effect=ImportError("no app")), \
+                patch('src.agents.recommendation_agent.create_chat_completion') as mock_create:
+            mock_create.side_effect = Exception("API error")
+            result = agent.get_recommendations(["Sci-Fi"])
+
+        assert result == agent._default_recommendations()
@@ -0,0 +1,58 @@
+"""Tests for the shared agent registry."""
+
+import threading
+from unittest.mock import patch
+
+from src.agents.genre_analyzer_agent import GenreAnalyzerAgent
+from src.agents.idea_generator_agent import IdeaGeneratorAgent
+from src.agents.registry import get_agent, get_registry_stats, reset_agents
+from src.main import generate_movie_idea
+
+
+class TestRegistry:
+    """Tests for get_agent and reset_agents."""
+
+    def test_same_instance_each_time(self):
+        """Test that an agent is created once and then reused."""
+        first = get_agent(GenreAnalyzerAgent)
+
+        assert get_agent(GenreAnalyzerAgent) is first
+        assert get_agent(IdeaGeneratorAgent) is not first
+        assert get_registry_stats()["agents"] == ["GenreAnalyzerAgent", "IdeaGeneratorAgent"]
+
+    def test_concurrent_first_use_creates_one_agent(self):
+        """Test that threads racing for a new agent all get the same one."""
+        barrier = threading.Barrier(8)
+        agents = []
+
+        def fetch():
+            barrier.wait()
+            agents.append(get_agent(IdeaGeneratorAgent))
+
+        with patch.object(IdeaGeneratorAgent, "create", wraps=IdeaGeneratorAgent.create) as mock_create:
+            threads = [threading.Thread(target=fetch) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_create.call_count == 1
+        assert all(agent is agents[0] for agent in agents)
+
+    def test_reset_creates_new_agents(self):
+        first = get_agent(GenreAnalyzerAgent)
+
+        reset_agents()
+
+        assert get_agent(GenreAnalyzerAgent) is not first
+
+    def test_pipeline_reuses_agents(self):
+        """Test that repeated generations create each agent only once."""
+        created = get_registry_stats()["created"]
+
+        for _ in range(3):
+            generate_movie_idea("A space heist", concurrent=False)
+
+        stats = get_registry_stats()
+        assert stats["created"] - created == 3
+        assert stats["agents"] == ["GenreAnalyzerAgent", "IdeaGeneratorAgent", "RecommendationAgent"]
@@ -0,0 +1,193 @@
+"""Tests for retries and hedged requests in src.config.resilience."""
+
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from src.config.resilience import (
+    LatencyTracker,
+    RetryPolicy,
+    acall_with_resilience,
+    call_with_resilience,
+    is_retryable,
+)
+
+
+class RateLimitError(Exception):
+    """Stands in for openai.RateLimitError."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers={"retry-after": retry_after} if retry_after else {})
+
+
+class BadRequestError(Exception):
+    """Stands in for openai.BadRequestError."""
+
+    status_code = 400
+
+
+def flaky(*outcomes):
+    """Build a call that raises or returns each outcome in turn, counting calls."""
+    calls = []
+
+    def call():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    call.calls = calls
+    return call
+
+
+def fast_policy(**kwargs):
+    return RetryPolicy(base_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def primed_tracker(latency=0.01, samples=20):
+    tracker = LatencyTracker()
+    for _ in range(samples):
+        tracker.record(latency)
+    return tracker
+
+
+class TestRetries:
+    """Tests for retries with backoff."""
+
+    def test_is_retryable(self):
+        """Test that rate limits, timeouts and 5xx are retried and client errors aren't."""
+        server_error = Exception("boom")
+        server_error.status_code = 503
+
+        assert is_retryable(RateLimitError())
+        assert is_retryable(TimeoutError())
+        assert is_retryable(server_error)
+        assert not is_retryable(BadRequestError())
+        assert not is_retryable(ValueError())
+
+    def test_retries_until_success(self):
+        """Test that retryable errors are retried."""
+        call = flaky(RateLimitError(), RateLimitError(), "ok")
+
+        assert call_with_resilience(call, fast_policy(max_attempts=3)) == "ok"
+        assert len(call.calls) == 3
+
+    def test_budget_caps_attempts(self):
+        """Test that the last error is raised once the attempt budget is spent."""
+        call = flaky(RateLimitError())
+
+        with pytest.raises(RateLimitError):
+            call_with_resilience(call, fast_policy(max_attempts=2))
+        assert len(call.calls) == 2
+
+    def test_non_retryable_error_is_raised_immediately(self):
+        """Test that client errors are not retried."""
+        call = flaky(BadRequestError(), "ok")
+
+        with pytest.raises(BadRequestError):
+            call_with_resilience(call, fast_policy(max_attempts=3))
+        assert len(call.calls) == 1
+
+    def test_backoff_is_capped_and_jittered(self):
+        """Test that delays stay within the exponential ceiling and the cap."""
+        policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+
+        delays = [policy.backoff(retry) for retry in range(6) for _ in range(50)]
+
+        assert all(0 <= delay <= 2.0 for delay in delays)
+        assert max(policy.backoff(0) for _ in range(50)) <= 0.5
+        assert len(set(delays)) > 1
+
+    def test_backoff_honours_retry_after(self):
+        """Test that a Retry-After header sets the delay, within the cap."""
+        policy = RetryPolicy(max_delay=5.0)
+
+        assert policy.backoff(0, RateLimitError(retry_after="3")) == 3.0
+        assert policy.backoff(0, RateLimitError(retry_after="60")) == 5.0
+
+    def test_async_retries(self):
+        """Test that the async variant retries too."""
+        call = flaky(RateLimitError(), "ok")
+
+        async def acall():
+            return call()
+
+        assert asyncio.run(acall_with_resilience(acall, fast_policy(max_attempts=2))) == "ok"
+        assert len(call.calls) == 2
+
+
+class TestHedging:
+    """Tests for hedged requests."""
+
+    def test_latency_tracker_p95(self):
+        """Test that p95 comes from the recorded window."""
+        tracker = LatencyTracker()
+        for i in range(100):
+            tracker.record(i / 100)
+
+        assert tracker.p95() == 0.95
+
+    def test_slow_call_is_hedged(self):
+        """Test that a call running past p95 gets a duplicate and the fast one wins."""
+        calls = []
+
+        def call():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(1)
+                return "slow"
+            return "fast"
+
+        start = time.perf_counter()
+        result = call_with_resilience(call, fast_policy(max_attempts=3, hedge=True), primed_tracker())
+
+        assert result == "fast"
+        assert time.perf_counter() - start < 0.5
+        assert len(calls) == 2
+
+    def test_no_hedging_before_enough_samples(self):
+        """Test that hedging waits until p95 is based on enough calls."""
+        call = flaky("ok")
+
+        call_with_resilience(call, fast_policy(hedge=True, hedge_min_samples=20), primed_tracker(samples=5))
+
+        assert len(call.calls) == 1
+
+    def test_hedges_count_against_budget(self):
+        """Test that a hedged attempt uses two requests of the budget."""
+        calls = []
+
+        def call():
+            calls.append(1)
+            time.sleep(0.05)
+            raise RateLimitError()
+
+        with pytest.raises(RateLimitError):
+            call_with_resilience(call, fast_policy(max_attempts=2, hedge=True), primed_tracker())
+        assert len(calls) == 2
+
+    def test_async_hedge_cancels_loser(self):
+        """Test that the slower async request is cancelled once one finishes."""
+        cancelled = threading.Event()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return "fast"
+
+        result = asyncio.run(acall_with_resilience(call, fast_policy(hedge=True), primed_tracker()))
+
+        assert result == "fast"
+        assert cancelled.is_set()
@@ -0,0 +1,142 @@
+"""Tests for the HTTP service mode."""
+
+import asyncio
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from src import server
+from src.config.config import SERVICE_CONFIG
+
+
+@pytest.fixture
+def client():
+    """A test client whose startup skips the network warm-up."""
+    with patch("src.server.awarm_up_openai_client", AsyncMock(return_value=True)), \
+            TestClient(server.app) as test_client:
+        yield test_client
+
+
+class TestService:
+    """Tests for the /ideas, /health, /ready and /stats endpoints."""
+
+    def test_generate_idea(self, client):
+        """Test that a prompt gets the same result as generate_movie_idea."""
+        response = client.post("/ideas", json={"prompt": "A sci-fi movie about aliens"})
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["user_prompt"] == "A sci-fi movie about aliens"
+        assert set(result) == {"user_prompt", "genres", "recommendations", "movie_idea"}
+        assert client.get("/health").json()["completed"] == 1
+
+    def test_empty_prompt_rejected(self, client):
+        assert client.post("/ideas", json={"prompt": ""}).status_code == 422
+
+    def test_deadline_exceeded(self, client):
+        """Test that a generation outliving its deadline is cancelled with a 504."""
+        cancelled = []
+
+        async def slow_generate(prompt):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(prompt)
+                raise
+
+        with patch("src.server.generate_movie_idea_async", slow_generate):
+            response = client.post("/ideas", json={"prompt": "A slow idea", "deadline_ms": 50})
+
+        assert response.status_code == 504
+        assert cancelled == ["A slow idea"]
+        health = client.get("/health").json()
+        assert health["timed_out"] == 1
+        assert health["in_flight"] == 0
+
+    def test_overload_is_shed(self, client):
+        """Test that requests beyond the slots and the queue get a 503 with Retry-After."""
+        admission = client.app.state.admission
+        admission.max_queue = 0
+
+        async def hold_every_slot():
+            for _ in range(admission.max_concurrency):
+                await admission.acquire(1)
+
+        client.portal.call(hold_every_slot)
+        response = client.post("/ideas", json={"prompt": "One too many"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(SERVICE_CONFIG["retry_after"])
+        assert client.get("/health").json()["shed"] == 1
+
+    def test_health_and_ready(self, client):
+        health = client.get("/health").json()
+        ready = client.get("/ready")
+
+        assert health["status"] == "ok"
+        assert health["max_concurrency"] == SERVICE_CONFIG["max_concurrency"]
+        assert ready.status_code == 200
+        assert ready.json() == {"status": "ready", "warm_connection": True}
+
+    @patch("src.config.secrets.OPENAI_API_KEY", "")
+    def test_not_ready_without_api_key(self, client):
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "missing_api_key"
+
+    def test_stats(self, client):
+        assert set(client.get("/stats").json()) == {"caches", "rate_limits"}
+
+
+class TestAdmission:
+    """Tests for the Admission slot limiter."""
+
+    def test_waits_for_a_slot(self):
+        """Test that a queued request gets the slot a finished one releases."""
+        async def scenario():
+            admission = server.Admission(max_concurrency=1, max_queue=1)
+            await admission.acquire(1)
+            waiter = asyncio.ensure_future(admission.acquire(1))
+            await asyncio.sleep(0)
+            queued = admission.queued
+            admission.release()
+            await waiter
+            return queued, admission.in_flight, admission.queued
+
+        assert asyncio.run(scenario()) == (1, 1, 0)
+
+    def test_times_out(self):
+        async def scenario():
+            admission = server.Admission(max_concurrency=1, max_queue=1)
+            await admission.acquire(1)
+            with pytest.raises(asyncio.TimeoutError):
+                await admission.acquire(0.01)
+            return admission.queued
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestEntryPoint:
+    """Tests for running the service with python -m src.server."""
+
+    def test_env_is_loaded_before_the_configuration(self):
+        """Test that settings from the .env file reach SERVICE_CONFIG and the argument defaults."""
+        code = (
+            "import os, runpy, sys\n"
+            "import src.config.env as env\n"
+            "env.load_env = lambda path=None: os.environ.update(MOVIE_IDEA_SERVICE_PORT='9123')\n"
+            "sys.argv = ['src.server', '--help']\n"
+            "runpy.run_module('src.server', run_name='__main__')\n"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent.parent,
+                                   capture_output=True, text=True)
+
+        assert completed.returncode == 0, completed.stderr
+        assert "9123" in completed.stdout
+
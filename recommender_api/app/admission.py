@@ -0,0 +1,115 @@
+"""
+Admission control for scoring work.
+
+At most ``max_in_flight`` scoring tasks run at once. Further requests wait in a
+bounded FIFO queue for up to ``queue_timeout`` seconds; requests that find the
+queue full or outlive their wait are shed immediately so the caller can retry
+elsewhere instead of piling onto an overloaded process.
+"""
+
+import asyncio
+import os
+from collections import deque
+from typing import Deque, Dict, List
+
+from app.metrics import Sample
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed by admission control."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Request shed: {reason}")
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, deadline-limited wait queue."""
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 64,
+                 queue_timeout: float = 2.0, retry_after: int = 1):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue cannot be negative")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.admitted_total = 0
+        self.shed_total: Dict[str, int] = {"queue_full": 0, "deadline": 0}
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller configured from RECOMMENDER_* environment variables."""
+        return cls(
+            max_in_flight=int(os.environ.get("RECOMMENDER_MAX_IN_FLIGHT", 8)),
+            max_queue=int(os.environ.get("RECOMMENDER_MAX_QUEUE", 64)),
+            queue_timeout=float(os.environ.get("RECOMMENDER_QUEUE_TIMEOUT", 2.0)),
+            retry_after=int(os.environ.get("RECOMMENDER_RETRY_AFTER", 1))
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """
+        Wait for a scoring slot.
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeds ``queue_timeout``
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted_total += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed_total["queue_full"] += 1
+            raise Overloaded("queue_full", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.shed_total["deadline"] += 1
+            raise Overloaded("deadline", self.retry_after)
+        except asyncio.CancelledError:
+            # The client went away while queued
+            self._abandon(waiter)
+            raise
+        self.admitted_total += 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Give up a queued wait, passing the slot on if it was already handed over."""
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as the wait ended
+            self.release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        """Release a slot, handing it straight to the oldest live waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def metrics(self) -> List[Sample]:
+        """Current gauges and counters, for the ``/metrics`` endpoint."""
+        return [
+            ("in_flight", None, self.in_flight),
+            ("queue_depth", None, self.queue_depth),
+            ("max_in_flight", None, self.max_in_flight),
+            ("max_queue", None, self.max_queue),
+            ("admitted_total", None, self.admitted_total),
+        ] + [("shed_total", {"reason": reason}, count) for reason, count in self.shed_total.items()]
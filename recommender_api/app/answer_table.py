@@ -0,0 +1,246 @@
+"""
+Materialized answer table for small genre combinations.
+
+For every content type the table stores, for each combination of up to
+``max_size`` distinct catalog genres, the index and similarity score of the
+item the live scan in ``/recommend/`` would return. Queries whose normalized
+genres are in the table are answered with a single dictionary lookup.
+
+Build or refresh the table offline with:
+
+    python -m app.answer_table --max-size 4
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.similarity import calculate_genre_similarity
+
+TABLE_VERSION = 1
+KEY_SEPARATOR = "|"
+
+
+def normalize_genres(genres: List[str]) -> Optional[str]:
+    """
+    Build the table key for a genre list.
+
+    The key is order-insensitive and case-normalized, which matches the
+    scoring: CountVectorizer lowercases its input and the per-genre scores
+    are summed. Returns None for lists that can never be in the table
+    (duplicates or genres containing the separator).
+    """
+    normalized = sorted(genre.strip().lower() for genre in genres)
+    if len(set(normalized)) != len(normalized):
+        return None
+    if any(KEY_SEPARATOR in genre for genre in normalized):
+        return None
+    return KEY_SEPARATOR.join(normalized)
+
+
+def _item_fingerprint(item: Dict) -> str:
+    """Fingerprint the part of an item that affects its score."""
+    payload = json.dumps(item.get("genres", []), sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerTable:
+    """Precomputed best-item answers keyed by normalized genre combination."""
+
+    def __init__(
+        self,
+        max_size: int = 4,
+        score_fn: Callable[[List[str], List[str]], float] = calculate_genre_similarity
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.score_fn = score_fn
+        # content type -> {"items": [fingerprint, ...], "answers": {key: [index, score]}}
+        self._types: Dict[str, Dict] = {}
+        # content type -> the item list the table was last verified against, its length then,
+        # and the answers for it; replaced in one assignment so readers never mix versions
+        self._sources: Dict[str, Tuple[List[Dict], int, Dict]] = {}
+
+    def build(self, catalog: Dict[str, List[Dict]]) -> List[str]:
+        """
+        Bring the table in line with a catalog.
+
+        Returns:
+            The content types whose answers had to be recomputed
+        """
+        changed = [content_type for content_type, items in catalog.items()
+                   if self.update_type(content_type, items)]
+        for content_type in list(self._types):
+            if content_type not in catalog:
+                del self._types[content_type]
+                self._sources.pop(content_type, None)
+                changed.append(content_type)
+        return changed
+
+    def update_type(self, content_type: str, items: List[Dict]) -> bool:
+        """
+        Refresh the answers for one content type.
+
+        Appending items only scores the new items against the stored answers
+        (plus a full scan for combinations over newly introduced genres); any
+        other change rebuilds the content type from scratch. The current answers
+        keep being served until the new ones are swapped in, so this may run in
+        a worker thread while lookups continue.
+
+        Returns:
+            True if any answers were recomputed
+        """
+        fingerprints = [_item_fingerprint(item) for item in items]
+        entry = self._types.get(content_type)
+
+        if entry is not None and entry["items"] == fingerprints:
+            self._sources[content_type] = (items, len(fingerprints), entry)
+            return False
+
+        answers = {}
+        start = 0
+        if entry is not None and fingerprints[:len(entry["items"])] == entry["items"]:
+            # Copied, as lookups may be reading the current answers meanwhile
+            answers = dict(entry["answers"])
+            start = len(entry["items"])
+
+        for combo in self._combinations(items):
+            key = KEY_SEPARATOR.join(combo)
+            if key in answers:
+                index, score = answers[key]
+                answers[key] = list(self._scan(list(combo), items, start, index, score))
+            else:
+                answers[key] = list(self._scan(list(combo), items, 0, None, -1))
+
+        # Combinations with no match at all are left to the live path,
+        # which raises the 404.
+        entry = {
+            "items": fingerprints,
+            "answers": {key: answer for key, answer in answers.items() if answer[0] is not None}
+        }
+        self._types[content_type] = entry
+        self._sources[content_type] = (items, len(fingerprints), entry)
+        return True
+
+    def is_current(self, content_type: str, items: List[Dict]) -> bool:
+        """Whether the answers for a content type were last verified against this item list as it is now."""
+        source = self._sources.get(content_type)
+        return source is not None and source[0] is items and source[1] == len(items)
+
+    def lookup(self, content_type: str, genres: List[str], items: List[Dict]) -> Optional[Tuple[int, float]]:
+        """
+        Look up the precomputed answer for a query.
+
+        Args:
+            content_type: The catalog section being queried
+            genres: The genres from the request
+            items: The live catalog section, used to detect catalog changes
+
+        Returns:
+            ``(item_index, similarity_score)`` or None when the query is not covered
+        """
+        if not self.is_current(content_type, items):
+            self.update_type(content_type, items)
+        return self._find(self._types[content_type], genres)
+
+    def lookup_last_built(self, content_type: str, genres: List[str]) -> Optional[Tuple[Dict, float]]:
+        """
+        Look up a query in the answers as last built, without checking the catalog.
+
+        For callers that refresh the table elsewhere (see ``update_type``): while a
+        changed catalog is being re-indexed, queries are answered from the catalog
+        version the current answers were built for.
+
+        Returns:
+            ``(item, similarity_score)`` or None when the query is not covered or
+            the content type hasn't been verified against a catalog yet
+        """
+        source = self._sources.get(content_type)
+        if source is None:
+            return None
+        answer = self._find(source[2], genres)
+        if answer is None:
+            return None
+        return source[0][answer[0]], answer[1]
+
+    def _find(self, entry: Dict, genres: List[str]) -> Optional[Tuple[int, float]]:
+        if not 0 < len(genres) <= self.max_size:
+            return None
+        key = normalize_genres(genres)
+        if key is None:
+            return None
+        answer = entry["answers"].get(key)
+        if answer is None:
+            return None
+        return answer[0], answer[1]
+
+    def __len__(self) -> int:
+        return sum(len(entry["answers"]) for entry in self._types.values())
+
+    def _combinations(self, items: List[Dict]):
+        vocabulary = sorted({genre.strip().lower() for item in items for genre in item.get("genres", [])})
+        for size in range(1, min(self.max_size, len(vocabulary)) + 1):
+            yield from itertools.combinations(vocabulary, size)
+
+    def _scan(self, genres: List[str], items: List[Dict], start: int,
+              best_index: Optional[int], best_score: float) -> Tuple[Optional[int], float]:
+        # Same strict comparison as the live scan, so ties keep the earliest item.
+        for index in range(start, len(items)):
+            similarity = self.score_fn(genres, items[index]["genres"])
+            if similarity > best_score:
+                best_score = similarity
+                best_index = index
+        return best_index, best_score
+
+    def to_dict(self) -> Dict:
+        return {"version": TABLE_VERSION, "max_size": self.max_size, "types": self._types}
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> "AnswerTable":
+        if payload.get("version") != TABLE_VERSION:
+            raise ValueError(f"Unsupported answer table version: {payload.get('version')}")
+        table = cls(max_size=payload["max_size"])
+        table._types = payload["types"]
+        return table
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "AnswerTable":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build the answer table for a catalog, reusing an existing table file when present."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Precompute best-item answers for small genre combinations")
+    parser.add_argument("--data", default=os.path.join(base_dir, 'data', 'data.json'))
+    parser.add_argument("--output", default=os.path.join(base_dir, 'data', 'answer_table.json'))
+    parser.add_argument("--max-size", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    with open(args.data, 'r') as f:
+        catalog = json.load(f)
+
+    table = None
+    if os.path.exists(args.output):
+        table = AnswerTable.load(args.output)
+        if table.max_size != args.max_size:
+            table = None
+    if table is None:
+        table = AnswerTable(max_size=args.max_size)
+
+    changed = table.build(catalog)
+    table.save(args.output)
+    print(f"Answer table: {len(table)} entries, rebuilt types: {', '.join(changed) or 'none'} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
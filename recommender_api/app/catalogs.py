@@ -0,0 +1,148 @@
+"""
+Named catalogs served from a directory.
+
+Each ``<namespace>.json`` file in the catalog directory has the same layout as
+``data/data.json``. Catalogs are loaded on first use and kept in an LRU cache
+bounded by an estimated memory budget; evicted catalogs are simply reloaded
+the next time they are requested.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.metrics import Sample
+from app.search import GenreIndex
+
+NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def estimate_size(value) -> int:
+    """Approximate the memory held by a parsed JSON value, in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    elif isinstance(value, list):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class Catalog:
+    """A loaded catalog with its lazily built search indexes."""
+
+    def __init__(self, namespace: str, data: Dict[str, List[Dict]]):
+        self.namespace = namespace
+        self.data = data
+        self.size_bytes = estimate_size(data)
+        self._indexes: Dict[str, GenreIndex] = {}
+        self._lock = threading.Lock()
+
+    def search_index(self, content_type: str) -> GenreIndex:
+        with self._lock:
+            index = self._indexes.get(content_type)
+            if index is None:
+                index = GenreIndex(self.data[content_type])
+                self._indexes[content_type] = index
+            return index
+
+    def find_best_match(self, content_type: str, genres: List[str]) -> Tuple[Optional[Dict], float]:
+        """Find the best item of a content type for the genres."""
+        results = self.search_index(content_type).top_k(genres, 1)
+        if not results:
+            return None, -1
+        index, similarity = results[0]
+        return self.data[content_type][index], similarity
+
+
+class CatalogRegistry:
+    """Lazily loaded catalogs with LRU eviction under a memory budget."""
+
+    def __init__(self, directory: str, memory_budget_bytes: int):
+        self.directory = directory
+        self.memory_budget_bytes = memory_budget_bytes
+        self.resident_bytes = 0
+        self._catalogs: "OrderedDict[str, Catalog]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, default_directory: str) -> "CatalogRegistry":
+        """Create a registry configured from RECOMMENDER_CATALOG_* environment variables."""
+        return cls(
+            directory=os.environ.get("RECOMMENDER_CATALOG_DIR", default_directory),
+            memory_budget_bytes=int(float(os.environ.get("RECOMMENDER_CATALOG_MEMORY_MB", 256)) * 1024 * 1024)
+        )
+
+    def path_for(self, namespace: str) -> str:
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise KeyError(namespace)
+        return os.path.join(self.directory, f"{namespace}.json")
+
+    def get(self, namespace: str) -> Catalog:
+        """
+        Return a catalog, loading it from disk if it is not resident.
+
+        Raises:
+            KeyError: If the namespace is invalid or has no catalog file
+        """
+        path = self.path_for(namespace)
+        with self._lock:
+            catalog = self._catalogs.get(namespace)
+            if catalog is not None:
+                self._catalogs.move_to_end(namespace)
+                self._stat(namespace, "requests_total")
+                return catalog
+
+        # Load outside the lock so one slow file doesn't block other namespaces
+        if not os.path.isfile(path):
+            raise KeyError(namespace)
+        with open(path, 'r') as f:
+            loaded = Catalog(namespace, json.load(f))
+
+        with self._lock:
+            catalog = self._catalogs.get(namespace)
+            if catalog is None:
+                catalog = loaded
+                self._catalogs[namespace] = catalog
+                self.resident_bytes += catalog.size_bytes
+                self._stat(namespace, "loads_total")
+                self._evict(keep=namespace)
+            self._catalogs.move_to_end(namespace)
+            self._stat(namespace, "requests_total")
+            return catalog
+
+    def _evict(self, keep: str) -> None:
+        while self.resident_bytes > self.memory_budget_bytes and len(self._catalogs) > 1:
+            namespace, catalog = next(iter(self._catalogs.items()))
+            if namespace == keep:
+                break
+            del self._catalogs[namespace]
+            self.resident_bytes -= catalog.size_bytes
+            self._stat(namespace, "evictions_total")
+
+    def _stat(self, namespace: str, name: str) -> None:
+        stats = self._stats.setdefault(namespace, {"requests_total": 0, "loads_total": 0, "evictions_total": 0})
+        stats[name] += 1
+
+    def resident(self) -> List[str]:
+        with self._lock:
+            return list(self._catalogs)
+
+    def metrics(self) -> List[Sample]:
+        """Registry-wide and per-namespace gauges and counters, for the ``/metrics`` endpoint."""
+        with self._lock:
+            samples: List[Sample] = [
+                ("resident_catalogs", None, len(self._catalogs)),
+                ("resident_bytes", None, self.resident_bytes),
+                ("memory_budget_bytes", None, self.memory_budget_bytes),
+            ]
+            for name in ("requests_total", "loads_total", "evictions_total"):
+                samples += [(name, {"namespace": namespace}, stats[name])
+                            for namespace, stats in sorted(self._stats.items())]
+            samples += [("namespace_resident_bytes", {"namespace": namespace}, catalog.size_bytes)
+                        for namespace, catalog in self._catalogs.items()]
+        return samples
@@ -0,0 +1,92 @@
+"""
+In-process recommender engine.
+
+Answers the same question as ``POST /recommend/`` -- the best item of a content
+type for a list of genres, with the same scores and tie-breaking -- without a
+web server, so a caller on the same host can skip the HTTP hop. Nothing heavy
+happens on import: the catalog, its search indexes and the optional answer
+table are loaded on the first recommendation.
+
+    from app.engine import RecommenderEngine
+
+    engine = RecommenderEngine.from_env()
+    engine.recommend("movies", ["Science Fiction", "Thriller"])
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data.json")
+DEFAULT_ANSWER_TABLE_PATH = os.path.join(os.path.dirname(DEFAULT_DATA_PATH), "answer_table.json")
+
+
+class RecommenderEngine:
+    """Scores a catalog file in-process, loading it on first use."""
+
+    def __init__(self, data_path: str = DEFAULT_DATA_PATH, answer_table_path: Optional[str] = None):
+        self.data_path = data_path
+        self.answer_table_path = answer_table_path
+        self._catalog = None
+        self._answer_table = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RecommenderEngine":
+        """Create an engine for the same files the service reads (RECOMMENDER_DATA, RECOMMENDER_ANSWER_TABLE)."""
+        return cls(
+            data_path=os.environ.get("RECOMMENDER_DATA", DEFAULT_DATA_PATH),
+            answer_table_path=os.environ.get("RECOMMENDER_ANSWER_TABLE", DEFAULT_ANSWER_TABLE_PATH)
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self._catalog is not None
+
+    def load(self):
+        """Load the catalog and answer table now instead of on the first recommendation."""
+        with self._lock:
+            if self._catalog is None:
+                # Imported here so that importing the engine doesn't load the scoring libraries
+                from app.answer_table import AnswerTable
+                from app.catalogs import Catalog
+
+                with open(self.data_path, "r") as f:
+                    catalog = Catalog("default", json.load(f))
+                if self.answer_table_path and os.path.exists(self.answer_table_path):
+                    self._answer_table = AnswerTable.load(self.answer_table_path)
+                self._catalog = catalog
+        return self._catalog
+
+    def content_types(self) -> List[str]:
+        return list(self.load().data.keys())
+
+    def recommend(self, content_type: str, genres: List[str]) -> Optional[Dict]:
+        """
+        Find the best item of a content type for the genres.
+
+        Returns a dictionary with the fields of RecommendationResponse (name,
+        description, genres, similarity_score), or None if nothing matches.
+        Raises ValueError for an unknown content type or an empty genre list.
+        """
+        catalog = self.load()
+        if content_type not in catalog.data:
+            raise ValueError(f"Invalid type. Choose from: {list(catalog.data.keys())}")
+        if not genres:
+            raise ValueError("Please provide at least one genre")
+
+        items = catalog.data[content_type]
+        answer = self._answer_table.lookup(content_type, genres, items) if self._answer_table is not None else None
+        if answer is not None:
+            best_match, similarity = items[answer[0]], answer[1]
+        else:
+            best_match, similarity = catalog.find_best_match(content_type, genres)
+        if not best_match:
+            return None
+        return {
+            "name": best_match["name"],
+            "description": best_match["description"],
+            "genres": best_match["genres"],
+            "similarity_score": similarity
+        }
@@ -1,21 +1,48 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
 import json
 import os
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from app.admission import AdmissionController, Overloaded
+from app.answer_table import AnswerTable
+from app.catalogs import CatalogRegistry
+from app.metrics import render_prometheus
+from app.search import GenreIndex, ShardedGenreIndex, merge_top_k
+from app.similarity import calculate_genre_similarity
 
 app = FastAPI(title="Genre-based Recommender API")
 
-# Load data from JSON
+# Load data from JSON, data/data.json unless RECOMMENDER_DATA names another file
 current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-data_path = os.path.join(current_dir, 'data', 'data.json')
+data_path = os.environ.get("RECOMMENDER_DATA", os.path.join(current_dir, 'data', 'data.json'))
 
 with open(data_path, 'r') as f:
     data = json.load(f)
 
+# Optional precomputed answers, built offline with `python -m app.answer_table`
+answer_table_path = os.environ.get(
+    "RECOMMENDER_ANSWER_TABLE", os.path.join(current_dir, 'data', 'answer_table.json')
+)
+answer_table = AnswerTable.load(answer_table_path) if os.path.exists(answer_table_path) else None
+# Answer table refreshes running in the thread pool, by content type
+answer_table_refreshes: Dict[str, asyncio.Future] = {}
+
+# Bounded concurrency and queueing for live scoring, configured via RECOMMENDER_* env vars
+admission = AdmissionController.from_env()
+
+# Token indexes for bound-driven search, rebuilt whenever a catalog section is replaced
+search_indexes: Dict[str, GenreIndex] = {}
+
+# Sharded indexes backing /recommend/stream
+stream_shards = int(os.environ.get("RECOMMENDER_STREAM_SHARDS", 4))
+sharded_indexes: Dict[str, ShardedGenreIndex] = {}
+
+# Named tenant catalogs, loaded on first use and evicted LRU under a memory budget
+catalogs = CatalogRegistry.from_env(os.path.join(current_dir, 'data', 'catalogs'))
+
 class RecommendationRequest(BaseModel):
     type: str
     genres: List[str]
@@ -25,55 +52,192 @@ class RecommendationRequest(BaseModel):
         if self.type not in ["movies", "books"]:
             raise ValueError(f"'type' must be one of: movies, books")
 
+class StreamRecommendationRequest(RecommendationRequest):
+    k: int = 5
+
 class RecommendationResponse(BaseModel):
     name: str
     description: str
     genres: List[str]
     similarity_score: float
 
-def calculate_genre_similarity(input_genres: List[str], item_genres: List[str]) -> float:
+def get_search_index(content_type: str, items: List[Dict]) -> GenreIndex:
     """
-    Calculate similarity between input genres and item genres using CountVectorizer and cosine similarity.
+    Return the search index for a catalog section, building it on first use.
     """
-    if not input_genres or not item_genres:
-        return 0.0
-    
-    # Combine all genres into a single corpus
-    all_genres = input_genres + item_genres
+    index = search_indexes.get(content_type)
+    if index is None or not index.is_current(items):
+        index = GenreIndex(items)
+        search_indexes[content_type] = index
+    return index
+
+def find_best_match(content_type: str, genres: List[str], items: List[Dict]) -> Tuple[Optional[Dict], float]:
+    """
+    Find the best match with its similarity score, skipping items that cannot beat it.
+    """
+    results = get_search_index(content_type, items).top_k(genres, 1)
+    if not results:
+        return None, -1
     
-    # Create a CountVectorizer to transform the genres into a bag of words
-    vectorizer = CountVectorizer()
-    genre_matrix = vectorizer.fit_transform(all_genres)
+    index, similarity = results[0]
+    return items[index], similarity
+
+async def admit() -> None:
+    """
+    Wait for an admission slot, turning shed requests into a 503 with a Retry-After header.
+    """
+    try:
+        await admission.acquire()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server overloaded ({e.reason}), please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def score_with_admission(score: Callable[..., Tuple[Optional[Dict], float]], *args) -> Tuple[Optional[Dict], float]:
+    """
+    Run live scoring in the thread pool once admission control grants a slot.
+    """
+    await admit()
+    try:
+        return await run_in_threadpool(score, *args)
+    finally:
+        admission.release()
+
+def lookup_answer(content_type: str, genres: List[str], items: List[Dict]) -> Optional[Tuple[Dict, float]]:
+    """
+    Look up a precomputed answer without blocking the event loop.
+
+    A changed catalog section is re-indexed in the thread pool; until the new
+    answers are swapped in, the table keeps answering from the previous version.
+    """
+    if answer_table is None:
+        return None
+    if not answer_table.is_current(content_type, items):
+        refresh = answer_table_refreshes.get(content_type)
+        if refresh is None or refresh.done():
+            answer_table_refreshes[content_type] = asyncio.ensure_future(
+                run_in_threadpool(answer_table.update_type, content_type, items)
+            )
+    return answer_table.lookup_last_built(content_type, genres)
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding an admission slot, released once the response is
+    done however it ends: sent, abandoned by the client, or failed before its
+    body was iterated.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            admission.release()
+
+def get_sharded_index(content_type: str, items: List[Dict]) -> ShardedGenreIndex:
+    """
+    Return the sharded index for a catalog section, building it on first use.
+    """
+    index = sharded_indexes.get(content_type)
+    if index is None or not index.is_current(items):
+        index = ShardedGenreIndex(items, stream_shards)
+        sharded_indexes[content_type] = index
+    return index
+
+def format_event(event: str, payload: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def format_results(items: List[Dict], ranked: List[Tuple[int, float]]) -> List[Dict]:
+    return [
+        {
+            "name": items[index]["name"],
+            "description": items[index]["description"],
+            "genres": items[index]["genres"],
+            "similarity_score": score
+        }
+        for index, score in ranked
+    ]
+
+async def stream_rankings(content_type: str, genres: List[str], items: List[Dict], k: int) -> AsyncIterator[str]:
+    """
+    Score shards most-promising first, emitting the best-so-far ranking after each
+    shard and the authoritative ranking once all shards are done.
+    """
+    index = await run_in_threadpool(get_sharded_index, content_type, items)
+    order = index.shard_order(genres)
+    ranked: List[Tuple[int, float]] = []
+    for done, shard in enumerate(order, start=1):
+        shard_results = await run_in_threadpool(index.shard_top_k, shard, genres, k)
+        ranked = merge_top_k(ranked + shard_results, k)
+        yield format_event("partial", {
+            "shards_done": done,
+            "shards_total": len(order),
+            "results": format_results(items, ranked)
+        })
+    yield format_event("final", {"results": format_results(items, ranked)})
+
+@app.post("/recommend/", response_model=RecommendationResponse)
+async def recommend(request: RecommendationRequest):
+    if request.type not in data:
+        raise HTTPException(status_code=400, detail=f"Invalid type. Choose from: {list(data.keys())}")
     
-    # Calculate cosine similarity between input and item genres
-    input_vectors = genre_matrix[:len(input_genres)]
-    item_vectors = genre_matrix[len(input_genres):]
+    if not request.genres:
+        raise HTTPException(status_code=400, detail="Please provide at least one genre")
     
-    # Calculate similarity between each pair and find the best matches
-    similarity_matrix = cosine_similarity(input_vectors, item_vectors)
+    items = data[request.type]
+
+    answer = lookup_answer(request.type, request.genres, items)
+    if answer is not None:
+        best_match, max_similarity = answer
+    else:
+        best_match, max_similarity = await score_with_admission(find_best_match, request.type, request.genres, items)
     
-    # For each input genre, find the maximum similarity with any item genre
-    total_similarity = np.sum([np.max(similarity_matrix[i]) for i in range(len(input_genres))])
+    if not best_match:
+        raise HTTPException(status_code=404, detail="No matching items found")
     
-    return float(total_similarity)
+    return RecommendationResponse(
+        name=best_match["name"],
+        description=best_match["description"],
+        genres=best_match["genres"],
+        similarity_score=max_similarity
+    )
 
-@app.post("/recommend/", response_model=RecommendationResponse)
-async def recommend(request: RecommendationRequest):
+@app.post("/recommend/stream")
+async def recommend_stream(request: StreamRecommendationRequest):
     if request.type not in data:
         raise HTTPException(status_code=400, detail=f"Invalid type. Choose from: {list(data.keys())}")
     
     if not request.genres:
         raise HTTPException(status_code=400, detail="Please provide at least one genre")
     
-    items = data[request.type]
-    best_match = None
-    max_similarity = -1
+    if request.k < 1:
+        raise HTTPException(status_code=400, detail="'k' must be at least 1")
     
-    for item in items:
-        similarity = calculate_genre_similarity(request.genres, item["genres"])
-        if similarity > max_similarity:
-            max_similarity = similarity
-            best_match = item
+    await admit()
+    try:
+        return AdmittedStreamingResponse(
+            stream_rankings(request.type, request.genres, data[request.type], request.k),
+            media_type="text/event-stream"
+        )
+    except BaseException:
+        admission.release()
+        raise
+
+@app.post("/catalogs/{namespace}/recommend/", response_model=RecommendationResponse)
+async def recommend_from_catalog(namespace: str, request: RecommendationRequest):
+    try:
+        catalog = await run_in_threadpool(catalogs.get, namespace)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog: {namespace}")
+    
+    if request.type not in catalog.data:
+        raise HTTPException(status_code=400, detail=f"Invalid type. Choose from: {list(catalog.data.keys())}")
+    
+    if not request.genres:
+        raise HTTPException(status_code=400, detail="Please provide at least one genre")
+    
+    best_match, max_similarity = await score_with_admission(catalog.find_best_match, request.type, request.genres)
     
     if not best_match:
         raise HTTPException(status_code=404, detail="No matching items found")
@@ -83,4 +247,9 @@ async def recommend(request: RecommendationRequest):
         description=best_match["description"],
         genres=best_match["genres"],
         similarity_score=max_similarity
-    ) 
\ No newline at end of file
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return (render_prometheus("recommender_admission", admission.metrics())
+            + render_prometheus("recommender_catalog", catalogs.metrics()))
@@ -0,0 +1,29 @@
+"""Prometheus text exposition for the API's internal counters."""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+Sample = Tuple[str, Optional[Dict[str, str]], float]
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+def render_prometheus(prefix: str, samples: Iterable[Sample]) -> str:
+    """
+    Render samples in the Prometheus text format.
+
+    Names ending in ``_total`` are typed as counters, everything else as gauges.
+    """
+    lines = []
+    typed = set()
+    for name, labels, value in samples:
+        metric = f"{prefix}_{name}"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} {'counter' if name.endswith('_total') else 'gauge'}")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
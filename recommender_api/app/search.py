@@ -0,0 +1,124 @@
+"""
+Bound-driven top-k search over a catalog section.
+
+Each input genre contributes the best cosine similarity it has with any item
+genre, and that cosine is at most 1.0 and exactly 0.0 unless the two genres
+share a token. An item's score is therefore bounded by the number of input
+genres that share a token with it. Candidates are visited in order of that
+bound, and the search stops as soon as the next bound cannot beat the current
+k-th best score. Results are identical to an exhaustive scan ranked by score,
+with ties going to the earlier item.
+"""
+
+import bisect
+from typing import Callable, Dict, List, Set, Tuple
+
+from sklearn.feature_extraction.text import CountVectorizer
+
+from app.similarity import calculate_genre_similarity
+
+# Computed cosines can land a few ulps above 1.0, so bounds carry a little slack
+BOUND_SLACK = 1e-9
+
+# Same tokenization the scorer uses
+_analyze = CountVectorizer().build_analyzer()
+
+
+class GenreIndex:
+    """Inverted index from genre tokens to the items that contain them."""
+
+    def __init__(
+        self,
+        items: List[Dict],
+        score_fn: Callable[[List[str], List[str]], float] = calculate_genre_similarity
+    ):
+        self.items = items
+        self.size = len(items)
+        self.score_fn = score_fn
+        self.postings: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            tokens = {token for genre in item.get("genres", []) for token in _analyze(genre)}
+            for token in tokens:
+                self.postings.setdefault(token, []).append(index)
+        self.items_scored = 0
+
+    def is_current(self, items: List[Dict]) -> bool:
+        """Check whether the index was built for this item list."""
+        return self.items is items and self.size == len(items)
+
+    def upper_bounds(self, genres: List[str]) -> Dict[int, int]:
+        """Count, per item, the input genres that share at least one token with it."""
+        bounds: Dict[int, int] = {}
+        for genre in genres:
+            matched: Set[int] = set()
+            for token in _analyze(genre):
+                matched.update(self.postings.get(token, ()))
+            for index in matched:
+                bounds[index] = bounds.get(index, 0) + 1
+        return bounds
+
+    def top_k(self, genres: List[str], k: int = 1) -> List[Tuple[int, float]]:
+        """
+        Find the k best items for the genres.
+
+        Returns:
+            ``(item_index, similarity_score)`` pairs, best first
+        """
+        bounds = self.upper_bounds(genres)
+        candidates = sorted(bounds.items(), key=lambda entry: (-entry[1], entry[0]))
+
+        # Kept sorted by (-score, index) so the last entry is the current k-th best
+        ranking: List[Tuple[float, int]] = []
+        for index, bound in candidates:
+            if len(ranking) == k and -ranking[-1][0] > bound * (1 + BOUND_SLACK):
+                break
+            score = self.score_fn(genres, self.items[index]["genres"])
+            self.items_scored += 1
+            bisect.insort(ranking, (-score, index))
+            if len(ranking) > k:
+                ranking.pop()
+
+        results = [(index, -negative_score) for negative_score, index in ranking]
+
+        # Items sharing no token with the query score exactly 0.0 and rank by position
+        if len(results) < k:
+            for index in range(self.size):
+                if index not in bounds:
+                    results.append((index, 0.0))
+                    if len(results) == k:
+                        break
+        return results
+
+
+class ShardedGenreIndex:
+    """A catalog section split into contiguous shards, each with its own index."""
+
+    def __init__(self, items: List[Dict], shards: int = 4):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.items = items
+        self.size = len(items)
+        shard_size = max(1, -(-len(items) // shards))
+        self.shards: List[Tuple[int, GenreIndex]] = [
+            (start, GenreIndex(items[start:start + shard_size]))
+            for start in range(0, len(items), shard_size)
+        ]
+
+    def is_current(self, items: List[Dict]) -> bool:
+        """Check whether the index was built for this item list."""
+        return self.items is items and self.size == len(items)
+
+    def shard_order(self, genres: List[str]) -> List[int]:
+        """Shard numbers ordered by their best upper bound, most promising first."""
+        best_bounds = [max(index.upper_bounds(genres).values(), default=0) for _, index in self.shards]
+        return sorted(range(len(self.shards)), key=lambda shard: (-best_bounds[shard], shard))
+
+    def shard_top_k(self, shard: int, genres: List[str], k: int) -> List[Tuple[int, float]]:
+        """Top k of one shard, with indexes into the full item list."""
+        start, index = self.shards[shard]
+        return [(start + position, score) for position, score in index.top_k(genres, k)]
+
+
+def merge_top_k(ranked: List[Tuple[int, float]], k: int) -> List[Tuple[int, float]]:
+    """Merge per-shard results into a global top k, ties going to the earlier item."""
+    return sorted(ranked, key=lambda entry: (-entry[1], entry[0]))[:k]
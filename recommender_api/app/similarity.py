@@ -0,0 +1,31 @@
+from typing import List
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+
+
+def calculate_genre_similarity(input_genres: List[str], item_genres: List[str]) -> float:
+    """
+    Calculate similarity between input genres and item genres using CountVectorizer and cosine similarity.
+    """
+    if not input_genres or not item_genres:
+        return 0.0
+
+    # Combine all genres into a single corpus
+    all_genres = input_genres + item_genres
+
+    # Create a CountVectorizer to transform the genres into a bag of words
+    vectorizer = CountVectorizer()
+    genre_matrix = vectorizer.fit_transform(all_genres)
+
+    # Calculate cosine similarity between input and item genres
+    input_vectors = genre_matrix[:len(input_genres)]
+    item_vectors = genre_matrix[len(input_genres):]
+
+    # Calculate similarity between each pair and find the best matches
+    similarity_matrix = cosine_similarity(input_vectors, item_vectors)
+
+    # For each input genre, find the maximum similarity with any item genre
+    total_similarity = np.sum([np.max(similarity_matrix[i]) for i in range(len(input_genres))])
+
+    return float(total_similarity)
@@ -0,0 +1,127 @@
+"""
+Latency benchmark for the recommend endpoints.
+
+Serves a synthetic catalog with uvicorn on a local port and measures:
+- /recommend/ total latency
+- /recommend/stream time to first useful result (first ``partial`` event)
+  and total latency (``final`` event)
+
+Run from the recommender_api directory:
+
+    python -m benchmarks.bench_recommend --items 2000 --requests 30 --k 10
+"""
+
+import argparse
+import json
+import random
+import socket
+import statistics
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+import uvicorn
+
+import app.main as main_module
+
+GENRE_WORDS = [
+    "Action", "Adventure", "Drama", "Romance", "Science", "Fiction", "Fantasy", "Mystery",
+    "Thriller", "Comedy", "Horror", "Crime", "Historical", "Political", "Dark", "Epic",
+    "Space", "Western", "Noir", "Musical", "War", "Family", "Sports", "Psychological"
+]
+
+
+def synthetic_catalog(size: int, seed: int) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    rng = random.Random(seed)
+    genres = [" ".join(rng.sample(GENRE_WORDS, rng.randint(1, 2))) for _ in range(60)]
+    return {
+        "movies": [
+            {"name": f"Movie {i}", "description": "", "genres": rng.sample(genres, rng.randint(1, 4))}
+            for i in range(size)
+        ],
+        "books": []
+    }, genres
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2)
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(main_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def time_stream(client: httpx.Client, payload: Dict) -> Dict[str, float]:
+    start = time.perf_counter()
+    first_result = None
+    with client.stream("POST", "/recommend/stream", json=payload) as response:
+        for line in response.iter_lines():
+            if line.startswith("event: partial") and first_result is None:
+                first_result = time.perf_counter() - start
+    return {"first_result": first_result, "total": time.perf_counter() - start}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    catalog, genres = synthetic_catalog(args.items, args.seed)
+    main_module.data = catalog
+    main_module.answer_table = None
+    main_module.stream_shards = args.shards
+
+    port = free_port()
+    server = start_server(port)
+    rng = random.Random(args.seed + 1)
+    queries = [rng.sample(genres, rng.randint(2, 4)) for _ in range(args.requests)]
+
+    recommend_latency, first_result, stream_total = [], [], []
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        # Warm up indexes so the first measured request doesn't pay for building them
+        client.post("/recommend/", json={"type": "movies", "genres": queries[0]})
+        time_stream(client, {"type": "movies", "genres": queries[0], "k": args.k})
+
+        for query in queries:
+            start = time.perf_counter()
+            client.post("/recommend/", json={"type": "movies", "genres": query}).raise_for_status()
+            recommend_latency.append(time.perf_counter() - start)
+
+            timings = time_stream(client, {"type": "movies", "genres": query, "k": args.k})
+            first_result.append(timings["first_result"])
+            stream_total.append(timings["total"])
+
+    server.should_exit = True
+    print(json.dumps({
+        "items": args.items,
+        "requests": args.requests,
+        "k": args.k,
+        "shards": args.shards,
+        "recommend": percentiles(recommend_latency),
+        "stream_time_to_first_result": percentiles(first_result),
+        "stream_total": percentiles(stream_total)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
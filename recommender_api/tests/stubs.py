@@ -17,6 +17,13 @@ class FastAPI:
             self.routes.append((path, 'POST', func))
             return func
         return decorator
+    
+    def get(self, path, response_model=None, **kwargs):
+        """Decorator for GET routes"""
+        def decorator(func):
+            self.routes.append((path, 'GET', func))
+            return func
+        return decorator
 
 class HTTPException(Exception):
     """Stub for FastAPI HTTPException"""
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from app.admission import AdmissionController, Overloaded
+
+
+class TestAdmissionController:
+
+    def test_admits_up_to_limit(self):
+        """Test that requests under the limit are admitted without queueing"""
+        controller = AdmissionController(max_in_flight=2, max_queue=0)
+
+        async def scenario():
+            await controller.acquire()
+            await controller.acquire()
+
+        asyncio.run(scenario())
+        assert controller.in_flight == 2
+        assert controller.admitted_total == 2
+
+    def test_queue_full_is_shed(self):
+        """Test that a request is shed immediately when the queue is full"""
+        controller = AdmissionController(max_in_flight=1, max_queue=0, retry_after=3)
+
+        async def scenario():
+            await controller.acquire()
+            await controller.acquire()
+
+        with pytest.raises(Overloaded) as excinfo:
+            asyncio.run(scenario())
+
+        assert excinfo.value.reason == "queue_full"
+        assert excinfo.value.retry_after == 3
+        assert controller.shed_total["queue_full"] == 1
+
+    def test_deadline_is_shed(self):
+        """Test that a queued request is shed once it outlives its deadline"""
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+
+        async def scenario():
+            await controller.acquire()
+            await controller.acquire()
+
+        with pytest.raises(Overloaded) as excinfo:
+            asyncio.run(scenario())
+
+        assert excinfo.value.reason == "deadline"
+        assert controller.shed_total["deadline"] == 1
+        assert controller.queue_depth == 0
+        assert controller.in_flight == 1
+
+    def test_release_hands_slot_to_waiter(self):
+        """Test that releasing a slot admits the oldest waiter"""
+        controller = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=1.0)
+        order = []
+
+        async def worker(name):
+            await controller.acquire()
+            order.append(name)
+            await asyncio.sleep(0)
+            controller.release()
+
+        async def scenario():
+            await asyncio.gather(worker("a"), worker("b"), worker("c"))
+
+        asyncio.run(scenario())
+        assert order == ["a", "b", "c"]
+        assert controller.in_flight == 0
+        assert controller.admitted_total == 3
+
+    def test_cancelled_waiter_does_not_keep_slot(self):
+        """Test that a queued request cancelled by its client doesn't take the next slot"""
+        controller = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=1.0)
+
+        async def scenario():
+            await controller.acquire()
+            waiting = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            controller.release()
+
+        asyncio.run(scenario())
+        assert controller.queue_depth == 0
+        assert controller.in_flight == 0
+
+
+class TestAdmissionEndpoint:
+
+    def test_overloaded_returns_503(self, test_app, sample_data, monkeypatch):
+        """Test that shed requests get a fast 503 with Retry-After and show up in /metrics"""
+        import app.main as main_module
+
+        controller = AdmissionController(max_in_flight=1, max_queue=0, retry_after=2)
+        controller.in_flight = 1  # Simulate a scoring task that holds the only slot
+        monkeypatch.setattr(main_module, "admission", controller)
+        monkeypatch.setattr(main_module, "answer_table", None)
+        client = test_app(sample_data)
+
+        response = client.post("/recommend/", json={"type": "movies", "genres": ["Drama"]})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+
+        metrics = client.get("/metrics").text
+        assert 'recommender_admission_shed_total{reason="queue_full"} 1' in metrics
+        assert "recommender_admission_queue_depth 0" in metrics
@@ -0,0 +1,170 @@
+import itertools
+import threading
+import time
+import pytest
+from app.answer_table import AnswerTable, normalize_genres
+from app.main import calculate_genre_similarity
+
+
+def live_best(genres, items):
+    """Reference implementation: the exhaustive scan used by /recommend/"""
+    best_index, best_score = None, -1
+    for index, item in enumerate(items):
+        similarity = calculate_genre_similarity(genres, item["genres"])
+        if similarity > best_score:
+            best_index, best_score = index, similarity
+    return best_index, best_score
+
+
+class CountingScore:
+    """Wrap the scorer so tests can count how many items were scored"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input_genres, item_genres):
+        self.calls += 1
+        return calculate_genre_similarity(input_genres, item_genres)
+
+
+class TestNormalizeGenres:
+
+    def test_order_and_case_insensitive(self):
+        """Test that keys ignore genre order, case and surrounding whitespace"""
+        assert normalize_genres(["Drama", " action"]) == normalize_genres(["ACTION", "drama"])
+
+    def test_duplicates_not_covered(self):
+        """Test that duplicate genres produce no key"""
+        assert normalize_genres(["Drama", "drama"]) is None
+
+
+class TestAnswerTable:
+
+    def test_matches_live_scan(self, sample_data):
+        """Test that every precomputed answer equals the exhaustive scan"""
+        table = AnswerTable(max_size=3)
+        table.build(sample_data)
+
+        for content_type, items in sample_data.items():
+            vocabulary = sorted({g for item in items for g in item["genres"]})
+            for size in range(1, 4):
+                for combo in itertools.combinations(vocabulary, size):
+                    assert table.lookup(content_type, list(combo), items) == live_best(list(combo), items)
+
+    def test_lookup_miss_falls_through(self, sample_data):
+        """Test that unknown genres and oversized queries are not answered"""
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+        items = sample_data["movies"]
+
+        assert table.lookup("movies", ["Western"], items) is None
+        assert table.lookup("movies", ["Action", "Adventure", "Drama"], items) is None
+        assert table.lookup("movies", ["adventure", "ACTION"], items) == live_best(["Action", "Adventure"], items)
+
+    def test_append_is_incremental(self, sample_data):
+        """Test that appending an item only scores the new item for existing combinations"""
+        score = CountingScore()
+        table = AnswerTable(max_size=2, score_fn=score)
+        table.build(sample_data)
+
+        movies = sample_data["movies"] + [
+            {"name": "Test Movie 3", "description": "Another one", "genres": ["Drama", "Romance"]}
+        ]
+        combos = len(table._types["movies"]["answers"])
+        score.calls = 0
+        assert table.update_type("movies", movies)
+
+        # Same vocabulary, so exactly one new score per existing combination
+        assert score.calls == combos
+        assert table.lookup("movies", ["Drama"], movies) == live_best(["Drama"], movies)
+
+    def test_changed_catalog_detected_on_lookup(self, sample_data):
+        """Test that lookups notice a replaced catalog and refresh the table"""
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+
+        movies = [dict(item) for item in reversed(sample_data["movies"])]
+        assert table.lookup("movies", ["Drama"], movies) == live_best(["Drama"], movies)
+        assert table.lookup("movies", ["Drama"], movies)[0] == 0
+
+    def test_last_built_answers_until_refreshed(self, sample_data):
+        """Test that lookups without a refresh answer from the catalog version the table was built for"""
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+        old_movies = sample_data["movies"]
+        old_answer = table.lookup("movies", ["Drama"], old_movies)
+
+        movies = [dict(item, genres=["Drama"]) for item in reversed(old_movies)]
+        assert not table.is_current("movies", movies)
+        assert table.lookup_last_built("movies", ["Drama"]) == (old_movies[old_answer[0]], old_answer[1])
+
+        table.update_type("movies", movies)
+        assert table.is_current("movies", movies)
+        index, score = live_best(["Drama"], movies)
+        assert table.lookup_last_built("movies", ["Drama"]) == (movies[index], score)
+
+    def test_save_and_load(self, sample_data, tmp_path):
+        """Test that a saved table answers identically after loading"""
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+        path = tmp_path / "answer_table.json"
+        table.save(str(path))
+
+        loaded = AnswerTable.load(str(path))
+        assert len(loaded) == len(table)
+        assert loaded.lookup("books", ["Mystery"], sample_data["books"]) == \
+            table.lookup("books", ["Mystery"], sample_data["books"])
+
+
+class TestAnswerTableEndpoint:
+
+    def test_recommend_uses_table(self, test_app, sample_data, monkeypatch):
+        """Test that /recommend/ serves table answers identical to live scoring"""
+        import app.main as main_module
+
+        client = test_app(sample_data)
+        live = client.post("/recommend/", json={"type": "movies", "genres": ["Drama"]}).json()
+
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+        monkeypatch.setattr(main_module, "answer_table", table)
+
+        response = client.post("/recommend/", json={"type": "movies", "genres": ["drama"]})
+        assert response.status_code == 200
+        assert response.json() == live
+
+    def test_changed_catalog_refreshed_off_the_event_loop(self, test_app, sample_data, monkeypatch):
+        """Test that a changed catalog is re-indexed in the background while the old answers are served"""
+        import app.main as main_module
+
+        table = AnswerTable(max_size=2)
+        table.build(sample_data)
+        monkeypatch.setattr(main_module, "answer_table", table)
+        movies = [dict(item) for item in reversed(sample_data["movies"])]
+        client = test_app({**sample_data, "movies": movies})
+
+        release = threading.Event()
+        update_type = table.update_type
+
+        def slow_update(content_type, items):
+            release.wait(5)
+            return update_type(content_type, items)
+
+        monkeypatch.setattr(table, "update_type", slow_update)
+        # Keep one event loop for all requests, so the background refresh outlives the first one
+        with client:
+            start = time.perf_counter()
+            response = client.post("/recommend/", json={"type": "movies", "genres": ["Drama"]})
+            assert response.status_code == 200
+            assert time.perf_counter() - start < 2
+
+            release.set()
+            for _ in range(100):
+                if table.is_current("movies", movies):
+                    break
+                time.sleep(0.02)
+            assert table.is_current("movies", movies)
+            index, score = live_best(["Drama"], movies)
+            response = client.post("/recommend/", json={"type": "movies", "genres": ["Drama"]})
+            assert response.json()["name"] == movies[index]["name"]
+
@@ -0,0 +1,80 @@
+import json
+import pytest
+from app.catalogs import CatalogRegistry, estimate_size
+
+
+@pytest.fixture
+def catalog_dir(tmp_path, sample_data):
+    """Write three tenant catalogs of the sample data layout"""
+    for namespace in ("alpha", "beta", "gamma"):
+        (tmp_path / f"{namespace}.json").write_text(json.dumps(sample_data))
+    return tmp_path
+
+
+class TestCatalogRegistry:
+
+    def test_lazy_load(self, catalog_dir):
+        """Test that catalogs are loaded only when first requested"""
+        registry = CatalogRegistry(str(catalog_dir), memory_budget_bytes=10 ** 9)
+        assert registry.resident() == []
+
+        catalog = registry.get("alpha")
+        assert catalog.namespace == "alpha"
+        assert registry.get("alpha") is catalog
+        assert registry.resident() == ["alpha"]
+
+    def test_lru_eviction_under_budget(self, catalog_dir, sample_data):
+        """Test that the least recently used catalog is evicted when over budget"""
+        budget = int(estimate_size(sample_data) * 2.5)
+        registry = CatalogRegistry(str(catalog_dir), memory_budget_bytes=budget)
+
+        registry.get("alpha")
+        registry.get("beta")
+        registry.get("alpha")
+        registry.get("gamma")
+
+        assert registry.resident() == ["alpha", "gamma"]
+        assert registry.resident_bytes <= budget
+
+    def test_unknown_and_invalid_namespaces(self, catalog_dir):
+        """Test that missing files and path-like namespaces are rejected"""
+        registry = CatalogRegistry(str(catalog_dir), memory_budget_bytes=10 ** 9)
+
+        with pytest.raises(KeyError):
+            registry.get("missing")
+        with pytest.raises(KeyError):
+            registry.get("../alpha")
+
+    def test_per_namespace_metrics(self, catalog_dir, sample_data):
+        """Test that requests, loads and evictions are counted per namespace"""
+        registry = CatalogRegistry(str(catalog_dir), memory_budget_bytes=estimate_size(sample_data))
+
+        registry.get("alpha")
+        registry.get("alpha")
+        registry.get("beta")
+
+        samples = {(name, tuple(sorted((labels or {}).items()))): value for name, labels, value in registry.metrics()}
+        assert samples[("requests_total", (("namespace", "alpha"),))] == 2
+        assert samples[("loads_total", (("namespace", "beta"),))] == 1
+        assert samples[("evictions_total", (("namespace", "alpha"),))] == 1
+        assert samples[("resident_catalogs", ())] == 1
+
+
+class TestCatalogEndpoint:
+
+    def test_recommend_from_catalog(self, test_app, sample_data, catalog_dir, monkeypatch):
+        """Test recommending from a named catalog and the 404 for unknown ones"""
+        import app.main as main_module
+
+        monkeypatch.setattr(main_module, "catalogs", CatalogRegistry(str(catalog_dir), memory_budget_bytes=10 ** 9))
+        client = test_app(sample_data)
+
+        response = client.post("/catalogs/beta/recommend/", json={"type": "movies", "genres": ["Drama"]})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Test Movie 2"
+
+        response = client.post("/catalogs/missing/recommend/", json={"type": "movies", "genres": ["Drama"]})
+        assert response.status_code == 404
+
+        metrics = client.get("/metrics").text
+        assert 'recommender_catalog_loads_total{namespace="beta"} 1' in metrics
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.engine import RecommenderEngine
+
+
+@pytest.fixture
+def engine(tmp_path, sample_data):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(sample_data))
+    return RecommenderEngine(data_path=str(path))
+
+
+class TestRecommenderEngine:
+
+    def test_matches_endpoint(self, engine, test_app, sample_data):
+        """The engine returns exactly what /recommend/ returns"""
+        client = test_app(sample_data)
+        for content_type, genres in [("movies", ["Action"]), ("movies", ["Romance", "Drama"]), ("books", ["Fantasy"])]:
+            expected = client.post("/recommend/", json={"type": content_type, "genres": genres}).json()
+            assert engine.recommend(content_type, genres) == expected
+
+    def test_lazy_loading(self, engine):
+        """The catalog is only read on the first recommendation"""
+        assert not engine.loaded
+        engine.recommend("movies", ["Action"])
+        assert engine.loaded
+
+    def test_invalid_requests(self, engine):
+        with pytest.raises(ValueError, match="Invalid type"):
+            engine.recommend("games", ["Action"])
+        with pytest.raises(ValueError, match="at least one genre"):
+            engine.recommend("movies", [])
+
+    def test_import_is_cheap(self):
+        """Importing the engine doesn't pull in the web framework or the scoring libraries"""
+        code = "import sys, app.engine; print(sorted(m for m in ('fastapi', 'sklearn') if m in sys.modules))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(__file__).parent.parent.parent,
+            capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_from_env_reads_the_service_catalog(self, tmp_path, sample_data):
+        """The engine and the service both read the catalog named by RECOMMENDER_DATA"""
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps({"movies": sample_data["movies"][:1]}))
+        code = (
+            "import app.main\n"
+            "from app.engine import RecommenderEngine\n"
+            "print(sorted(app.main.data), RecommenderEngine.from_env().content_types())"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(__file__).parent.parent.parent,
+            capture_output=True, text=True, check=True, env={**os.environ, "RECOMMENDER_DATA": str(path)}
+        )
+        assert result.stdout.strip() == "['movies'] ['movies']"
+
@@ -0,0 +1,58 @@
+import random
+import pytest
+from app.main import calculate_genre_similarity
+from app.search import GenreIndex
+
+GENRES = [
+    "Action", "Adventure", "Drama", "Romance", "Science Fiction", "Fantasy",
+    "Dark Fantasy", "Mystery", "Thriller", "Political Thriller", "Comedy", "Romantic Comedy"
+]
+
+
+def exhaustive_top_k(genres, items, k):
+    """Reference implementation: score every item, rank by score then position"""
+    scores = [(calculate_genre_similarity(genres, item["genres"]), index) for index, item in enumerate(items)]
+    ranked = sorted(scores, key=lambda entry: (-entry[0], entry[1]))[:k]
+    return [(index, score) for score, index in ranked]
+
+
+def random_catalog(rng, size):
+    return [
+        {"name": f"Item {i}", "description": "", "genres": rng.sample(GENRES, rng.randint(1, 3))}
+        for i in range(size)
+    ]
+
+
+class TestGenreIndex:
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_exhaustive_scan(self, seed):
+        """Test that bound-driven results equal an exhaustive scan for every k"""
+        rng = random.Random(seed)
+        items = random_catalog(rng, 40)
+        index = GenreIndex(items)
+
+        for _ in range(8):
+            genres = rng.sample(GENRES, rng.randint(1, 4))
+            expected = exhaustive_top_k(genres, items, len(items))
+            for k in (1, 3, 10, 50):
+                assert index.top_k(genres, k) == expected[:k]
+
+    def test_stops_after_perfect_match(self):
+        """Test that items whose bound cannot beat the k-th best are never scored"""
+        items = [{"name": "Perfect", "description": "", "genres": ["Action", "Drama"]}]
+        items += [{"name": f"Partial {i}", "description": "", "genres": ["Action"]} for i in range(20)]
+        index = GenreIndex(items)
+
+        assert index.top_k(["Action", "Drama"], 1) == exhaustive_top_k(["Action", "Drama"], items, 1)
+        assert index.items_scored == 1
+
+    def test_no_overlap_returns_first_item(self, sample_data):
+        """Test that a query sharing no tokens ranks items by position with score 0"""
+        index = GenreIndex(sample_data["movies"])
+
+        assert index.top_k(["Western"], 2) == [(0, 0.0), (1, 0.0)]
+
+    def test_empty_catalog(self):
+        """Test that an empty catalog yields no results"""
+        assert GenreIndex([]).top_k(["Drama"], 1) == []
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import pytest
+from app.search import GenreIndex, ShardedGenreIndex, merge_top_k
+
+
+def parse_events(text):
+    """Split a text/event-stream body into (event, payload) pairs"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def large_catalog():
+    genres = ["Action", "Adventure", "Drama", "Romance", "Science Fiction", "Fantasy", "Mystery"]
+    return {
+        "movies": [
+            {"name": f"Movie {i}", "description": "", "genres": [genres[i % 7], genres[(i * 3) % 7]]}
+            for i in range(30)
+        ],
+        "books": []
+    }
+
+
+class TestShardedGenreIndex:
+
+    def test_merged_shards_match_single_index(self, large_catalog):
+        """Test that merging per-shard top-k gives the single-index top-k"""
+        items = large_catalog["movies"]
+        sharded = ShardedGenreIndex(items, shards=4)
+        genres = ["Drama", "Fantasy"]
+
+        ranked = []
+        for shard in sharded.shard_order(genres):
+            ranked = merge_top_k(ranked + sharded.shard_top_k(shard, genres, 5), 5)
+
+        assert len(sharded.shards) == 4
+        assert ranked == GenreIndex(items).top_k(genres, 5)
+
+
+class TestStreamEndpoint:
+
+    def test_stream_partial_then_final(self, test_app, large_catalog):
+        """Test that the stream sends improving partial rankings and an authoritative final one"""
+        client = test_app(large_catalog)
+
+        response = client.post("/recommend/stream", json={"type": "movies", "genres": ["Drama", "Fantasy"], "k": 3})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_events(response.text)
+        partials = [payload for event, payload in events if event == "partial"]
+        assert events[-1][0] == "final"
+        assert [p["shards_done"] for p in partials] == list(range(1, len(partials) + 1))
+
+        best_scores = [p["results"][0]["similarity_score"] for p in partials]
+        assert best_scores == sorted(best_scores)
+
+        final = events[-1][1]["results"]
+        expected = GenreIndex(large_catalog["movies"]).top_k(["Drama", "Fantasy"], 3)
+        assert [r["name"] for r in final] == [large_catalog["movies"][i]["name"] for i, _ in expected]
+        assert partials[-1]["results"] == final
+
+    def test_stream_invalid_k(self, test_app, sample_data):
+        """Test that k must be positive"""
+        client = test_app(sample_data)
+
+        response = client.post("/recommend/stream", json={"type": "movies", "genres": ["Drama"], "k": 0})
+        assert response.status_code == 400
+
+    def test_stream_releases_slot(self, test_app, large_catalog):
+        """Test that a finished stream gives its admission slot back"""
+        import app.main as main_module
+        client = test_app(large_catalog)
+
+        response = client.post("/recommend/stream", json={"type": "movies", "genres": ["Drama"], "k": 3})
+
+        assert response.status_code == 200
+        assert main_module.admission.in_flight == 0
+
+    def test_unsent_stream_releases_slot(self, large_catalog):
+        """Test that the slot is released when the response fails before its body is iterated"""
+        import app.main as main_module
+        from starlette.requests import ClientDisconnect
+
+        async def failing_send(message):
+            raise ConnectionResetError("client went away")
+
+        async def scenario():
+            await main_module.admission.acquire()
+            body = main_module.stream_rankings("movies", ["Drama"], large_catalog["movies"], 3)
+            response = main_module.AdmittedStreamingResponse(body, media_type="text/event-stream")
+            with pytest.raises(ClientDisconnect):
+                await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, failing_send)
+
+        in_flight = main_module.admission.in_flight
+        asyncio.run(scenario())
+        assert main_module.admission.in_flight == in_flight